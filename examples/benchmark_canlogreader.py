@@ -0,0 +1,125 @@
+#! /usr/bin/python3
+#
+# SPDX-License-Identifier: MIT
+import argparse
+import os
+import tempfile
+import time
+from collections.abc import Iterator
+
+from odxtools.canlogreader import CanFrame, read_candump_frames
+from odxtools.isotp_state_machine import IsoTpStateMachine
+
+REQUEST_ID = 0x7e0
+RESPONSE_ID = 0x7e8
+
+
+def generate_frames(num_frames: int) -> Iterator[CanFrame]:
+    """Generate a sequence of ISO-TP frames
+
+    The frames alternate between single frame requests and responses
+    which are split into a first frame and two consecutive frames.
+    """
+    timestamp = 0.0
+    while True:
+        timestamp += 0.001
+        yield timestamp, REQUEST_ID, bytes.fromhex("0322F190AAAAAAAA")
+        for data_hex in ("101462F190010203", "2104050607080910", "2211121314151617"):
+            timestamp += 0.001
+            yield timestamp, RESPONSE_ID, bytes.fromhex(data_hex)
+
+        num_frames -= 4
+        if num_frames <= 0:
+            return
+
+
+def format_log_line(frame: CanFrame) -> str:
+    timestamp, can_id, data = frame
+    return f"({timestamp:.6f}) can0 {can_id:03X}#{data.hex().upper()}\n"
+
+
+def format_normal_line(frame: CanFrame) -> str:
+    _, can_id, data = frame
+    return f"  can0  {can_id:03X}   [{len(data)}]  {data.hex(' ').upper()}\n"
+
+
+def count_frames(file_name: str) -> int:
+    with open(file_name) as log_file:
+        return sum(1 for _ in read_candump_frames(log_file))
+
+
+def count_telegrams(file_name: str) -> int:
+    isotp_sm = IsoTpStateMachine([REQUEST_ID, RESPONSE_ID])
+    with open(file_name) as log_file:
+        return sum(1 for _ in isotp_sm.decode_frames(read_candump_frames(log_file)))
+
+
+def count_telegrams_legacy(file_name: str) -> int:
+    """Decode the telegrams of a log the way this was done before the
+    introduction of `odxtools.canlogreader`, i.e., by matching each
+    line against a set of regular expressions"""
+    isotp_sm = IsoTpStateMachine([REQUEST_ID, RESPONSE_ID])
+    result = 0
+    with open(file_name) as log_file:
+        while line := log_file.readline():
+            line = line.strip()
+            if m := IsoTpStateMachine.can_normal_frame_re.match(line):
+                frame_id = int(m.group(2), 16)
+                frame_data = bytearray([int(x, 16) for x in m.group(3).strip().split(" ")])
+            elif m := IsoTpStateMachine.can_log_frame_re.match(line):
+                frame_id = int(m.group(2), 16)
+                data_str = m.group(3).strip()
+                frame_data = bytearray(
+                    [int(data_str[i:i + 2], 16) for i in range(0, len(data_str), 2)])
+            else:
+                continue
+
+            result += sum(1 for _ in isotp_sm.decode_rx_frame(frame_id, frame_data))
+
+    return result
+
+
+def main() -> None:
+    argparser = argparse.ArgumentParser(
+        description="\n".join([
+            "Measure the number of CAN frames per second which can be read from",
+            "candump text logs and be decoded into ISO-TP telegrams.",
+        ]),
+        formatter_class=argparse.RawTextHelpFormatter,
+    )
+    argparser.add_argument(
+        "--frames",
+        "-n",
+        type=int,
+        default=200000,
+        help="Number of CAN frames in the generated logs (default: 200000)")
+    args = argparser.parse_args()
+
+    benchmarks = [
+        ("read frames", count_frames),
+        ("decode telegrams", count_telegrams),
+        ("decode telegrams (regex)", count_telegrams_legacy),
+    ]
+
+    log_formats = [
+        ("candump -l", format_log_line),
+        ("candump", format_normal_line),
+    ]
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for format_name, format_line in log_formats:
+            file_name = os.path.join(tmp_dir, "candump.log")
+            with open(file_name, "w") as log_file:
+                lines = [format_line(frame) for frame in generate_frames(args.frames)]
+                log_file.writelines(lines)
+
+            for benchmark_name, fn in benchmarks:
+                start = time.perf_counter()
+                fn(file_name)
+                duration = time.perf_counter() - start
+                print(f"{format_name:10s} {benchmark_name:24s} "
+                      f"{len(lines) / duration / 1000:8.0f}k frames/s")
+
+
+if __name__ == "__main__":
+    main()
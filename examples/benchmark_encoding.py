@@ -0,0 +1,127 @@
+#! /usr/bin/python3
+#
+# SPDX-License-Identifier: MIT
+import argparse
+import timeit
+from collections.abc import Callable
+
+import odxtools.exceptions
+from odxtools.compumethods.compucategory import CompuCategory
+from odxtools.compumethods.identicalcompumethod import IdenticalCompuMethod
+from odxtools.dataobjectproperty import DataObjectProperty
+from odxtools.nameditemlist import NamedItemList
+from odxtools.odxlink import DocType, OdxDocFragment, OdxLinkDatabase, OdxLinkId, OdxLinkRef
+from odxtools.odxtypes import DataType
+from odxtools.parameters.codedconstparameter import CodedConstParameter
+from odxtools.parameters.parameter import Parameter
+from odxtools.parameters.valueparameter import ValueParameter
+from odxtools.physicaltype import PhysicalType
+from odxtools.request import Request
+from odxtools.snrefcontext import SnRefContext
+from odxtools.standardlengthtype import StandardLengthType
+
+doc_frags = (OdxDocFragment(doc_name="Benchmark", doc_type=DocType.CONTAINER),)
+
+
+def make_dop(short_name: str, data_type: DataType, bit_length: int) -> DataObjectProperty:
+    return DataObjectProperty(
+        odx_id=OdxLinkId(short_name, doc_frags),
+        short_name=short_name,
+        diag_coded_type=StandardLengthType(base_data_type=data_type, bit_length=bit_length),
+        physical_type=PhysicalType(base_data_type=data_type),
+        compu_method=IdenticalCompuMethod(
+            category=CompuCategory.IDENTICAL, internal_type=data_type, physical_type=data_type))
+
+
+def make_request(short_name: str, sid: int, params: list[Parameter],
+                 dops: list[DataObjectProperty]) -> Request:
+    sid_param = CodedConstParameter(
+        short_name="sid",
+        diag_coded_type=StandardLengthType(base_data_type=DataType.A_UINT32, bit_length=8),
+        coded_value_raw=str(sid))
+    request = Request(
+        odx_id=OdxLinkId(short_name, doc_frags),
+        short_name=short_name,
+        parameters=NamedItemList([sid_param, *params]))
+
+    odxlinks = OdxLinkDatabase()
+    odxlinks.update({dop.odx_id: dop for dop in dops})
+    context = SnRefContext(parameters=request.parameters, use_weakrefs=False)
+    for param in request.parameters:
+        param._resolve_odxlinks(odxlinks)
+        param._resolve_snrefs(context)
+
+    return request
+
+
+def make_write_data_by_identifier(num_values: int) -> tuple[Request, dict[str, int]]:
+    """A WriteDataByIdentifier request featuring a large number of
+    16 bit values followed by the same number of nibbles"""
+    u16 = make_dop("u16", DataType.A_UINT32, 16)
+    u4 = make_dop("u4", DataType.A_UINT32, 4)
+    params: list[Parameter] = [
+        ValueParameter(short_name=f"word_{i}", dop_ref=OdxLinkRef.from_id(u16.odx_id))
+        for i in range(num_values)
+    ]
+    params += [
+        ValueParameter(
+            short_name=f"nibble_{i}",
+            dop_ref=OdxLinkRef.from_id(u4.odx_id),
+            byte_position=1 + 2 * num_values + i // 2,
+            bit_position=4 * (i % 2)) for i in range(num_values)
+    ]
+    values = {f"word_{i}": i for i in range(num_values)}
+    values |= {f"nibble_{i}": i % 16 for i in range(num_values)}
+
+    return make_request("write_data_by_identifier", 0x2e, params, [u16, u4]), values
+
+
+def make_transfer_data(num_bytes: int) -> tuple[Request, dict[str, bytes]]:
+    """A TransferData request which follows a RequestDownload and
+    which transports a large blob of data"""
+    blob = make_dop("blob", DataType.A_BYTEFIELD, 8 * num_bytes)
+    params: list[Parameter] = [
+        ValueParameter(short_name="data", dop_ref=OdxLinkRef.from_id(blob.odx_id))
+    ]
+    values = {"data": bytes(i % 256 for i in range(num_bytes))}
+
+    return make_request("transfer_data", 0x36, params, [blob]), values
+
+
+def time_call(fn: Callable[[], object], number: int) -> float:
+    """Return the best time of a single call in microseconds"""
+    return min(timeit.repeat(fn, number=number, repeat=5)) / number * 1e6
+
+
+def main() -> None:
+    argparser = argparse.ArgumentParser(
+        description="\n".join([
+            "Measure the time required to encode large requests with and without",
+            "the consistency checks of the hot code paths enabled.",
+        ]),
+        formatter_class=argparse.RawTextHelpFormatter,
+    )
+    argparser.add_argument(
+        "--number",
+        "-n",
+        type=int,
+        default=200,
+        help="Number of encodes per timing run (default: 200)")
+    args = argparser.parse_args()
+
+    wdbi, wdbi_values = make_write_data_by_identifier(100)
+    transfer, transfer_values = make_transfer_data(4000)
+    cases: list[tuple[str, Callable[[], object]]] = [
+        ("WriteDataByIdentifier, 100 words + 100 nibbles", lambda: wdbi.encode(**wdbi_values)),
+        ("TransferData, 4000 bytes", lambda: transfer.encode(**transfer_values)),
+    ]
+
+    for name, fn in cases:
+        for checks in (True, False):
+            odxtools.exceptions.hot_path_checks = checks
+            print(f"{name:50s} checks={checks!s:5s} {time_call(fn, args.number):10.1f} us")
+    odxtools.exceptions.hot_path_checks = True
+
+
+if __name__ == "__main__":
+    main()
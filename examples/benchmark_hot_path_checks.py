@@ -0,0 +1,88 @@
+#! /usr/bin/python3
+#
+# SPDX-License-Identifier: MIT
+import argparse
+import timeit
+from collections.abc import Callable
+
+import odxtools
+import odxtools.exceptions
+from odxtools.decodestate import DecodeState
+from odxtools.encodestate import EncodeState
+from odxtools.odxtypes import DataType
+
+NUM_FLOATS = 64
+
+
+def decode_floats(coded_message: bytes) -> None:
+    decode_state = DecodeState(coded_message=coded_message)
+    for _ in range(NUM_FLOATS):
+        decode_state.extract_atomic_value(
+            bit_length=32,
+            base_data_type=DataType.A_FLOAT32,
+            base_type_encoding=None,
+            is_highlow_byte_order=True)
+
+
+def encode_floats() -> None:
+    encode_state = EncodeState()
+    for _ in range(NUM_FLOATS):
+        encode_state.emplace_atomic_value(
+            internal_value=1.5,
+            bit_length=32,
+            base_data_type=DataType.A_FLOAT32,
+            base_type_encoding=None,
+            is_highlow_byte_order=True,
+            used_mask=None)
+
+
+def time_call(fn: Callable[[], object], number: int) -> float:
+    """Return the best time of a single call in microseconds"""
+    return min(timeit.repeat(fn, number=number, repeat=5)) / number * 1e6
+
+
+def main() -> None:
+    argparser = argparse.ArgumentParser(
+        description="\n".join([
+            "Measure the effect of disabling the specification conformance checks",
+            "of the hot code paths (odxtools.exceptions.hot_path_checks) on",
+            "decoding and encoding messages of the somersault ECU.",
+        ]),
+        formatter_class=argparse.RawTextHelpFormatter,
+    )
+    argparser.add_argument(
+        "--pdx-file",
+        default="examples/somersault.pdx",
+        help="Path to the somersault PDX file (default: examples/somersault.pdx)")
+    argparser.add_argument(
+        "--number",
+        "-n",
+        type=int,
+        default=2000,
+        help="Number of calls per timing run (default: 2000)")
+    args = argparser.parse_args()
+
+    db = odxtools.load_pdx_file(args.pdx_file)
+    somersault_lazy = db.diag_layers.somersault_lazy
+    do_forward_flips = somersault_lazy.services.do_forward_flips
+    request = do_forward_flips.request
+    assert request is not None
+    coded_request = bytes.fromhex("ba120c")
+    coded_floats = bytes.fromhex("3fc00000") * NUM_FLOATS
+
+    cases: list[tuple[str, Callable[[], object]]] = [
+        ("decode message", lambda: somersault_lazy.decode(coded_request)),
+        ("encode request", lambda: request.encode(forward_soberness_check=0x12, num_flips=12)),
+        (f"decode {NUM_FLOATS} floats", lambda: decode_floats(coded_floats)),
+        (f"encode {NUM_FLOATS} floats", encode_floats),
+    ]
+
+    for name, fn in cases:
+        for checks in (True, False):
+            odxtools.exceptions.hot_path_checks = checks
+            print(f"{name:20s} checks={checks!s:5s} {time_call(fn, args.number):10.1f} us")
+    odxtools.exceptions.hot_path_checks = True
+
+
+if __name__ == "__main__":
+    main()
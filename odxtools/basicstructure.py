@@ -1,15 +1,14 @@
 # SPDX-License-Identifier: MIT
 from dataclasses import dataclass, field
+from functools import cached_property
 from typing import Any
 from xml.etree import ElementTree
 
 from typing_extensions import override
 
 from .complexdop import ComplexDop
-from .compositecodec import (composite_codec_decode_from_pdu, composite_codec_encode_into_pdu,
-                             composite_codec_get_free_parameters,
-                             composite_codec_get_required_parameters,
-                             composite_codec_get_static_bit_length)
+from .compositecodec import (CompositeCodecMetadata, composite_codec_decode_from_pdu,
+                             composite_codec_encode_into_pdu)
 from .decodestate import DecodeState
 from .encodestate import EncodeState
 from .exceptions import DecodeError, odxraise
@@ -36,11 +35,15 @@ class BasicStructure(ComplexDop):
 
     @property
     def required_parameters(self) -> list[Parameter]:
-        return composite_codec_get_required_parameters(self)
+        return self.codec_metadata.required_parameters
 
     @property
     def free_parameters(self) -> list[Parameter]:
-        return composite_codec_get_free_parameters(self)
+        return self.codec_metadata.free_parameters
+
+    @cached_property
+    def codec_metadata(self) -> CompositeCodecMetadata:
+        return CompositeCodecMetadata(self)
 
     @staticmethod
     def from_et(et_element: ElementTree.Element, context: OdxDocContext) -> "BasicStructure":
@@ -65,6 +68,8 @@ class BasicStructure(ComplexDop):
         return result
 
     def _resolve_odxlinks(self, odxlinks: OdxLinkDatabase) -> None:
+        self.__dict__.pop("codec_metadata", None)
+
         super()._resolve_odxlinks(odxlinks)
 
         for param in self.parameters:
@@ -79,13 +84,17 @@ class BasicStructure(ComplexDop):
 
         context.parameters = None
 
+        # the referenced objects may have changed, so the structural
+        # properties must be determined again when they are needed
+        self.__dict__.pop("codec_metadata", None)
+
     def get_static_bit_length(self) -> int | None:
         # Explicit size was specified, so we do not need to look at
         # the list of parameters
         if self.byte_size is not None:
             return 8 * self.byte_size
 
-        return composite_codec_get_static_bit_length(self)
+        return self.codec_metadata.static_bit_length
 
     def print_free_parameters_info(self) -> None:
         """Return a human readable description of the structure's
@@ -106,13 +115,10 @@ class BasicStructure(ComplexDop):
             actual_len = encode_state.cursor_byte_position - orig_pos
 
             if actual_len < self.byte_size:
-                # Padding bytes are needed. We add an empty object at
-                # the position directly after the structure and let
-                # EncodeState add the padding as needed.
-                encode_state.cursor_byte_position = encode_state.origin_byte_position + self.byte_size
-                # Padding bytes needed. these count as "used".
-                encode_state.coded_message += b"\x00" * (self.byte_size - actual_len)
-                encode_state.used_mask += b"\xff" * (self.byte_size - actual_len)
+                # Padding bytes are needed. These are zero and count
+                # as "used".
+                encode_state.emplace_padding(orig_pos + actual_len, orig_pos + self.byte_size)
+                encode_state.cursor_byte_position = orig_pos + self.byte_size
 
     @override
     def decode_from_pdu(self, decode_state: DecodeState) -> ParameterValue:
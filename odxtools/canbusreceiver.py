@@ -0,0 +1,234 @@
+# SPDX-License-Identifier: MIT
+import asyncio
+import threading
+from types import TracebackType
+
+import can
+
+
+class CanBusReceiver:
+    """Receives the frames of a CAN bus within an asyncio event loop
+
+    Each time the bus signals that frames are available, all of them
+    are drained using non-blocking `recv()` calls and put into a
+    bounded queue. Consumers retrieve all queued frames at once using
+    :py:meth:`receive_batch`.
+
+    If the queue is full, reception is paused until the consumer has
+    caught up, i.e., back-pressure is applied to the CAN interface
+    and its receive buffer. Alternatively, if `drop_on_overflow` is
+    true, the bus is always drained and frames which do not fit into
+    the queue are dropped. Their number is available via
+    :py:attr:`num_dropped`.
+
+    If the bus does not provide a file descriptor that can be
+    monitored by the event loop (e.g., python-can's `virtual`
+    interface), a thread is used to wait for frames.
+    """
+
+    def __init__(self,
+                 bus: can.BusABC,
+                 *,
+                 max_queue_size: int = 4096,
+                 max_batch_size: int = 256,
+                 drop_on_overflow: bool = False,
+                 poll_interval: float = 0.1) -> None:
+        if max_queue_size <= 0:
+            raise ValueError("The maximum queue size must be positive")
+
+        self.bus = bus
+        self.max_queue_size = max_queue_size
+        self.drop_on_overflow = drop_on_overflow
+        self.max_batch_size = max_batch_size
+        self.poll_interval = poll_interval
+
+        #: The total number of frames which have been put into the queue
+        self.num_received = 0
+
+        #: The number of frames which have been received from the bus
+        #: but were dropped because the queue was full
+        self.num_dropped = 0
+
+        #: The maximum number of frames which were queued at any time
+        self.max_queue_depth = 0
+
+        self._queue: asyncio.Queue[can.Message] | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._fileno: int | None = None
+        self._is_reading = False
+        self._thread: threading.Thread | None = None
+        self._stop_event = threading.Event()
+        self._resume_event = threading.Event()
+        # set as soon as a batch of frames received by the thread has
+        # been put into the queue
+        self._enqueued_event = threading.Event()
+
+    @property
+    def queue_depth(self) -> int:
+        """The number of frames which are currently queued"""
+        if self._queue is None:
+            return 0
+
+        return self._queue.qsize()
+
+    def start(self) -> None:
+        """Start receiving frames
+
+        This must be called from within a running event loop.
+        """
+        if self._loop is not None:
+            return
+
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._stop_event.clear()
+        self._resume_event.set()
+
+        try:
+            fileno = self.bus.fileno()
+        except NotImplementedError:
+            fileno = -1
+
+        if fileno >= 0:
+            self._fileno = fileno
+            self._resume_reading()
+        else:
+            self._thread = threading.Thread(
+                target=self._rx_thread, name="CanBusReceiver", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Stop receiving frames"""
+        if self._loop is None:
+            return
+
+        self._pause_reading()
+        self._stop_event.set()
+        self._resume_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+        self._fileno = None
+        self._loop = None
+
+    async def receive_batch(self) -> list[can.Message]:
+        """Wait until at least one frame is available and return all
+        queued frames"""
+        if self._queue is None:
+            self.start()
+        assert self._queue is not None
+
+        queue = self._queue
+        result = [await queue.get()]
+        while not queue.empty():
+            result.append(queue.get_nowait())
+
+        # the consumer has caught up: resume the reception of frames
+        # if it was paused
+        if self._fileno is not None:
+            self._resume_reading()
+        else:
+            self._resume_event.set()
+
+        return result
+
+    async def __aenter__(self) -> "CanBusReceiver":
+        self.start()
+        return self
+
+    async def __aexit__(self, exc_type: type[BaseException] | None, exc_value: BaseException | None,
+                        traceback: TracebackType | None) -> None:
+        self.stop()
+
+    def _enqueue(self, frames: list[can.Message]) -> None:
+        queue = self._queue
+        if queue is None:
+            return  # the receiver has been stopped in the meantime
+
+        for i, frame in enumerate(frames):
+            if queue.full():
+                self.num_dropped += len(frames) - i
+                break
+            queue.put_nowait(frame)
+            self.num_received += 1
+
+        self.max_queue_depth = max(self.max_queue_depth, queue.qsize())
+
+        if queue.full() and not self.drop_on_overflow:
+            self._pause_reading()
+
+        self._enqueued_event.set()
+
+    def _resume_reading(self) -> None:
+        if self._is_reading or self._fileno is None or self._loop is None:
+            return
+
+        self._loop.add_reader(self._fileno, self._on_frames_available)
+        self._is_reading = True
+
+    def _pause_reading(self) -> None:
+        if self._thread is not None:
+            self._resume_event.clear()
+
+        if not self._is_reading or self._fileno is None or self._loop is None:
+            return
+
+        self._loop.remove_reader(self._fileno)
+        self._is_reading = False
+
+    def _max_frames_to_receive(self) -> int:
+        if self.drop_on_overflow or self._queue is None:
+            return self.max_batch_size
+
+        # do not retrieve more frames from the bus than fit into the
+        # queue. (the queue is only filled by the event loop after
+        # the previous batch has been processed, so this is
+        # conservative if it is called by the receive thread.)
+        free_slots = self.max_queue_size - self._queue.qsize()
+        return max(min(free_slots, self.max_batch_size), 1)
+
+    def _on_frames_available(self) -> None:
+        # drain the frames which are available without blocking
+        frames = []
+        for _ in range(self._max_frames_to_receive()):
+            msg = self.bus.recv(timeout=0)
+            if msg is None:
+                break
+            frames.append(msg)
+
+        self._enqueue(frames)
+
+    def _rx_thread(self) -> None:
+        loop = self._loop
+        assert loop is not None
+
+        while not self._stop_event.is_set():
+            # wait until the consumer has caught up if the queue is full
+            self._resume_event.wait()
+            if self._stop_event.is_set():
+                break
+
+            msg = self.bus.recv(timeout=self.poll_interval)
+            if msg is None:
+                continue
+
+            frames = [msg]
+            max_frames = self._max_frames_to_receive()
+            while len(frames) < max_frames:
+                msg = self.bus.recv(timeout=0)
+                if msg is None:
+                    break
+                frames.append(msg)
+
+            self._enqueued_event.clear()
+            try:
+                loop.call_soon_threadsafe(self._enqueue, frames)
+            except RuntimeError:
+                break  # the event loop has been closed
+
+            # wait until the batch has been queued, so the number of
+            # free slots in the queue is known for the next one
+            while not self._enqueued_event.wait(self.poll_interval):
+                if self._stop_event.is_set() or loop.is_closed():
+                    return
@@ -0,0 +1,177 @@
+# SPDX-License-Identifier: MIT
+import sys
+from collections.abc import Callable, Iterable, Iterator
+from typing import TextIO
+
+import can
+
+#: A CAN frame read from a log: (timestamp, CAN ID, payload data). The
+#: timestamp is `None` if the log does not specify one.
+CanFrame = tuple[float | None, int, bytes]
+
+#: Function which parses a single line of a CAN log. If the line
+#: does not match the format, `None` is returned.
+LineParser = Callable[[str], CanFrame | None]
+
+
+def _parse_timestamp(token: str) -> float | None:
+    if len(token) < 2 or token[0] != "(" or token[-1] != ")":
+        return None
+
+    return float(token[1:-1])
+
+
+def parse_log_line(line: str) -> CanFrame | None:
+    """Parse a line of a log produced by `candump -l`
+
+    E.g., `(1620000000.123456) can0 7E8#0362F190AAAAAAAA`. CAN-FD
+    frames (`7E8##1...`) are supported as well. Any fields following
+    the frame (e.g., the direction flag produced by `candump -x`) are
+    ignored.
+    """
+    tokens = line.split()
+    if len(tokens) < 3:
+        return None
+
+    can_id_str, sep, data_str = tokens[2].partition("#")
+    if not sep:
+        return None
+
+    if data_str.startswith("#"):
+        # CAN-FD frame. The first hex digit after the separator
+        # specifies the flags of the frame.
+        data_str = data_str[2:]
+
+    try:
+        return _parse_timestamp(tokens[0]), int(can_id_str, 16), bytes.fromhex(data_str)
+    except ValueError:
+        return None
+
+
+def parse_normal_line(line: str) -> CanFrame | None:
+    """Parse a line of the default output format of `candump`
+
+    E.g., `  can0  7E8   [8]  03 62 F1 90 AA AA AA AA`. The line may
+    be prefixed by a timestamp in parentheses.
+    """
+    tokens = line.split()
+    timestamp = None
+    if tokens and tokens[0].startswith("("):
+        try:
+            timestamp = _parse_timestamp(tokens[0])
+        except ValueError:
+            return None
+        tokens = tokens[1:]
+
+    if len(tokens) < 3 or tokens[2][:1] != "[" or tokens[2][-1:] != "]":
+        return None
+
+    try:
+        can_id = int(tokens[1], 16)
+        dlc = int(tokens[2][1:-1])
+        data = bytes.fromhex("".join(tokens[3:3 + dlc]))
+    except ValueError:
+        return None
+
+    if len(data) != dlc:
+        return None
+
+    return timestamp, can_id, data
+
+
+_LINE_PARSERS: tuple[LineParser, ...] = (parse_log_line, parse_normal_line)
+
+
+def iter_lines(log_file: TextIO, chunk_size: int = 1 << 20) -> Iterator[str]:
+    """Iterate over the lines of a text file by reading it in large
+    chunks
+
+    Streams which are not seekable (e.g., pipes) are read line by
+    line so that frames become available as soon as they are
+    received.
+    """
+    if not log_file.seekable():
+        yield from log_file
+        return
+
+    remainder = ""
+    while chunk := log_file.read(chunk_size):
+        lines = (remainder + chunk).split("\n")
+        remainder = lines.pop()
+        yield from lines
+
+    if remainder:
+        yield remainder
+
+
+def read_candump_frames(log_file: TextIO, chunk_size: int = 1 << 20) -> Iterator[CanFrame]:
+    """Read the CAN frames of a text log produced by `candump`
+
+    Both, the default output format and the log file format (`candump
+    -l`) are supported. The format is detected from the first frame
+    and the parser for it is then used for all lines; other formats
+    are only tried for lines which do not match. Unrecognized lines
+    are reported on `stderr` and skipped.
+    """
+    parsers = _LINE_PARSERS
+    for line in iter_lines(log_file, chunk_size):
+        frame = parsers[0](line)
+        if frame is not None:
+            yield frame
+            continue
+
+        if not line.strip():
+            continue
+
+        for parser in parsers[1:]:
+            frame = parser(line)
+            if frame is not None:
+                # use the matching parser first from now on
+                parsers = (parser,) + tuple(x for x in parsers if x is not parser)
+                yield frame
+                break
+        else:
+            print(f"Warning: unrecognized frame format: '{line.strip()}'", file=sys.stderr)
+
+
+def read_python_can_frames(file_name: str) -> Iterator[CanFrame]:
+    """Read the CAN frames of a log file using python-can
+
+    This supports all formats for which python-can provides a reader,
+    e.g., BLF and ASC files. Error and remote frames are skipped.
+    """
+    with can.LogReader(file_name) as reader:
+        yield from python_can_messages_to_frames(reader)
+
+
+def python_can_messages_to_frames(messages: Iterable[can.Message]) -> Iterator[CanFrame]:
+    """Convert python-can messages to CAN frames
+
+    Error and remote frames are skipped.
+    """
+    for msg in messages:
+        if msg.is_error_frame or msg.is_remote_frame:
+            continue
+
+        yield msg.timestamp, msg.arbitration_id, bytes(msg.data)
+
+
+#: File extensions of the trace formats which are read using
+#: python-can. All other files are assumed to be text logs produced
+#: by `candump`.
+PYTHON_CAN_SUFFIXES = (".asc", ".blf", ".trc", ".mf4", ".csv", ".db")
+
+
+def read_trace_frames(file_name: str) -> Iterator[CanFrame]:
+    """Read the CAN frames of a trace file
+
+    The reader is selected based on the file extension: The formats
+    listed in `PYTHON_CAN_SUFFIXES` are read via python-can, anything
+    else is considered to be a `candump` text log.
+    """
+    if file_name.lower().endswith(PYTHON_CAN_SUFFIXES):
+        yield from read_python_can_frames(file_name)
+        return
+
+    with open(file_name) as log_file:
+        yield from read_candump_frames(log_file)
@@ -0,0 +1,115 @@
+# SPDX-License-Identifier: MIT
+import argparse
+import sys
+
+from ..tracedecoder import TraceChannel, decode_trace_file, write_csv, write_jsonl
+from . import _parser_utils
+from ._parser_utils import SubparsersList
+
+# name of the tool
+_odxtools_tool_name_ = "decode-trace"
+
+
+def parse_channel(spec: str) -> TraceChannel:
+    """Parse a channel specification of the form
+    `REQUEST_ID:RESPONSE_ID:LAYER[:FUNCTIONAL_REQUEST_ID]`"""
+    try:
+        request_id, response_id, diag_layer, *functional_request_id = spec.split(":")
+        if len(functional_request_id) > 1 or not diag_layer:
+            raise ValueError()
+
+        return TraceChannel(
+            request_id=int(request_id, 0),
+            response_id=int(response_id, 0),
+            diag_layer=diag_layer,
+            functional_request_id=int(functional_request_id[0], 0)
+            if functional_request_id else None)
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f"Invalid channel '{spec}': expected "
+            "REQUEST_ID:RESPONSE_ID:LAYER[:FUNCTIONAL_REQUEST_ID]") from None
+
+
+def add_subparser(subparsers: SubparsersList) -> None:
+    parser = subparsers.add_parser(
+        "decode-trace",
+        description="\n".join([
+            "Decode the diagnostic communication contained in a CAN trace",
+            "",
+            "Examples:",
+            "  For decoding the communication of a single ECU to JSON lines:",
+            "    odxtools decode-trace ./path/to/database.pdx trace.log -c 0x7e0:0x7e8:ECU",
+            "  For decoding two ECUs using two worker processes to a CSV file:",
+            "    odxtools decode-trace ./path/to/database.pdx trace.blf -c 0x7e0:0x7e8:ECU1 \\",
+            "        -c 0x7e1:0x7e9:ECU2 -j 2 -f csv -o decoded.csv",
+            "  For decoding two ECUs which also receive functional requests via 0x7df:",
+            "    odxtools decode-trace ./path/to/database.pdx trace.log \\",
+            "        -c 0x7e0:0x7e8:ECU1:0x7df -c 0x7e1:0x7e9:ECU2:0x7df",
+        ]),
+        help="Decode the diagnostic communication contained in a CAN trace",
+        formatter_class=argparse.RawTextHelpFormatter,
+    )
+    _parser_utils.add_pdx_argument(parser)
+
+    parser.add_argument(
+        "trace_file",
+        metavar="TRACE_FILE",
+        help="CAN trace to be decoded. Text logs produced by candump and all formats "
+        "supported by python-can (e.g., .blf and .asc) can be used.",
+    )
+
+    parser.add_argument(
+        "-c",
+        "--channel",
+        type=parse_channel,
+        action="append",
+        required=True,
+        metavar="REQUEST_ID:RESPONSE_ID:LAYER[:FUNCTIONAL_REQUEST_ID]",
+        help="CAN IDs of a diagnostic connection, the name of the diagnostic layer used to "
+        "decode it and optionally the CAN ID used for functional requests. May be specified "
+        "multiple times.",
+    )
+
+    parser.add_argument(
+        "-f",
+        "--format",
+        choices=["jsonl", "csv"],
+        default="jsonl",
+        help="Output format (default: jsonl)",
+    )
+
+    parser.add_argument(
+        "-o",
+        "--output",
+        default=None,
+        metavar="OUTPUT_FILE",
+        help="File to which the decoded telegrams are written (default: stdout)",
+    )
+
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        metavar="NUM_WORKERS",
+        help="Number of worker processes. The channels are distributed over the workers. "
+        "(default: 1)",
+    )
+
+
+def run(args: argparse.Namespace) -> None:
+    odxdb = _parser_utils.load_file(args)
+
+    for channel in args.channel:
+        if odxdb.diag_layers.get(channel.diag_layer) is None:
+            print(f"Diagnostic layer '{channel.diag_layer}' does not exist.", file=sys.stderr)
+            sys.exit(1)
+
+    write = write_csv if args.format == "csv" else write_jsonl
+    telegrams = decode_trace_file(args.trace_file, odxdb, args.channel, num_workers=args.jobs)
+
+    if args.output is None:
+        write(telegrams, sys.stdout)
+    else:
+        with open(args.output, "w", newline="") as output:
+            write(telegrams, output)
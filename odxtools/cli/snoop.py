@@ -4,16 +4,19 @@
 import argparse
 import asyncio
 import sys
-from typing import Any
+from collections.abc import AsyncIterator
+from typing import Any, TextIO, TypeVar
 
 import can
 
 import odxtools.isotp_state_machine as ism
-import odxtools.uds as uds
+from odxtools.database import Database
+from odxtools.diaglayers.hierarchyelement import HierarchyElement
 from odxtools.diaglayers.protocol import Protocol
-from odxtools.exceptions import DecodeError
 from odxtools.isotp_state_machine import IsoTpStateMachine
 from odxtools.response import Response, ResponseType
+from odxtools.tracedecoder import (DecodedTelegram, TraceChannel, TraceDecoder,
+                                   channels_from_database)
 
 from . import _parser_utils
 from ._parser_utils import SubparsersList
@@ -21,75 +24,55 @@ from ._parser_utils import SubparsersList
 # name of the tool
 _odxtools_tool_name_ = "snoop"
 
-odx_diag_layer = None
-last_request = None
+T = TypeVar("T")
 
-ecu_rx_id = None
-ecu_tx_id = None
 
+def handle_telegram(telegram: DecodedTelegram, print_ecu_name: bool = False) -> None:
+    ecu_str = f"[{telegram.diag_layer}] " if print_ecu_name else ""
 
-def handle_telegram(telegram_id: int, payload: bytes) -> None:
-    global odx_diag_layer
-    global last_request
-
-    assert odx_diag_layer is not None
-
-    if telegram_id == ecu_tx_id:
-        if uds.is_response_pending(payload):
-            print(f" ... (response pending)")
+    if telegram.is_response:
+        if telegram.is_response_pending:
+            print(f" {ecu_str}... (response pending)")
             return
 
-        decoded_message = None
-        if last_request is not None:
-            try:
-                decoded_message = odx_diag_layer.decode_response(payload, last_request)
-            except DecodeError:
-                pass
-
+        decoded_message = telegram.message
         if decoded_message is not None:
-            for i, resp in enumerate(decoded_message):
-                params = resp.coding_object.parameters
-                dec_str = ""
-                if len(decoded_message) > 1:
-                    dec_str = f" (decoding {i+1})"
-
-                rt_str = "unknown"
-                if isinstance(resp.coding_object, Response):
-                    if resp.coding_object.response_type == ResponseType.POSITIVE:
-                        rt_str = "positive"
-                    elif resp.coding_object.response_type in (ResponseType.NEGATIVE,
-                                                              ResponseType.GLOBAL_NEGATIVE):
-                        rt_str = "negative"
-
-                settable_params = []
-                for param_name, param_val in resp.param_dict.items():
-                    param = [x for x in params if x.short_name == param_name][0]
-                    if not param.is_settable:
-                        continue
-                    settable_params.append((param_name, param_val))
-
-                if settable_params:
-                    print(f" {rt_str} response{dec_str} {resp.coding_object.short_name}:")
-                    for param_name, param_val in settable_params:
-                        print(f"      {param_name} = {repr(param_val)}")
-                else:
-                    print(f" {rt_str} response{dec_str} {resp.coding_object.short_name}")
+            params = decoded_message.coding_object.parameters
+
+            rt_str = "unknown"
+            if isinstance(decoded_message.coding_object, Response):
+                if decoded_message.coding_object.response_type == ResponseType.POSITIVE:
+                    rt_str = "positive"
+                elif decoded_message.coding_object.response_type in (ResponseType.NEGATIVE,
+                                                                     ResponseType.GLOBAL_NEGATIVE):
+                    rt_str = "negative"
+
+            settable_params = []
+            for param_name, param_val in decoded_message.param_dict.items():
+                param = [x for x in params if x.short_name == param_name][0]
+                if not param.is_settable:
+                    continue
+                settable_params.append((param_name, param_val))
+
+            co_name = decoded_message.coding_object.short_name
+            if settable_params:
+                print(f" {ecu_str}{rt_str} response {co_name}:")
+                for param_name, param_val in settable_params:
+                    print(f"      {param_name} = {repr(param_val)}")
+            else:
+                print(f" {ecu_str}{rt_str} response {co_name}")
         else:
-            print(f" unrecognized response of {len(payload)} bytes length: "
-                  f"0x{payload.hex()}")
+            print(f" {ecu_str}unrecognized response of {len(telegram.payload)} bytes length: "
+                  f"0x{telegram.payload.hex()}")
 
         return
 
-    decoded_message = None
-    if odx_diag_layer is not None:
-        try:
-            decoded_message = odx_diag_layer.decode(payload)[0]
-            last_request = payload
-        except DecodeError:
-            last_request = None
+    if telegram.is_functional:
+        ecu_str = "[functional] " if print_ecu_name else ""
 
+    decoded_message = telegram.message
     if decoded_message is not None:
-        print(f"request {decoded_message.coding_object.short_name}:")
+        print(f"{ecu_str}request {decoded_message.coding_object.short_name}:")
         params = decoded_message.coding_object.parameters
         for param_name, param_val in decoded_message.param_dict.items():
             param = [x for x in params if x.short_name == param_name][0]
@@ -98,9 +81,9 @@ def handle_telegram(telegram_id: int, payload: bytes) -> None:
             print(f"  {param_name} = {repr(param_val)}")
 
     else:
-        print(f"Tester: "
-              f"{payload.hex()} "
-              f"({payload!r}, {len(payload)} bytes)")
+        print(f"{ecu_str}Tester: "
+              f"{telegram.payload.hex()} "
+              f"({telegram.payload!r}, {len(telegram.payload)} bytes)")
 
 
 def init_verbose_state_machine(BaseClass: type[IsoTpStateMachine], *args: Any,
@@ -123,46 +106,51 @@ def init_verbose_state_machine(BaseClass: type[IsoTpStateMachine], *args: Any,
     return InformativeIsoTpDecoder(*args, **kwargs)
 
 
-async def active_main(args: argparse.Namespace) -> None:
-    global ecu_rx_id, ecu_tx_id
+async def decode_telegrams(isotp_decoder: IsoTpStateMachine, trace_decoder: TraceDecoder,
+                           bus: can.BusABC | TextIO) -> None:
+    print_ecu_names = len(trace_decoder.channels) > 1
+    async for telegram_idx, (can_id, payload) in _aenumerate(isotp_decoder.read_telegrams(bus)):
+        telegram = trace_decoder.decode_telegram(telegram_idx, None, can_id, payload)
+        if telegram is not None:
+            handle_telegram(telegram, print_ecu_names)
+
 
+async def _aenumerate(iterable: AsyncIterator[T]) -> AsyncIterator[tuple[int, T]]:
+    idx = 0
+    async for item in iterable:
+        yield idx, item
+        idx += 1
+
+
+async def active_main(args: argparse.Namespace, trace_decoder: TraceDecoder) -> None:
     can_bus = can.Bus(channel=args.channel, bustype="socketcan")
 
-    ecu_rx_id = int(args.rx, 0)
-    ecu_tx_id = int(args.tx, 0)
+    channels = trace_decoder.channels
     isotp_decoder = init_verbose_state_machine(
         BaseClass=ism.IsoTpActiveDecoder,
         can_bus=can_bus,
-        can_rx_ids=ecu_rx_id,
-        can_tx_ids=ecu_tx_id,
+        can_rx_ids=[x.request_id for x in channels],
+        can_tx_ids=[x.response_id for x in channels],
         padding_size=8,
     )
 
     print(f"Reacting to messages on channel {args.channel}")
-    async for telegram_id, payload in isotp_decoder.read_telegrams(can_bus):
-        handle_telegram(telegram_id, payload)
-
-
-async def passive_main(args: argparse.Namespace) -> None:
-    global ecu_rx_id, ecu_tx_id
+    await decode_telegrams(isotp_decoder, trace_decoder, can_bus)
 
-    ecu_rx_id = int(args.rx, 0)
-    ecu_tx_id = int(args.tx, 0)
 
+async def passive_main(args: argparse.Namespace, trace_decoder: TraceDecoder) -> None:
     isotp_decoder = init_verbose_state_machine(
-        BaseClass=ism.IsoTpStateMachine, can_rx_ids=[ecu_rx_id, ecu_tx_id])
+        BaseClass=ism.IsoTpStateMachine, can_rx_ids=trace_decoder.can_ids)
 
     if args.channel:
         # decode a "real" bus
         can_bus = can.Bus(channel=args.channel, bustype="socketcan")
 
         print(f"Decoding messages on channel {args.channel}")
-        async for telegram_id, payload in isotp_decoder.read_telegrams(can_bus):
-            handle_telegram(telegram_id, payload)
+        await decode_telegrams(isotp_decoder, trace_decoder, can_bus)
     else:
         # decode data from stdin
-        async for telegram_id, payload in isotp_decoder.read_telegrams(sys.stdin):
-            handle_telegram(telegram_id, payload)
+        await decode_telegrams(isotp_decoder, trace_decoder, sys.stdin)
 
 
 def add_cli_arguments(parser: argparse.ArgumentParser) -> None:
@@ -201,7 +189,9 @@ def add_cli_arguments(parser: argparse.ArgumentParser) -> None:
         "-v",
         default=None,
         required=False,
-        help="Name of the ECU variant which the decode process ought to be based on",
+        help="Name of the ECU variant which the decode process ought to be based on. "
+        "If no variant is specified, the communication of all ECUs of the database is "
+        "decoded.",
     )
     parser.add_argument(
         "--protocol",
@@ -223,29 +213,20 @@ def add_subparser(subparsers: SubparsersList) -> None:
     add_cli_arguments(parser)
 
 
-def run(args: argparse.Namespace) -> None:
-    global odx_diag_layer
-    odx_database = _parser_utils.load_file(args)
+def get_variant_channel(odx_database: Database, args: argparse.Namespace) -> TraceChannel:
+    """Determine the diagnostic connection of the variant specified on
+    the command line"""
+    odx_diag_layer = odx_database.diag_layers.get(str(args.variant))
 
-    if (odx_database is not None or args.variant is not None) and (odx_database is None or
-                                                                   args.variant is None):
-        print("The database and variant must always either be "
-              "both specified or not at all")
+    if odx_diag_layer is None:
+        print(f"Variant '{args.variant}' does not exist. Available variants:")
+        for dl in odx_database.diag_layers:
+            desc = "" if dl.description is None else f": {dl.description}"
+            print(f"  {dl.short_name}{desc}")
         sys.exit(1)
 
-    odx_diag_layer = None
-    if odx_database is not None:
-        odx_diag_layer = odx_database.diag_layers.get(str(args.variant))
-
-        if odx_diag_layer is None:
-            print(f"Variant '{args.variant}' does not exist. Available variants:")
-            for dl in odx_database.diag_layers:
-                desc = "" if dl.description is None else f": {dl.description}"
-                print(f"  {dl.short_name}{desc}")
-            sys.exit(1)
-
     protocol_name = args.protocol
-    if odx_diag_layer is not None and protocol_name is not None:
+    if protocol_name is not None:
         protocols: list[Protocol] | None = getattr(odx_diag_layer, "protocols", None)
 
         if protocols is None:
@@ -264,34 +245,61 @@ def run(args: argparse.Namespace) -> None:
             sys.exit(1)
 
     # if no can IDs have been explicitly specified, take them from the DL
-    if args.rx is None and odx_diag_layer:
-        get_can_rx_id = getattr(odx_diag_layer, "get_can_receive_id", None)
-        if get_can_rx_id is None:
-            print(f"ECU variant {odx_diag_layer.short_name} is of type "
-                  f"{odx_diag_layer.variant_type.value} and thus does not "
-                  f"provide any communication parameters")
-            sys.exit(1)
+    rx_id = int(args.rx, 0) if args.rx is not None else None
+    tx_id = int(args.tx, 0) if args.tx is not None else None
+    func_req_id = None
+    if isinstance(odx_diag_layer, HierarchyElement):
+        if rx_id is None:
+            rx_id = odx_diag_layer.get_can_receive_id(protocol=protocol_name)
+        if tx_id is None:
+            tx_id = odx_diag_layer.get_can_send_id(protocol=protocol_name)
+        func_req_id = odx_diag_layer.get_can_func_req_id(protocol=protocol_name)
+    elif rx_id is None or tx_id is None:
+        print(f"ECU variant {odx_diag_layer.short_name} is of type "
+              f"{odx_diag_layer.variant_type.value} and thus does not "
+              f"provide any communication parameters")
+        sys.exit(1)
 
-        args.rx = str(get_can_rx_id(protocol=protocol_name))
+    if rx_id is None:
+        print(f"Could not determine a CAN receive ID.")
+        sys.exit(1)
 
-    if args.tx is None and odx_diag_layer:
-        get_can_tx_id = getattr(odx_diag_layer, "get_can_send_id", None)
-        if get_can_tx_id is None:
-            print(f"ECU variant {odx_diag_layer.short_name} is of type "
-                  f"{odx_diag_layer.variant_type.value} and thus does not "
-                  f"provide any communication parameters")
-            sys.exit(1)
+    if tx_id is None:
+        print(f"Could not determine a CAN send ID.")
+        sys.exit(1)
 
-        args.tx = str(get_can_tx_id(protocol=protocol_name))
+    return TraceChannel(
+        request_id=rx_id,
+        response_id=tx_id,
+        functional_request_id=func_req_id,
+        diag_layer=odx_diag_layer.short_name)
 
-    if args.rx is None:
-        print(f"Could not determine a CAN receive ID.")
+
+def run(args: argparse.Namespace) -> None:
+    odx_database = _parser_utils.load_file(args)
+
+    if args.variant is not None:
+        channels = [get_variant_channel(odx_database, args)]
+    elif args.rx is not None or args.tx is not None:
+        print("CAN IDs can only be specified together with a variant")
         sys.exit(1)
+    else:
+        # monitor all ECUs of the database
+        channels = channels_from_database(odx_database, protocol=args.protocol)
+        if not channels:
+            print("The database does not specify the CAN IDs of any ECU")
+            sys.exit(1)
+
+        for channel in channels:
+            print(f"Monitoring {channel.diag_layer} (request ID 0x{channel.request_id:x}, "
+                  f"response ID 0x{channel.response_id:x})")
+
+    trace_decoder = TraceDecoder(odx_database, channels)
 
     if args.active:
-        asyncio.run(active_main(args))
+        asyncio.run(active_main(args, trace_decoder))
     else:
-        asyncio.run(passive_main(args))
+        asyncio.run(passive_main(args, trace_decoder))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,259 @@
+# SPDX-License-Identifier: MIT
+import asyncio
+import time
+from types import TracebackType
+from typing import TYPE_CHECKING, Any, Protocol, runtime_checkable
+
+from . import uds
+from .diaglayers.diaglayer import DiagLayer
+from .diaglayers.hierarchyelement import HierarchyElement
+from .diagservice import DiagService
+from .doip import DoIpClient
+from .exceptions import odxraise
+from .isotp_transport import IsoTpChannel, IsoTpTransport
+from .message import Message
+
+if TYPE_CHECKING:
+    from .diaglayers.protocol import Protocol as OdxProtocol
+
+#: The P2 timeout used if the database does not specify one [s]
+DEFAULT_P2_TIME = 0.05
+
+#: The P2* timeout used if the database does not specify one [s]
+DEFAULT_P2_STAR_TIME = 5.0
+
+#: The interval between tester present messages if the database
+#: does not specify one [s]
+DEFAULT_TESTER_PRESENT_TIME = 2.0
+
+
+@runtime_checkable
+class ClientTransport(Protocol):
+    """The interface of the transports used by :py:class:`DiagClient`
+
+    A transport exchanges telegrams with a single ECU.
+    """
+
+    async def send(self, payload: bytes) -> None:
+        ...
+
+    async def receive(self, timeout: float | None = None) -> bytes:
+        """Wait for the next telegram sent by the ECU
+
+        :raises asyncio.TimeoutError: No telegram was received in time
+        """
+        ...
+
+    def clear(self) -> None:
+        """Discard all telegrams which have been received but not
+        retrieved yet"""
+        ...
+
+
+class IsoTpClientTransport:
+    """A client transport which uses a channel of an ISO-TP transport
+
+    Several of these objects may share the same
+    :py:class:`IsoTpTransport`, e.g., to communicate with multiple
+    ECUs on the same CAN bus.
+    """
+
+    def __init__(self, transport: IsoTpTransport, channel: IsoTpChannel) -> None:
+        self.transport = transport
+        self.channel = channel
+
+    async def send(self, payload: bytes) -> None:
+        await self.transport.send(self.channel.tx_id, payload)
+
+    async def receive(self, timeout: float | None = None) -> bytes:
+        return await self.transport.receive(self.channel.rx_id, timeout)
+
+    def clear(self) -> None:
+        self.transport.clear_rx_queue(self.channel.rx_id)
+
+
+class DoIpClientTransport:
+    """A client transport which addresses an ECU behind a DoIP gateway
+
+    Several of these objects may share the same
+    :py:class:`DoIpClient`, i.e., the ECUs behind a gateway can be
+    accessed concurrently using a single TCP connection.
+    """
+
+    def __init__(self, doip_client: DoIpClient, ecu_address: int) -> None:
+        self.doip_client = doip_client
+        self.ecu_address = ecu_address
+
+    async def send(self, payload: bytes) -> None:
+        await self.doip_client.send(self.ecu_address, payload)
+
+    async def receive(self, timeout: float | None = None) -> bytes:
+        return await self.doip_client.receive(self.ecu_address, timeout)
+
+    def clear(self) -> None:
+        self.doip_client.clear_rx_queue(self.ecu_address)
+
+
+class DiagClient:
+    """An asynchronous diagnostic tester for a single ECU
+
+    Requests are encoded and responses are decoded using the
+    services of a diagnostic layer. The timeouts for responses (P2
+    and P2*) and the interval of tester present messages are taken
+    from the communication parameters of the layer unless they are
+    specified explicitly.
+
+    A client handles only one request at a time, as mandated by UDS,
+    but clients for different ECUs can be used concurrently, even if
+    they share the same transport.
+    """
+
+    def __init__(self,
+                 diag_layer: DiagLayer,
+                 transport: ClientTransport,
+                 *,
+                 protocol: "str | OdxProtocol | None" = None,
+                 p2_time: float | None = None,
+                 p2_star_time: float | None = None,
+                 tester_present_time: float | None = None) -> None:
+        self.diag_layer = diag_layer
+        self.transport = transport
+
+        tester_present_message = None
+        if isinstance(diag_layer, HierarchyElement):
+            if p2_time is None:
+                p2_time = diag_layer.get_p2_max_time(protocol=protocol)
+            if p2_star_time is None:
+                p2_star_time = diag_layer.get_p2_star_time(protocol=protocol)
+            if tester_present_time is None:
+                tester_present_time = diag_layer.get_tester_present_time(protocol=protocol)
+
+            cp = diag_layer.get_comparam("CP_TesterPresentMessage", protocol=protocol)
+            if cp is not None and isinstance(cp_value := cp.get_value(), str):
+                tester_present_message = bytes.fromhex(cp_value)
+
+        #: The time to wait for the response to a request [s]
+        self.p2_time = p2_time if p2_time is not None else DEFAULT_P2_TIME
+
+        #: The time to wait for the response to a request after the
+        #: ECU indicated that the response is pending [s]
+        self.p2_star_time = p2_star_time if p2_star_time is not None else DEFAULT_P2_STAR_TIME
+
+        #: The time between tester present messages on an idle connection [s]
+        self.tester_present_time = tester_present_time if tester_present_time is not None \
+            else DEFAULT_TESTER_PRESENT_TIME
+
+        #: The payload of the tester present messages
+        self.tester_present_message = tester_present_message or bytes(
+            [uds.UDSSID.TesterPresent, 0x00])
+
+        self._lock = asyncio.Lock()
+        self._last_activity = time.monotonic()
+        self._tester_present_task: asyncio.Task[None] | None = None
+
+    async def call(self, service: DiagService | str, **params: Any) -> Message:
+        """Execute a diagnostic service
+
+        The request is encoded using the specified parameters, sent
+        to the ECU, and its response is decoded. Negative responses
+        are returned like positive ones.
+
+        :raises asyncio.TimeoutError: The ECU did not respond in time
+        :raises DecodeError: The response could not be decoded
+        """
+        if isinstance(service, str):
+            service_name = service
+            diag_comm = self.diag_layer.services.get(service_name)
+            if not isinstance(diag_comm, DiagService):
+                odxraise(f"Diagnostic layer {self.diag_layer.short_name} does not "
+                         f"provide a service named '{service_name}'")
+            service = diag_comm
+            assert isinstance(service, DiagService)
+
+        request = service.encode_request(**params)
+        response = await self.send_request(request)
+        assert response is not None
+
+        return self.diag_layer.decode_response(response, request)[0]
+
+    async def send_request(self,
+                           request: bytes | bytearray,
+                           *,
+                           expect_response: bool = True) -> bytes | None:
+        """Send a raw request and wait for its final response
+
+        "Response pending" replies of the ECU extend the time to wait
+        for the final response from P2 to P2*. Telegrams which are not
+        responses to the request are ignored.
+
+        :raises asyncio.TimeoutError: The ECU did not respond in time
+        """
+        request = bytes(request)
+        async with self._lock:
+            self.transport.clear()
+            await self.transport.send(request)
+            self._last_activity = time.monotonic()
+
+            if not expect_response:
+                return None
+
+            sid = request[0]
+            positive_sid = uds.positive_response_id(sid)
+            deadline = time.monotonic() + self.p2_time
+            while True:
+                response = await self.transport.receive(max(deadline - time.monotonic(), 0))
+                self._last_activity = time.monotonic()
+
+                if uds.is_response_pending(response, sid):
+                    deadline = time.monotonic() + self.p2_star_time
+                    continue
+
+                if response and (response[0] == positive_sid or
+                                 (len(response) >= 2 and response[0] == uds.NegativeResponseId and
+                                  response[1] == sid)):
+                    return response
+
+    def start_tester_present(self) -> None:
+        """Periodically send tester present messages while the
+        connection is idle
+
+        This must be called from within a running event loop.
+        """
+        if self._tester_present_task is None:
+            self._tester_present_task = asyncio.create_task(self._tester_present_loop())
+
+    async def stop_tester_present(self) -> None:
+        if self._tester_present_task is None:
+            return
+
+        self._tester_present_task.cancel()
+        try:
+            await self._tester_present_task
+        except asyncio.CancelledError:
+            pass
+        self._tester_present_task = None
+
+    async def __aenter__(self) -> "DiagClient":
+        return self
+
+    async def __aexit__(self, exc_type: type[BaseException] | None, exc_value: BaseException | None,
+                        traceback: TracebackType | None) -> None:
+        await self.stop_tester_present()
+
+    async def _tester_present_loop(self) -> None:
+        message = self.tester_present_message
+        # the ECU does not respond if the "suppress positive response"
+        # bit of the sub-function is set
+        expect_response = not (len(message) >= 2 and message[1] & 0x80)
+        while True:
+            idle_time = time.monotonic() - self._last_activity
+            if idle_time < self.tester_present_time:
+                await asyncio.sleep(self.tester_present_time - idle_time)
+                continue
+
+            try:
+                await self.send_request(message, expect_response=expect_response)
+            except asyncio.TimeoutError:
+                # a missing response to a tester present message is
+                # not fatal
+                self._last_activity = time.monotonic()
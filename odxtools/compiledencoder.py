@@ -0,0 +1,362 @@
+# SPDX-License-Identifier: MIT
+from collections.abc import Callable, Collection, Iterable, Iterator, Mapping
+from dataclasses import dataclass
+from typing import Any, Literal, Optional, TypeVar, cast
+
+from .compositecodec import CompositeCodec
+from .compumethods.compumethod import CompuMethod
+from .dataobjectproperty import DataObjectProperty
+from .encodestate import EncodeState
+from .encoding import Encoding
+from .exceptions import EncodeError, OdxError, odxraise
+from .odxtypes import DataType, ParameterValue, ParameterValueDict
+from .parameters.codedconstparameter import CodedConstParameter
+from .parameters.nrcconstparameter import NrcConstParameter
+from .parameters.parameter import Parameter
+from .parameters.physicalconstantparameter import PhysicalConstantParameter
+from .parameters.reservedparameter import ReservedParameter
+from .parameters.valueparameter import ValueParameter
+from .standardlengthtype import StandardLengthType
+
+T = TypeVar("T")
+
+#: Function which writes the value of a parameter into a PDU
+Patcher = Callable[[bytearray, ParameterValue | None], None]
+
+# the types of parameters which can be encoded independently of all
+# other parameters of the codec object
+_STATIC_PARAMETER_TYPES = (CodedConstParameter, NrcConstParameter, PhysicalConstantParameter,
+                           ReservedParameter, ValueParameter)
+
+
+def _encode_param_at(param: Parameter, value: ParameterValue | None, pos: int,
+                     encode_state: EncodeState) -> None:
+    encode_state.cursor_byte_position = pos
+    encode_state.cursor_bit_position = 0
+    param.encode_into_pdu(physical_value=value, encode_state=encode_state)
+    encode_state.record_param_value(param, value)
+
+
+def _make_generic_patcher(param: Parameter, pos: int) -> Patcher:
+    """Create a function which encodes a parameter using the generic
+    machinery and merges the result into a PDU"""
+
+    def patch(pdu: bytearray, value: ParameterValue | None) -> None:
+        encode_state = EncodeState(is_end_of_pdu=False)
+        _encode_param_at(param, value, pos, encode_state)
+
+        coded = encode_state.coded_message
+        used_mask = encode_state.used_mask
+        for i in range(pos, len(coded)):
+            pdu[i] = (pdu[i] & ~used_mask[i]) | (coded[i] & used_mask[i])
+
+    return patch
+
+
+class _IntPatcher:
+    """Directly writes the value of a byte aligned integer parameter
+    into a PDU
+
+    Values which cannot be handled directly, e.g., because they are
+    invalid, are passed to the generic machinery.
+    """
+
+    @staticmethod
+    def from_param(param: Parameter, pos: int) -> Optional["_IntPatcher"]:
+        """Create a patcher for a parameter
+
+        If the parameter is not suitable for this, `None` is returned.
+        """
+        if not isinstance(param, ValueParameter) or param.bit_position not in (None, 0):
+            return None
+
+        dop = param.dop
+        if not isinstance(dop, DataObjectProperty):
+            return None
+
+        dct = dop.diag_coded_type
+        if not isinstance(dct, StandardLengthType) or dct.bit_mask is not None or \
+           dct.bit_length <= 0 or dct.bit_length % 8 != 0:
+            return None
+
+        if dct.base_data_type == DataType.A_UINT32 and \
+           dct.base_type_encoding in (None, Encoding.NONE):
+            signed = False
+        elif dct.base_data_type == DataType.A_INT32 and \
+             dct.base_type_encoding in (None, Encoding.TWOC):
+            signed = True
+        else:
+            return None
+
+        return _IntPatcher(param, pos, dop.compu_method, dct, signed)
+
+    def __init__(self, param: Parameter, pos: int, compu_method: CompuMethod,
+                 dct: StandardLengthType, signed: bool) -> None:
+        self.pos = pos
+        self.compu_method = compu_method
+        self.signed = signed
+        self.byte_length = dct.bit_length // 8
+        self.byteorder: Literal["big", "little"] = \
+            "big" if dct.is_highlow_byte_order else "little"
+        self.fallback = _make_generic_patcher(param, pos)
+
+    def __call__(self, pdu: bytearray, value: ParameterValue | None) -> None:
+        internal_value = None
+        if value is not None:
+            internal_value = self.compu_method.try_convert_physical_to_internal(
+                value)  # type: ignore[arg-type]
+
+        if not isinstance(internal_value, int):
+            # let the generic machinery deal with default values and
+            # report errors
+            self.fallback(pdu, value)
+            return
+
+        self.patch_internal(pdu, internal_value, value)
+
+    def patch_internal(self, pdu: bytearray, internal_value: int,
+                       value: ParameterValue | None) -> None:
+        """Write an internal value which has already been converted
+        from the physical value into the PDU"""
+        pos = self.pos
+        try:
+            pdu[pos:pos + self.byte_length] = internal_value.to_bytes(
+                self.byte_length, self.byteorder, signed=self.signed)
+        except OverflowError:
+            self.fallback(pdu, value)
+
+    def convert_column(self, values: list[Any]) -> list[int | None] | None:
+        """Convert the physical values of a whole column to internal
+        values in one go
+
+        Entries which cannot be represented by the parameter are
+        `None`. If the column cannot be converted at once (e.g.,
+        because NumPy is not available or the values are not
+        numeric), `None` is returned.
+        """
+        try:
+            import numpy as np
+        except ImportError:
+            return None
+
+        try:
+            internal_values, mask = self.compu_method.convert_physical_to_internal_array(values)
+        except (OdxError, TypeError, ValueError, OverflowError):
+            return None
+
+        if internal_values.dtype.kind not in "iu" or internal_values.shape != (len(values),):
+            return None
+
+        bits = 8 * self.byte_length
+        if bits < 64:
+            lower, upper = (-(1 << (bits - 1)), 1 << (bits - 1)) if self.signed else (0, 1 << bits)
+            mask = mask & (internal_values >= lower) & (internal_values < upper)
+
+        result: list[int | None] = np.where(mask, internal_values, 0).tolist()
+        for i in np.flatnonzero(~mask).tolist():
+            result[i] = None
+
+        return result
+
+
+class CompiledEncoder:
+    """A precompiled encoder for a composite codec object
+
+    Compiled encoders are intended for encoding the same request many
+    times with only a few of its parameters changing. The values of
+    all parameters which are not variable are encoded only once into
+    a template of the PDU. For each invocation, the template is
+    copied and the values of the variable parameters are patched
+    into the copy.
+
+    This only works if all parameters of the codec object are located
+    at statically known positions and can be encoded independently
+    of each other. If this is not the case, the regular encoding
+    procedure is used (cf. `is_static`).
+    """
+
+    def __init__(self, codec: CompositeCodec, fixed_params: dict[str, ParameterValue]) -> None:
+        self.codec = codec
+        self.fixed_params = dict(fixed_params)
+
+        metadata = codec.codec_metadata
+        free_names = {param.short_name for param in metadata.free_parameters}
+        for name in self.fixed_params:
+            if name not in free_names:
+                odxraise(
+                    f"Cannot fix the value of parameter '{name}' of composite "
+                    f"codec object {codec.short_name}", EncodeError)
+
+        #: The parameters for which values can be passed to the encoder
+        self.variable_parameters = [
+            param for param in metadata.free_parameters if param.short_name not in fixed_params
+        ]
+        self._variable_names = frozenset(param.short_name for param in self.variable_parameters)
+        self._required_names = frozenset(param.short_name
+                                         for param in metadata.required_parameters
+                                         if param.short_name not in fixed_params)
+
+        self._template: bytes | None = None
+        self._patchers: list[tuple[str, Patcher]] = []
+
+        positions = metadata.static_parameter_positions
+        byte_length = None
+        if metadata.static_bit_length is not None:
+            byte_length = metadata.static_bit_length // 8
+
+        if positions is None or byte_length is None or \
+           not all(isinstance(param, _STATIC_PARAMETER_TYPES) for param, _ in positions):
+            return
+
+        # encode everything which does not change into the template
+        encode_state = EncodeState(is_end_of_pdu=False)
+        for param, pos in positions:
+            if param.short_name in self._variable_names:
+                continue
+
+            _encode_param_at(param, self.fixed_params.get(param.short_name), pos, encode_state)
+
+        template = encode_state.coded_message
+        if len(template) < byte_length:
+            template += b'\x00' * (byte_length - len(template))
+        self._template = bytes(template)
+
+        for param, pos in positions:
+            if param.short_name not in self._variable_names:
+                continue
+
+            patcher: Patcher | None = _IntPatcher.from_param(param, pos)
+            if patcher is None:
+                patcher = _make_generic_patcher(param, pos)
+
+            self._patchers.append((param.short_name, patcher))
+
+    @property
+    def is_static(self) -> bool:
+        """Specify whether messages are produced by patching a
+        precomputed template"""
+        return self._template is not None
+
+    def __call__(self, **kwargs: ParameterValue) -> bytearray:
+        """Encode a message given the values of the variable
+        parameters"""
+        if self._template is None:
+            return self._encode_generic(kwargs)
+
+        self._check_param_names(kwargs)
+
+        pdu = bytearray(self._template)
+        for name, patch in self._patchers:
+            patch(pdu, kwargs.get(name))
+
+        return pdu
+
+    def encode_many(
+        self, rows: Iterable[ParameterValueDict] | Mapping[str, Iterable[ParameterValue]]
+    ) -> Iterator["EncodeResult"]:
+        """Encode a batch of messages
+
+        The values of the variable parameters are either specified as
+        an iterable of dictionaries (one per message) or as a mapping
+        from parameter names to columns of values, e.g., NumPy arrays.
+        The results are produced lazily in the order of the rows.
+        Errors are reported for each row individually instead of
+        aborting the whole batch.
+
+        For columnar input, the physical values of integer parameters
+        are validated and converted for the whole column at once if
+        NumPy is available.
+        """
+        if not isinstance(rows, Mapping):
+            for index, row in enumerate(rows):
+                yield self._encode_row(index, self._encode_dict, row)
+            return
+
+        columns = {
+            name: column.tolist() if hasattr(column, "tolist") else list(column)
+            for name, column in rows.items()
+        }
+        num_rows = len(next(iter(columns.values()), []))
+        if any(len(column) != num_rows for column in columns.values()):
+            odxraise("All columns must exhibit the same number of values", EncodeError)
+
+        if self._template is None:
+            for index in range(num_rows):
+                row = {name: column[index] for name, column in columns.items()}
+                yield self._encode_row(index, self._encode_generic, row)
+            return
+
+        self._check_param_names(columns)
+
+        # convert whole columns of values to their internal
+        # representation if possible
+        patch_columns = []
+        for name, patch in self._patchers:
+            column = columns.get(name)
+            internal_column = None
+            if column is not None and isinstance(patch, _IntPatcher):
+                internal_column = patch.convert_column(column)
+            patch_columns.append((patch, column, internal_column))
+
+        def encode_row(index: int) -> bytearray:
+            pdu = bytearray(cast(bytes, self._template))
+            for patch, column, internal_column in patch_columns:
+                value = None if column is None else column[index]
+                internal_value = None if internal_column is None else internal_column[index]
+                if internal_value is not None:
+                    cast(_IntPatcher, patch).patch_internal(pdu, internal_value, value)
+                else:
+                    patch(pdu, value)
+
+            return pdu
+
+        for index in range(num_rows):
+            yield self._encode_row(index, encode_row, index)
+
+    def _encode_dict(self, row: ParameterValueDict) -> bytearray:
+        return self(**row)
+
+    @staticmethod
+    def _encode_row(index: int, encode: Callable[[T], bytearray], arg: T) -> "EncodeResult":
+        try:
+            return EncodeResult(index=index, coded_message=encode(arg))
+        except OdxError as e:
+            return EncodeResult(index=index, error=e)
+
+    def _check_param_names(self, names: Collection[str]) -> None:
+        if not self._required_names.issubset(names):
+            missing = self._required_names.difference(names)
+            odxraise(f"No value for required parameter(s) {', '.join(sorted(missing))} specified",
+                     EncodeError)
+        if not self._variable_names.issuperset(names):
+            unknown = set(names).difference(self._variable_names)
+            odxraise(
+                f"Value for unknown or fixed parameter(s) {', '.join(sorted(unknown))} "
+                f"specified for composite codec object {self.codec.short_name}", EncodeError)
+
+    def _encode_generic(self, kwargs: dict[str, ParameterValue]) -> bytearray:
+        for name in kwargs:
+            if name in self.fixed_params:
+                odxraise(f"Value for fixed parameter '{name}' specified", EncodeError)
+
+        param_values: ParameterValueDict = {**self.fixed_params, **kwargs}
+        encode_state = EncodeState(is_end_of_pdu=True)
+        if (bit_length := self.codec.codec_metadata.static_bit_length) is not None:
+            encode_state.ensure_length(bit_length // 8)
+        self.codec.encode_into_pdu(physical_value=param_values, encode_state=encode_state)
+
+        return encode_state.coded_message
+
+
+@dataclass(kw_only=True)
+class EncodeResult:
+    """The result of encoding a single message of a batch"""
+
+    #: The index of the row which specified the parameter values
+    index: int
+
+    #: The encoded message. `None` if encoding failed.
+    coded_message: bytearray | None = None
+
+    #: The error which occurred during encoding, if any
+    error: OdxError | None = None
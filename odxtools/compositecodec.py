@@ -1,14 +1,18 @@
 # SPDX-License-Identifier: MIT
 import typing
+from collections.abc import Iterator
+from functools import cached_property
 from typing import runtime_checkable
 
 from .codec import Codec
+from .dataobjectproperty import DataObjectProperty
 from .decodestate import DecodeState
 from .encodestate import EncodeState
-from .exceptions import EncodeError, odxraise
+from .exceptions import DecodeError, EncodeError, odxraise
 from .odxtypes import ParameterValue
 from .parameters.codedconstparameter import CodedConstParameter
 from .parameters.matchingrequestparameter import MatchingRequestParameter
+from .parameters.nrcconstparameter import NrcConstParameter
 from .parameters.parameter import Parameter
 from .parameters.physicalconstantparameter import PhysicalConstantParameter
 
@@ -33,6 +37,90 @@ class CompositeCodec(Codec, typing.Protocol):
     def free_parameters(self) -> list[Parameter]:
         return []
 
+    @property
+    def codec_metadata(self) -> "CompositeCodecMetadata":
+        return CompositeCodecMetadata(self)
+
+
+class CompositeCodecMetadata:
+    """Structural properties of a composite codec object which are
+    needed when en- or decoding it
+
+    These properties only depend on the parameters of the codec
+    object and the objects referenced by them. They are thus computed
+    only once and cached by the codec object until its references are
+    resolved the next time, i.e., until `Database.refresh()` is
+    called.
+    """
+
+    def __init__(self, codec: CompositeCodec) -> None:
+        from .parameters.lengthkeyparameter import LengthKeyParameter
+        from .parameters.tablekeyparameter import TableKeyParameter
+
+        self._codec = codec
+        parameters = list(codec.parameters)
+
+        #: The short names of all parameters of the codec object
+        self.parameter_names = frozenset(param.short_name for param in parameters)
+
+        #: The parameter which is specified last, if any
+        self.last_parameter = parameters[-1] if parameters else None
+
+        #: The parameters which must be specified for encoding
+        self.required_parameters = composite_codec_get_required_parameters(codec)
+
+        #: The parameters which can be specified for encoding
+        self.free_parameters = composite_codec_get_free_parameters(codec)
+
+        #: The length- and table key parameters. The values of these
+        #: are encoded after all other parameters.
+        self.key_parameters: list[LengthKeyParameter | TableKeyParameter] = [
+            p for p in parameters if isinstance(p, (LengthKeyParameter, TableKeyParameter))
+        ]
+
+        self._coded_const_prefixes: dict[bytes, bytes] = {}
+
+    @cached_property
+    def static_bit_length(self) -> int | None:
+        """The size of the codec object in bits if it can be
+        determined statically"""
+        return composite_codec_get_static_bit_length(self._codec)
+
+    @cached_property
+    def static_parameter_positions(self) -> list[tuple[Parameter, int]] | None:
+        """The byte positions of all parameters relative to the
+        beginning of the codec object
+
+        If the position of any parameter can only be determined at
+        runtime, this is `None`.
+        """
+        result = []
+        cursor = 0
+        for param in self._codec.parameters:
+            param_bit_length = param.get_static_bit_length()
+            if param_bit_length is None:
+                return None
+            elif param.byte_position is not None:
+                cursor = param.byte_position
+
+            result.append((param, cursor))
+            cursor += ((param.bit_position or 0) + param_bit_length + 7) // 8
+
+        return result
+
+    def coded_const_prefix(self, request_prefix: bytes = b'') -> bytes:
+        """Return the coded constant prefix of the codec object
+
+        The result is computed on first use for each request prefix.
+        """
+        request_prefix = bytes(request_prefix)
+        result = self._coded_const_prefixes.get(request_prefix)
+        if result is None:
+            result = bytes(composite_codec_get_coded_const_prefix(self._codec, request_prefix))
+            self._coded_const_prefixes[request_prefix] = result
+
+        return result
+
 
 # some helper functions useful for composite codec objects
 def composite_codec_get_static_bit_length(codec: CompositeCodec) -> int | None:
@@ -92,11 +180,110 @@ def composite_codec_get_coded_const_prefix(codec: CompositeCodec,
     return encode_state.coded_message
 
 
+def _iter_static_constants(codec: CompositeCodec,
+                           origin_byte_position: int) -> Iterator[tuple[Parameter, int]]:
+    """Iterate over the constant parameters of a composite codec
+    object which are located at statically known positions
+
+    The absolute byte position of each parameter is yielded alongside
+    the parameter.
+    """
+    cursor: int | None = origin_byte_position
+    for param in codec.parameters:
+        if param.byte_position is not None:
+            cursor = origin_byte_position + param.byte_position
+        elif cursor is None:
+            # the position of the parameter depends on the values of
+            # the preceeding ones.
+            continue
+
+        if isinstance(param, (CodedConstParameter, NrcConstParameter, PhysicalConstantParameter)):
+            yield param, cursor
+
+        param_bit_length = param.get_static_bit_length()
+        if param_bit_length is None:
+            cursor = None
+        else:
+            cursor += ((param.bit_position or 0) + param_bit_length + 7) // 8
+
+
+def composite_codec_verify_constants(codec: CompositeCodec,
+                                     coded_message: bytes | bytearray,
+                                     origin_byte_position: int = 0) -> None:
+    """Check the constant parameters of a composite codec object
+    without decoding any of its variable parts
+
+    Only constant parameters (CODED-CONST, NRC-CONST and PHYS-CONST)
+    which are located at a statically known position are considered,
+    i.e., parameters that either specify an explicit byte position or
+    are only preceded by parameters of static size. Non-matching
+    values are dealt with exactly like during regular decoding,
+    i.e., a `DecodeMismatch` exception is raised for NRC-CONST
+    parameters, etc.
+    """
+    for param, cursor in _iter_static_constants(codec, origin_byte_position):
+        decode_state = DecodeState(
+            coded_message=coded_message,
+            origin_byte_position=origin_byte_position,
+            cursor_byte_position=cursor)
+        param.decode_from_pdu(decode_state)
+
+
+def _constant_matches(param: Parameter, coded_message: bytes | bytearray, cursor: int) -> bool:
+    param_bit_length = param.get_static_bit_length()
+    if param_bit_length is not None and \
+       cursor + ((param.bit_position or 0) + param_bit_length + 7) // 8 > len(coded_message):
+        # the message is too short to contain the parameter
+        return False
+
+    decode_state = DecodeState(
+        coded_message=coded_message,
+        cursor_byte_position=cursor,
+        cursor_bit_position=param.bit_position or 0)
+    try:
+        if isinstance(param, CodedConstParameter):
+            return param.diag_coded_type.decode_from_pdu(decode_state) == param.coded_value
+        elif isinstance(param, NrcConstParameter):
+            return param.diag_coded_type.decode_from_pdu(decode_state) in param.coded_values
+        elif isinstance(param, PhysicalConstantParameter):
+            dop = param.dop
+            if not isinstance(dop, DataObjectProperty):
+                # we cannot cheaply check this parameter.
+                return True
+
+            internal_value = dop.diag_coded_type.decode_from_pdu(decode_state)
+            physical_value = dop.compu_method.try_convert_internal_to_physical(internal_value)
+            return physical_value == param.physical_constant_value
+    except DecodeError:
+        return False
+
+    return True
+
+
+def composite_codec_constants_match(codec: CompositeCodec,
+                                    coded_message: bytes | bytearray,
+                                    origin_byte_position: int = 0) -> bool:
+    """Check if the constant parameters of a composite codec object
+    match a message
+
+    This considers the same parameters as
+    `composite_codec_verify_constants()`, but instead of raising an
+    exception, `False` is returned for non-matching values. This is
+    intended to quickly rule out codec objects which do not apply to
+    a message.
+    """
+    return all(
+        _constant_matches(param, coded_message, cursor)
+        for param, cursor in _iter_static_constants(codec, origin_byte_position))
+
+
 def composite_codec_encode_into_pdu(codec: CompositeCodec, physical_value: ParameterValue | None,
                                     encode_state: EncodeState) -> None:
     from .parameters.lengthkeyparameter import LengthKeyParameter
     from .parameters.tablekeyparameter import TableKeyParameter
 
+    metadata = codec.codec_metadata
+
     if not isinstance(physical_value, dict):
         odxraise(
             f"Expected a dictionary for the values of {codec.short_name}, "
@@ -116,14 +303,15 @@ def composite_codec_encode_into_pdu(codec: CompositeCodec, physical_value: Param
 
     # ensure that no values for unknown parameters are specified.
     if not encode_state.allow_unknown_parameters:
-        param_names = {param.short_name for param in codec.parameters}
+        param_names = metadata.parameter_names
         for param_value_name in physical_value:
             if param_value_name not in param_names:
                 odxraise(f"Value for unknown parameter '{param_value_name}' specified "
                          f"for composite codec object {codec.short_name}")
 
+    last_param = metadata.last_parameter
     for param in codec.parameters:
-        if id(param) == id(codec.parameters[-1]):
+        if param is last_param:
             # The last parameter of the composite codec object is at
             # the end of the PDU if the codec object itself is at the
             # end of the PDU.
@@ -151,20 +339,16 @@ def composite_codec_encode_into_pdu(codec: CompositeCodec, physical_value: Param
         param_phys_value = physical_value.get(param.short_name)
         param.encode_into_pdu(physical_value=param_phys_value, encode_state=encode_state)
 
-        encode_state.journal.append((param, param_phys_value))
+        encode_state.record_param_value(param, param_phys_value)
 
     encode_state.is_end_of_pdu = False
 
     # encode the length- and table keys. This cannot be done above
     # because we allow these to be defined implicitly (i.e. they
     # are defined by their respective users)
-    for param in codec.parameters:
-        if not isinstance(param, (LengthKeyParameter, TableKeyParameter)):
-            # the current parameter is neither a length- nor a table key
-            continue
-
+    for key_param in metadata.key_parameters:
         # Encode the value of the key parameter into the message
-        param.encode_value_into_pdu(encode_state=encode_state)
+        key_param.encode_value_into_pdu(encode_state=encode_state)
 
     encode_state.origin_byte_position = orig_origin
 
@@ -181,7 +365,7 @@ def composite_codec_decode_from_pdu(codec: CompositeCodec,
     for param in codec.parameters:
         value = param.decode_from_pdu(decode_state)
 
-        decode_state.journal.append((param, value))
+        decode_state.record_param_value(param, value)
         result[param.short_name] = value
 
     # decoding of the composite codec object finished. go back the
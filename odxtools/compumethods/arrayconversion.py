@@ -0,0 +1,306 @@
+# SPDX-License-Identifier: MIT
+#
+# Helpers for converting whole arrays of values using compu methods.
+# This module requires NumPy, which is an optional dependency of
+# odxtools. It is thus only imported on demand.
+import math
+from collections.abc import Callable, Hashable, Sequence
+from typing import TYPE_CHECKING, Any
+
+from ..exceptions import OdxError
+from ..odxtypes import AtomicOdxType, DataType
+from .intervaltype import IntervalType
+from .limit import Limit
+
+if TYPE_CHECKING:
+    from .linearsegment import LinearSegment
+    from .ratfuncsegment import RatFuncSegment
+
+try:
+    import numpy as np
+    from numpy.typing import ArrayLike, NDArray
+except ImportError as e:  # pragma: no cover
+    raise ImportError("Converting arrays of values requires NumPy. Use "
+                      "`pip install \"odxtools[numpy]\"` to install it.") from e
+
+#: The result of an array conversion: The array of converted values
+#: and a boolean mask which specifies which of the input values were
+#: valid
+ConversionResult = tuple[NDArray[Any], NDArray[np.bool_]]
+
+_INT_TYPES = (DataType.A_INT32, DataType.A_UINT32)
+_FLOAT_TYPES = (DataType.A_FLOAT32, DataType.A_FLOAT64)
+
+
+def numeric_array(values: ArrayLike) -> NDArray[Any] | None:
+    """Convert array-like values to a numeric NumPy array
+
+    If the values are not numeric, `None` is returned.
+    """
+    result = np.asarray(values)
+    if result.dtype.kind not in "iuf":
+        return None
+
+    return result
+
+
+def type_mask(values: NDArray[Any], data_type: DataType) -> NDArray[np.bool_]:
+    """Return the mask of the values which can be represented by a
+    numeric data type
+
+    Like for `DataType.isinstance()`, floating point values are not
+    valid for integer types, even if they represent whole numbers.
+    """
+    if data_type in _INT_TYPES and values.dtype.kind in "iu":
+        return np.ones(values.shape, dtype=bool)
+    elif data_type in _FLOAT_TYPES:
+        return np.ones(values.shape, dtype=bool)
+
+    return np.zeros(values.shape, dtype=bool)
+
+
+def finalize_result(values: NDArray[Any],
+                    mask: NDArray[np.bool_],
+                    data_type: DataType,
+                    *,
+                    rounding: Callable[[NDArray[Any]],
+                                       NDArray[Any]] = np.round) -> ConversionResult:
+    """Convert the result of a numeric computation to the array type
+    used for a data type
+
+    Entries which are not valid are set to zero for integer types and
+    to NaN for floating point types.
+    """
+    if data_type in _INT_TYPES:
+        with np.errstate(invalid="ignore"):
+            result = np.where(mask, rounding(values), 0).astype(np.int64)
+        return result, mask
+
+    return np.where(mask, values, math.nan).astype(np.float64), mask
+
+
+def convert_scalarwise(values: ArrayLike,
+                       convert: Callable[[AtomicOdxType], AtomicOdxType | None],
+                       data_type: DataType,
+                       *,
+                       categorical: bool = False) -> ConversionResult:
+    """Convert an array of values using a scalar conversion function
+
+    `convert` is expected to return `None` for invalid values (cf.
+    `CompuMethod.try_convert_internal_to_physical()`). Values for
+    which the conversion raises an error are marked as invalid as
+    well. If `categorical` is true, each distinct value is only
+    converted once.
+    """
+    input_array = np.asarray(values)
+    flat_values = input_array.ravel().tolist()
+
+    results: list[AtomicOdxType | None] = []
+    cache: dict[Hashable, AtomicOdxType | None] = {}
+    for value in flat_values:
+        if categorical and isinstance(value, Hashable) and value in cache:
+            results.append(cache[value])
+            continue
+
+        try:
+            result = convert(value)
+        except OdxError:
+            result = None
+
+        if categorical and isinstance(value, Hashable):
+            cache[value] = result
+        results.append(result)
+
+    mask = np.array([x is not None for x in results], dtype=bool).reshape(input_array.shape)
+
+    if data_type in _INT_TYPES or data_type in _FLOAT_TYPES:
+        numeric_results = np.array([0 if x is None else x for x in results], dtype=np.float64)
+        return finalize_result(
+            numeric_results.reshape(input_array.shape), mask, data_type, rounding=np.trunc)
+
+    object_results = np.empty(len(results), dtype=object)
+    object_results[:] = results
+    return object_results.reshape(input_array.shape), mask
+
+
+def _limit_bound(limit: Limit | None, unbounded_value: float) -> tuple[float, bool] | None:
+    if limit is None or limit.value is None or limit.interval_type == IntervalType.INFINITE:
+        return unbounded_value, False
+
+    if not isinstance(limit.value, (int, float)):
+        return None
+
+    return limit.value, limit.interval_type == IntervalType.OPEN
+
+
+def select_segments(
+    values: NDArray[Any], limits: Sequence[tuple[Limit | None, Limit | None]]
+) -> tuple[NDArray[np.intp], NDArray[np.bool_]] | None:
+    """Determine the segment which applies to each value
+
+    Segments are specified by their lower and upper limits; missing
+    limits do not restrict the range of the segment. If multiple
+    segments apply to a value, the one specified first is selected.
+    The result is a tuple of the array of segment indices and the
+    mask of the values to which any segment applies. If the limits
+    are not numeric, `None` is returned.
+    """
+    bounds = []
+    for lower_limit, upper_limit in limits:
+        lower = _limit_bound(lower_limit, -math.inf)
+        upper = _limit_bound(upper_limit, math.inf)
+        if lower is None or upper is None:
+            return None
+        bounds.append((*lower, *upper))
+
+    if len(bounds) == 0:
+        return np.zeros(values.shape, dtype=np.intp), np.zeros(values.shape, dtype=bool)
+
+    lowers = np.array([x[0] for x in bounds], dtype=np.float64)
+    lowers_open = np.array([x[1] for x in bounds], dtype=bool)
+    uppers = np.array([x[2] for x in bounds], dtype=np.float64)
+    uppers_open = np.array([x[3] for x in bounds], dtype=bool)
+
+    def applies(indices: NDArray[np.intp]) -> NDArray[np.bool_]:
+        lower = lowers[indices]
+        upper = uppers[indices]
+        result: NDArray[np.bool_] = \
+            ((values > lower) | (~lowers_open[indices] & (values == lower))) & \
+            ((values < upper) | (~uppers_open[indices] & (values == upper)))
+        return result
+
+    if np.all(lowers[:-1] < lowers[1:]) and np.all(uppers[:-1] <= lowers[1:]):
+        # the segments are sorted and do not overlap except for the
+        # boundary points: bisect over the lower limits
+        indices = np.clip(np.searchsorted(lowers, values, side="right") - 1, 0, len(bounds) - 1)
+        mask = applies(indices)
+
+        # values located on the common boundary of two adjacent
+        # segments belong to the first one
+        previous = np.maximum(indices - 1, 0)
+        previous_mask = (indices > 0) & applies(previous)
+
+        return np.where(previous_mask, previous, indices), mask | previous_mask
+
+    indices = np.zeros(values.shape, dtype=np.intp)
+    mask = np.zeros(values.shape, dtype=bool)
+    for i in reversed(range(len(bounds))):
+        segment_mask = applies(np.full(values.shape, i, dtype=np.intp))
+        indices[segment_mask] = i
+        mask |= segment_mask
+
+    return indices, mask
+
+
+def evaluate_polynomial(coeffs: Sequence[int | float], values: NDArray[Any]) -> NDArray[Any]:
+    """Evaluate a polynomial whose coefficients are specified in
+    ascending order"""
+    return np.polyval(np.array(coeffs[::-1], dtype=np.float64), values.astype(np.float64))
+
+
+def linear_segments_internal_to_physical(values: ArrayLike, segments: Sequence["LinearSegment"]
+                                        ) -> ConversionResult | None:
+    """Convert internal values using piecewise linear segments
+
+    If the values or the limits of the segments are not numeric,
+    `None` is returned.
+    """
+    input_array = numeric_array(values)
+    if input_array is None or len(segments) == 0:
+        return None
+
+    selection = select_segments(input_array, [
+        (x.internal_lower_limit, x.internal_upper_limit) for x in segments
+    ])
+    if selection is None:
+        return None
+    indices, mask = selection
+    mask &= type_mask(input_array, segments[0].internal_type)
+
+    offsets = np.array([x.offset for x in segments], dtype=np.float64)[indices]
+    factors = np.array([x.factor for x in segments], dtype=np.float64)[indices]
+    denominators = np.array([x.denominator for x in segments], dtype=np.float64)[indices]
+
+    with np.errstate(all="ignore"):
+        result = (offsets + factors * input_array) / denominators
+
+    return finalize_result(result, mask, segments[0].physical_type)
+
+
+def linear_segments_physical_to_internal(values: ArrayLike, segments: Sequence["LinearSegment"]
+                                        ) -> ConversionResult | None:
+    """Convert physical values using the inverse of piecewise linear
+    segments
+
+    If the values or the limits of the segments are not numeric,
+    `None` is returned.
+    """
+    input_array = numeric_array(values)
+    if input_array is None or len(segments) == 0:
+        return None
+
+    selection = select_segments(input_array, [
+        (x.physical_lower_limit, x.physical_upper_limit) for x in segments
+    ])
+    if selection is None:
+        return None
+    indices, mask = selection
+    mask &= type_mask(input_array, segments[0].physical_type)
+
+    offsets = np.array([x.offset for x in segments], dtype=np.float64)[indices]
+    factors = np.array([x.factor for x in segments], dtype=np.float64)[indices]
+    denominators = np.array([x.denominator for x in segments], dtype=np.float64)[indices]
+    inverse_values = np.array([x.inverse_value for x in segments], dtype=np.float64)[indices]
+
+    with np.errstate(all="ignore"):
+        result = np.where(
+            np.abs(factors) < 1e-10, inverse_values,
+            (input_array * denominators - offsets) / factors)
+
+    return finalize_result(result, mask, segments[0].internal_type)
+
+
+def rat_func_segment_convert(values: ArrayLike,
+                             segment: "RatFuncSegment") -> ConversionResult | None:
+    """Apply the rational function of a segment to an array of values
+
+    If the values or the limits of the segment are not numeric,
+    `None` is returned.
+    """
+    input_array = numeric_array(values)
+    if input_array is None:
+        return None
+
+    selection = select_segments(input_array, [(segment.lower_limit, segment.upper_limit)])
+    if selection is None:
+        return None
+    _, mask = selection
+
+    with np.errstate(all="ignore"):
+        result = evaluate_polynomial(segment.numerator_coeffs, input_array) / \
+            evaluate_polynomial(segment.denominator_coeffs, input_array)
+
+    return finalize_result(result, mask, segment.value_type)
+
+
+def interpolate(values: ArrayLike, range_samples: Sequence[int | float],
+                domain_samples: Sequence[int | float], range_type: DataType,
+                domain_type: DataType) -> ConversionResult | None:
+    """Piecewise linearly interpolate an array of values
+
+    This requires the sampling points of the range to be in
+    ascending order. If this is not the case or if the values are not
+    numeric, `None` is returned.
+    """
+    input_array = numeric_array(values)
+    if input_array is None or len(range_samples) < 2:
+        return None
+
+    xp = np.array(range_samples, dtype=np.float64)
+    if not np.all(xp[:-1] <= xp[1:]):
+        return None
+
+    mask = type_mask(input_array, range_type) & (input_array >= xp[0]) & (input_array <= xp[-1])
+    result = np.interp(input_array, xp, np.array(domain_samples, dtype=np.float64))
+
+    return finalize_result(result, mask, domain_type, rounding=np.trunc)
@@ -1,6 +1,6 @@
 # SPDX-License-Identifier: MIT
 from dataclasses import dataclass
-from typing import Any
+from typing import TYPE_CHECKING, Any
 from xml.etree import ElementTree
 
 from ..exceptions import odxraise
@@ -12,6 +12,11 @@ from .compucategory import CompuCategory
 from .compuinternaltophys import CompuInternalToPhys
 from .compuphystointernal import CompuPhysToInternal
 
+if TYPE_CHECKING:
+    from numpy.typing import ArrayLike
+
+    from .arrayconversion import ConversionResult
+
 
 @dataclass(kw_only=True)
 class CompuMethod:
@@ -104,3 +109,65 @@ class CompuMethod:
 
     def is_valid_internal_value(self, internal_value: AtomicOdxType) -> bool:
         raise NotImplementedError()
+
+    def try_convert_physical_to_internal(self,
+                                         physical_value: AtomicOdxType) -> AtomicOdxType | None:
+        """Convert a physical value to its internal representation if
+        the value is valid
+
+        This is equivalent to checking the value using
+        `is_valid_physical_value()` and then calling
+        `convert_physical_to_internal()`, but compu methods may
+        implement it more efficiently. If the physical value is not
+        valid, `None` is returned.
+        """
+        if not self.is_valid_physical_value(physical_value):
+            return None
+
+        return self.convert_physical_to_internal(physical_value)
+
+    def try_convert_internal_to_physical(self,
+                                         internal_value: AtomicOdxType) -> AtomicOdxType | None:
+        """Convert an internal value to its physical representation if
+        the value is valid
+
+        This is equivalent to checking the value using
+        `is_valid_internal_value()` and then calling
+        `convert_internal_to_physical()`, but compu methods may
+        implement it more efficiently. If the internal value is not
+        valid, `None` is returned.
+        """
+        if not self.is_valid_internal_value(internal_value):
+            return None
+
+        return self.convert_internal_to_physical(internal_value)
+
+    def convert_internal_to_physical_array(self,
+                                           internal_values: "ArrayLike") -> "ConversionResult":
+        """Convert an array of internal values to physical values
+
+        This method requires NumPy. It returns a tuple consisting of
+        the array of physical values and a boolean mask which
+        specifies which of the internal values are valid. Invalid
+        values do not cause an exception to be raised; the
+        corresponding entries of the result array are undefined.
+        """
+        from .arrayconversion import convert_scalarwise
+
+        return convert_scalarwise(internal_values, self.try_convert_internal_to_physical,
+                                  self.physical_type)
+
+    def convert_physical_to_internal_array(self,
+                                           physical_values: "ArrayLike") -> "ConversionResult":
+        """Convert an array of physical values to internal values
+
+        This method requires NumPy. It returns a tuple consisting of
+        the array of internal values and a boolean mask which
+        specifies which of the physical values are valid. Invalid
+        values do not cause an exception to be raised; the
+        corresponding entries of the result array are undefined.
+        """
+        from .arrayconversion import convert_scalarwise
+
+        return convert_scalarwise(physical_values, self.try_convert_physical_to_internal,
+                                  self.internal_type)
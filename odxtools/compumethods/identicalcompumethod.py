@@ -1,5 +1,6 @@
 # SPDX-License-Identifier: MIT
 from dataclasses import dataclass
+from typing import TYPE_CHECKING
 from xml.etree import ElementTree
 
 from ..exceptions import odxassert
@@ -8,6 +9,11 @@ from ..odxtypes import AtomicOdxType, DataType
 from ..utils import dataclass_fields_asdict
 from .compumethod import CompuMethod
 
+if TYPE_CHECKING:
+    from numpy.typing import ArrayLike
+
+    from .arrayconversion import ConversionResult
+
 
 @dataclass(kw_only=True)
 class IdenticalCompuMethod(CompuMethod):
@@ -47,3 +53,23 @@ class IdenticalCompuMethod(CompuMethod):
 
     def is_valid_internal_value(self, internal_value: AtomicOdxType) -> bool:
         return self.internal_type.isinstance(internal_value)
+
+    def convert_internal_to_physical_array(self,
+                                           internal_values: "ArrayLike") -> "ConversionResult":
+        from .arrayconversion import finalize_result, numeric_array, type_mask
+
+        values = numeric_array(internal_values)
+        if values is None or self.physical_type != self.internal_type:
+            return super().convert_internal_to_physical_array(internal_values)
+
+        return finalize_result(values, type_mask(values, self.internal_type), self.physical_type)
+
+    def convert_physical_to_internal_array(self,
+                                           physical_values: "ArrayLike") -> "ConversionResult":
+        from .arrayconversion import finalize_result, numeric_array, type_mask
+
+        values = numeric_array(physical_values)
+        if values is None or self.physical_type != self.internal_type:
+            return super().convert_physical_to_internal_array(physical_values)
+
+        return finalize_result(values, type_mask(values, self.physical_type), self.internal_type)
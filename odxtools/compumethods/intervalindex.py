@@ -0,0 +1,84 @@
+# SPDX-License-Identifier: MIT
+import math
+from bisect import bisect_left
+from collections.abc import Iterable
+from typing import Generic, Optional, TypeVar
+
+from .intervaltype import IntervalType
+from .limit import Limit
+
+T = TypeVar("T")
+
+
+def _limit_to_bound(limit: Limit | None, unbounded_value: float) -> float | None:
+    if limit is None or limit.value is None or limit.interval_type == IntervalType.INFINITE:
+        return unbounded_value
+
+    value = limit.value
+    if not isinstance(value, (int, float)):
+        return None
+
+    return value
+
+
+def build_interval_index(limited_items: Iterable[tuple[Limit | None, Limit | None,
+                                                       T]]) -> Optional["IntervalIndex[T]"]:
+    """Create an index for items whose range is given by a lower and
+    an upper limit
+
+    Missing or infinite limits do not restrict the range. If the
+    value of any limit is not numeric, `None` is returned.
+    """
+    intervals = []
+    for lower_limit, upper_limit, item in limited_items:
+        lower = _limit_to_bound(lower_limit, -math.inf)
+        upper = _limit_to_bound(upper_limit, math.inf)
+        if lower is None or upper is None:
+            return None
+
+        intervals.append((lower, upper, item))
+
+    return IntervalIndex(intervals)
+
+
+class IntervalIndex(Generic[T]):
+    """Helper class to quickly find the segments or scales of a compu
+    method which may apply to a given numeric value
+
+    The index is constructed from `(lower bound, upper bound, item)`
+    tuples. `find()` returns all items whose interval contains a
+    value in the order in which they have been specified. Since all
+    intervals are treated as closed, callers must check if the
+    returned items actually apply to the value.
+    """
+
+    def __init__(self, intervals: Iterable[tuple[float, float, T]]) -> None:
+        intervals = list(intervals)
+
+        # the index splits the number line into the boundary points
+        # of the intervals and the gaps between them. gap `i` is
+        # located between boundary points `i-1` and `i`.
+        self._bounds = sorted({x for lower, upper, _ in intervals for x in (lower, upper)})
+        self._point_items: list[list[T]] = [[] for _ in self._bounds]
+        self._gap_items: list[list[T]] = [[] for _ in range(len(self._bounds) + 1)]
+
+        for lower, upper, item in intervals:
+            if lower > upper:
+                continue
+
+            lower_idx = bisect_left(self._bounds, lower)
+            upper_idx = bisect_left(self._bounds, upper)
+            for i in range(lower_idx, upper_idx + 1):
+                self._point_items[i].append(item)
+            for i in range(lower_idx + 1, upper_idx + 1):
+                self._gap_items[i].append(item)
+
+    def find(self, value: int | float) -> list[T]:
+        if math.isnan(value):
+            return []
+
+        idx = bisect_left(self._bounds, value)
+        if idx < len(self._bounds) and self._bounds[idx] == value:
+            return self._point_items[idx]
+
+        return self._gap_items[idx]
@@ -1,6 +1,6 @@
 # SPDX-License-Identifier: MIT
 from dataclasses import dataclass
-from typing import cast
+from typing import TYPE_CHECKING, cast
 from xml.etree import ElementTree
 
 from ..exceptions import DecodeError, EncodeError, odxassert, odxraise
@@ -11,6 +11,11 @@ from .compucategory import CompuCategory
 from .compumethod import CompuMethod
 from .linearsegment import LinearSegment
 
+if TYPE_CHECKING:
+    from numpy.typing import ArrayLike
+
+    from .arrayconversion import ConversionResult
+
 
 @dataclass(kw_only=True)
 class LinearCompuMethod(CompuMethod):
@@ -91,3 +96,23 @@ class LinearCompuMethod(CompuMethod):
 
     def is_valid_internal_value(self, internal_value: AtomicOdxType) -> bool:
         return self._segment.internal_applies(internal_value)
+
+    def convert_internal_to_physical_array(self,
+                                           internal_values: "ArrayLike") -> "ConversionResult":
+        from .arrayconversion import linear_segments_internal_to_physical
+
+        result = linear_segments_internal_to_physical(internal_values, [self._segment])
+        if result is None:
+            return super().convert_internal_to_physical_array(internal_values)
+
+        return result
+
+    def convert_physical_to_internal_array(self,
+                                           physical_values: "ArrayLike") -> "ConversionResult":
+        from .arrayconversion import linear_segments_physical_to_internal
+
+        result = linear_segments_physical_to_internal(physical_values, [self._segment])
+        if result is None:
+            return super().convert_physical_to_internal_array(physical_values)
+
+        return result
@@ -1,6 +1,6 @@
 # SPDX-License-Identifier: MIT
 from dataclasses import dataclass
-from typing import cast
+from typing import TYPE_CHECKING, cast
 from xml.etree import ElementTree
 
 from ..exceptions import DecodeError, EncodeError, odxassert, odxraise
@@ -11,6 +11,11 @@ from .compucategory import CompuCategory
 from .compumethod import CompuMethod
 from .ratfuncsegment import RatFuncSegment
 
+if TYPE_CHECKING:
+    from numpy.typing import ArrayLike
+
+    from .arrayconversion import ConversionResult
+
 
 @dataclass(kw_only=True)
 class RatFuncCompuMethod(CompuMethod):
@@ -105,3 +110,26 @@ class RatFuncCompuMethod(CompuMethod):
 
     def is_valid_internal_value(self, internal_value: AtomicOdxType) -> bool:
         return self._int_to_phys_segment.applies(internal_value)
+
+    def convert_internal_to_physical_array(self,
+                                           internal_values: "ArrayLike") -> "ConversionResult":
+        from .arrayconversion import rat_func_segment_convert
+
+        result = rat_func_segment_convert(internal_values, self._int_to_phys_segment)
+        if result is None:
+            return super().convert_internal_to_physical_array(internal_values)
+
+        return result
+
+    def convert_physical_to_internal_array(self,
+                                           physical_values: "ArrayLike") -> "ConversionResult":
+        from .arrayconversion import rat_func_segment_convert
+
+        if self._phys_to_int_segment is None:
+            return super().convert_physical_to_internal_array(physical_values)
+
+        result = rat_func_segment_convert(physical_values, self._phys_to_int_segment)
+        if result is None:
+            return super().convert_physical_to_internal_array(physical_values)
+
+        return result
@@ -1,6 +1,6 @@
 # SPDX-License-Identifier: MIT
 from dataclasses import dataclass
-from typing import cast
+from typing import TYPE_CHECKING, cast
 from xml.etree import ElementTree
 
 from ..exceptions import DecodeError, EncodeError, odxassert, odxraise
@@ -9,9 +9,15 @@ from ..odxtypes import AtomicOdxType, DataType
 from ..utils import dataclass_fields_asdict
 from .compucategory import CompuCategory
 from .compumethod import CompuMethod
+from .intervalindex import IntervalIndex, build_interval_index
 from .intervaltype import IntervalType
 from .linearsegment import LinearSegment
 
+if TYPE_CHECKING:
+    from numpy.typing import ArrayLike
+
+    from .arrayconversion import ConversionResult
+
 
 @dataclass(kw_only=True)
 class ScaleLinearCompuMethod(CompuMethod):
@@ -36,6 +42,8 @@ class ScaleLinearCompuMethod(CompuMethod):
 
     def __post_init__(self) -> None:
         self._segments: list[LinearSegment] = []
+        self._internal_segment_index: IntervalIndex[LinearSegment] | None = None
+        self._physical_segment_index: IntervalIndex[LinearSegment] | None = None
 
         odxassert(self.category == CompuCategory.SCALE_LINEAR,
                   "ScaleLinearCompuMethod must exibit SCALE-LINEAR category")
@@ -64,6 +72,11 @@ class ScaleLinearCompuMethod(CompuMethod):
                 LinearSegment.from_compu_scale(
                     scale, internal_type=self.internal_type, physical_type=self.physical_type))
 
+        self._internal_segment_index = build_interval_index(
+            (seg.internal_lower_limit, seg.internal_upper_limit, seg) for seg in self._segments)
+        self._physical_segment_index = build_interval_index(
+            (seg.physical_lower_limit, seg.physical_upper_limit, seg) for seg in self._segments)
+
         # find out if the transfer function is invertible (i.e. if it
         # can be encoded by normal means). section 7.3.6.6.4 of the
         # ODX specification states that the condition for
@@ -111,36 +124,89 @@ class ScaleLinearCompuMethod(CompuMethod):
                 self._is_invertible = False
                 break
 
+    def _find_internal_segment(self, internal_value: AtomicOdxType) -> LinearSegment | None:
+        candidates = self._segments
+        if self._internal_segment_index is not None and isinstance(internal_value, (int, float)):
+            candidates = self._internal_segment_index.find(internal_value)
+
+        return next((seg for seg in candidates if seg.internal_applies(internal_value)), None)
+
+    def _find_physical_segment(self, physical_value: AtomicOdxType) -> LinearSegment | None:
+        candidates = self._segments
+        if self._physical_segment_index is not None and isinstance(physical_value, (int, float)):
+            candidates = self._physical_segment_index.find(physical_value)
+
+        return next((seg for seg in candidates if seg.physical_applies(physical_value)), None)
+
     def convert_physical_to_internal(self, physical_value: AtomicOdxType) -> float | int:
         if not self._is_invertible:
             odxraise(
                 f"Trying to encode value {physical_value!r} using a non-invertible "
                 f"SCALE-LINEAR transfer function", EncodeError)
 
-        applicable_segments = [
-            seg for seg in self._segments if seg.physical_applies(physical_value)
-        ]
-        if not applicable_segments:
+        seg = self._find_physical_segment(physical_value)
+        if seg is None:
             odxraise(r"No applicable segment for value {physical_value} found", EncodeError)
             return cast(int, None)
 
-        seg = applicable_segments[0]
-
         return seg.convert_physical_to_internal(physical_value)
 
     def convert_internal_to_physical(self, internal_value: AtomicOdxType) -> float | int:
-        applicable_segments = [
-            seg for seg in self._segments if seg.internal_applies(internal_value)
-        ]
-        if not applicable_segments:
+        seg = self._find_internal_segment(internal_value)
+        if seg is None:
             odxraise(r"No applicable segment for value {internal_value} found", DecodeError)
             return cast(int, None)
 
-        seg = applicable_segments[0]
         return seg.convert_internal_to_physical(internal_value)
 
     def is_valid_physical_value(self, physical_value: AtomicOdxType) -> bool:
-        return any(True for seg in self._segments if seg.physical_applies(physical_value))
+        return self._find_physical_segment(physical_value) is not None
 
     def is_valid_internal_value(self, internal_value: AtomicOdxType) -> bool:
-        return any(True for seg in self._segments if seg.internal_applies(internal_value))
+        return self._find_internal_segment(internal_value) is not None
+
+    def try_convert_physical_to_internal(self,
+                                         physical_value: AtomicOdxType) -> AtomicOdxType | None:
+        seg = self._find_physical_segment(physical_value)
+        if seg is None:
+            return None
+
+        if not self._is_invertible:
+            odxraise(
+                f"Trying to encode value {physical_value!r} using a non-invertible "
+                f"SCALE-LINEAR transfer function", EncodeError)
+
+        return seg.convert_physical_to_internal(physical_value)
+
+    def try_convert_internal_to_physical(self,
+                                         internal_value: AtomicOdxType) -> AtomicOdxType | None:
+        seg = self._find_internal_segment(internal_value)
+        if seg is None:
+            return None
+
+        return seg.convert_internal_to_physical(internal_value)
+
+    def convert_internal_to_physical_array(self,
+                                           internal_values: "ArrayLike") -> "ConversionResult":
+        from .arrayconversion import linear_segments_internal_to_physical
+
+        result = linear_segments_internal_to_physical(internal_values, self._segments)
+        if result is None:
+            return super().convert_internal_to_physical_array(internal_values)
+
+        return result
+
+    def convert_physical_to_internal_array(self,
+                                           physical_values: "ArrayLike") -> "ConversionResult":
+        from .arrayconversion import linear_segments_physical_to_internal
+
+        if not self._is_invertible:
+            odxraise(
+                "Trying to encode values using a non-invertible "
+                "SCALE-LINEAR transfer function", EncodeError)
+
+        result = linear_segments_physical_to_internal(physical_values, self._segments)
+        if result is None:
+            return super().convert_physical_to_internal_array(physical_values)
+
+        return result
@@ -9,6 +9,7 @@ from ..odxtypes import AtomicOdxType, DataType
 from ..utils import dataclass_fields_asdict
 from .compucategory import CompuCategory
 from .compumethod import CompuMethod
+from .intervalindex import IntervalIndex, build_interval_index
 from .ratfuncsegment import RatFuncSegment
 
 
@@ -38,6 +39,9 @@ class ScaleRatFuncCompuMethod(CompuMethod):
         return ScaleRatFuncCompuMethod(**kwargs)
 
     def __post_init__(self) -> None:
+        self._int_to_phys_segment_index: IntervalIndex[RatFuncSegment] | None = None
+        self._phys_to_int_segment_index: IntervalIndex[RatFuncSegment] | None = None
+
         odxassert(self.category == CompuCategory.SCALE_RAT_FUNC,
                   "ScaleRatFuncCompuMethod must exhibit SCALE-RAT-FUNC category")
 
@@ -68,6 +72,8 @@ class ScaleRatFuncCompuMethod(CompuMethod):
             RatFuncSegment.from_compu_scale(scale, value_type=self.physical_type)
             for scale in int_to_phys_scales
         ]
+        self._int_to_phys_segment_index = build_interval_index(
+            (seg.lower_limit, seg.upper_limit, seg) for seg in self._int_to_phys_segments)
 
         self._phys_to_int_segments = None
         if self.compu_phys_to_internal is not None:
@@ -81,34 +87,68 @@ class ScaleRatFuncCompuMethod(CompuMethod):
                 RatFuncSegment.from_compu_scale(scale, value_type=self.internal_type)
                 for scale in phys_to_int_scales
             ]
+            self._phys_to_int_segment_index = build_interval_index(
+                (seg.lower_limit, seg.upper_limit, seg) for seg in self._phys_to_int_segments)
+
+    @staticmethod
+    def _find_segment(value: AtomicOdxType, segments: list[RatFuncSegment],
+                      index: IntervalIndex[RatFuncSegment] | None) -> RatFuncSegment | None:
+        candidates = segments
+        if index is not None and isinstance(value, (int, float)):
+            candidates = index.find(value)
+
+        return next((seg for seg in candidates if seg.applies(value)), None)
 
     def convert_internal_to_physical(self, internal_value: AtomicOdxType) -> AtomicOdxType:
-        for seg in self._int_to_phys_segments:
-            if seg.applies(internal_value):
-                return seg.convert(internal_value)
+        result = self.try_convert_internal_to_physical(internal_value)
+        if result is None:
+            odxraise(f"Internal value {internal_value!r} be decoded using this compumethod",
+                     DecodeError)
+            return cast(AtomicOdxType, None)
 
-        odxraise(f"Internal value {internal_value!r} be decoded using this compumethod",
-                 DecodeError)
-        return cast(AtomicOdxType, None)
+        return result
 
     def convert_physical_to_internal(self, physical_value: AtomicOdxType) -> AtomicOdxType:
         if self._phys_to_int_segments is None:
             odxraise(f"Physical values cannot be encoded using this compumethod", EncodeError)
             return cast(AtomicOdxType, None)
 
-        for seg in self._phys_to_int_segments:
-            if seg.applies(physical_value):
-                return seg.convert(physical_value)
+        result = self.try_convert_physical_to_internal(physical_value)
+        if result is None:
+            odxraise(f"Physical values {physical_value!r} be decoded using this compumethod",
+                     EncodeError)
+            return cast(AtomicOdxType, None)
 
-        odxraise(f"Physical values {physical_value!r} be decoded using this compumethod",
-                 EncodeError)
-        return cast(AtomicOdxType, None)
+        return result
 
     def is_valid_internal_value(self, internal_value: AtomicOdxType) -> bool:
-        return any(seg.applies(internal_value) for seg in self._int_to_phys_segments)
+        return self._find_segment(internal_value, self._int_to_phys_segments,
+                                  self._int_to_phys_segment_index) is not None
 
     def is_valid_physical_value(self, physical_value: AtomicOdxType) -> bool:
         if self._phys_to_int_segments is None:
             return False
 
-        return any(seg.applies(physical_value) for seg in self._phys_to_int_segments)
+        return self._find_segment(physical_value, self._phys_to_int_segments,
+                                  self._phys_to_int_segment_index) is not None
+
+    def try_convert_internal_to_physical(self,
+                                         internal_value: AtomicOdxType) -> AtomicOdxType | None:
+        seg = self._find_segment(internal_value, self._int_to_phys_segments,
+                                 self._int_to_phys_segment_index)
+        if seg is None:
+            return None
+
+        return seg.convert(internal_value)
+
+    def try_convert_physical_to_internal(self,
+                                         physical_value: AtomicOdxType) -> AtomicOdxType | None:
+        if self._phys_to_int_segments is None:
+            return None
+
+        seg = self._find_segment(physical_value, self._phys_to_int_segments,
+                                 self._phys_to_int_segment_index)
+        if seg is None:
+            return None
+
+        return seg.convert(physical_value)
@@ -1,5 +1,7 @@
 # SPDX-License-Identifier: MIT
+from bisect import bisect_left
 from dataclasses import dataclass
+from typing import TYPE_CHECKING
 from xml.etree import ElementTree
 
 from ..exceptions import DecodeError, EncodeError, odxassert, odxraise, odxrequire
@@ -11,6 +13,11 @@ from .compumethod import CompuMethod
 from .intervaltype import IntervalType
 from .limit import Limit
 
+if TYPE_CHECKING:
+    from numpy.typing import ArrayLike
+
+    from .arrayconversion import ConversionResult
+
 
 @dataclass(kw_only=True)
 class TabIntpCompuMethod(CompuMethod):
@@ -89,24 +96,34 @@ class TabIntpCompuMethod(CompuMethod):
             self._internal_points.append(internal_point)
             self._physical_points.append(physical_point)
 
+        self._min_internal_point = min(self._internal_points)
+        self._max_internal_point = max(self._internal_points)
+        self._min_physical_point = min(self._physical_points)
+        self._max_physical_point = max(self._physical_points)
+
         self._physical_lower_limit = Limit(
-            value_raw=str(min(self._physical_points)),
+            value_raw=str(self._min_physical_point),
             value_type=self.physical_type,
             interval_type=IntervalType.CLOSED)
         self._physical_upper_limit = Limit(
-            value_raw=str(max(self._physical_points)),
+            value_raw=str(self._max_physical_point),
             value_type=self.physical_type,
             interval_type=IntervalType.CLOSED)
 
         self._internal_lower_limit = Limit(
-            value_raw=str(min(self._internal_points)),
+            value_raw=str(self._min_internal_point),
             value_type=self.internal_type,
             interval_type=IntervalType.CLOSED)
         self._internal_upper_limit = Limit(
-            value_raw=str(max(self._internal_points)),
+            value_raw=str(self._max_internal_point),
             value_type=self.internal_type,
             interval_type=IntervalType.CLOSED)
 
+        # the interpolation intervals can be found by means of
+        # bisection if the sampling points are in ascending order
+        self._internal_points_sorted = _is_ascending(self._internal_points)
+        self._physical_points_sorted = _is_ascending(self._physical_points)
+
         self.__assert_validity()
 
     def __assert_validity(self) -> None:
@@ -130,7 +147,26 @@ class TabIntpCompuMethod(CompuMethod):
             " [A_INT32, A_UINT32, A_FLOAT32, A_FLOAT64]")
 
     def __piecewise_linear_interpolate(self, x: int | float, range_samples: list[int | float],
-                                       domain_samples: list[int | float]) -> float | None:
+                                       domain_samples: list[int | float],
+                                       samples_sorted: bool) -> float | None:
+        if samples_sorted:
+            # the first interval which contains x is the one which
+            # ends at the first sampling point that is larger or equal
+            # to x
+            idx = bisect_left(range_samples, x)
+            if idx >= len(range_samples) or len(range_samples) < 2:
+                return None
+            elif idx == 0:
+                if x < range_samples[0]:
+                    return None
+                idx = 1
+
+            x0 = range_samples[idx - 1]
+            x1 = range_samples[idx]
+            y0 = domain_samples[idx - 1]
+            y1 = domain_samples[idx]
+            return y0 + (x - x0) * (y1 - y0) / (x1 - x0)
+
         for i in range(0, len(range_samples) - 1):
             if (x0 := range_samples[i]) <= x and x <= (x1 := range_samples[i + 1]):
                 y0 = domain_samples[i]
@@ -149,12 +185,13 @@ class TabIntpCompuMethod(CompuMethod):
             isinstance(physical_value, (int, float)),
             "Only integers and floats can be piecewise linearly interpolated", EncodeError)
         result = self.__piecewise_linear_interpolate(physical_value, self._physical_points,
-                                                     self._internal_points)
+                                                     self._internal_points,
+                                                     self._physical_points_sorted)
 
         if result is None:
             odxraise(
                 f"Internal value {physical_value!r} must be inside the range"
-                f" [{min(self.physical_points)}, {max(self.physical_points)}]", EncodeError)
+                f" [{self._min_physical_point}, {self._max_physical_point}]", EncodeError)
 
         res = self.internal_type.make_from(result)
 
@@ -172,12 +209,13 @@ class TabIntpCompuMethod(CompuMethod):
             "Only integers and floats can be piecewise linearly interpolated", DecodeError)
 
         result = self.__piecewise_linear_interpolate(internal_value, self._internal_points,
-                                                     self._physical_points)
+                                                     self._physical_points,
+                                                     self._internal_points_sorted)
 
         if result is None:
             odxraise(
                 f"Internal value {internal_value!r} must be inside the range"
-                f" [{min(self.internal_points)}, {max(self.internal_points)}]", DecodeError)
+                f" [{self._min_internal_point}, {self._max_internal_point}]", DecodeError)
             return None
 
         res = self.physical_type.make_from(result)
@@ -188,12 +226,66 @@ class TabIntpCompuMethod(CompuMethod):
         if not isinstance(physical_value, (int, float)):
             return False
 
-        return min(self.physical_points) <= physical_value and physical_value <= max(
-            self.physical_points)
+        return self._min_physical_point <= physical_value and \
+            physical_value <= self._max_physical_point
 
     def is_valid_internal_value(self, internal_value: AtomicOdxType) -> bool:
         if not isinstance(internal_value, (int, float)):
             return False
 
-        return min(self.internal_points) <= internal_value and internal_value <= max(
-            self.internal_points)
+        return self._min_internal_point <= internal_value and \
+            internal_value <= self._max_internal_point
+
+    def try_convert_physical_to_internal(self,
+                                         physical_value: AtomicOdxType) -> AtomicOdxType | None:
+        if not self.is_valid_physical_value(physical_value):
+            return None
+
+        assert isinstance(physical_value, (int, float))
+        result = self.__piecewise_linear_interpolate(physical_value, self._physical_points,
+                                                     self._internal_points,
+                                                     self._physical_points_sorted)
+        if result is None:
+            return None
+
+        return self.internal_type.make_from(result)
+
+    def try_convert_internal_to_physical(self,
+                                         internal_value: AtomicOdxType) -> AtomicOdxType | None:
+        if not self.is_valid_internal_value(internal_value):
+            return None
+
+        assert isinstance(internal_value, (int, float))
+        result = self.__piecewise_linear_interpolate(internal_value, self._internal_points,
+                                                     self._physical_points,
+                                                     self._internal_points_sorted)
+        if result is None:
+            return None
+
+        return self.physical_type.make_from(result)
+
+    def convert_internal_to_physical_array(self,
+                                           internal_values: "ArrayLike") -> "ConversionResult":
+        from .arrayconversion import interpolate
+
+        result = interpolate(internal_values, self._internal_points, self._physical_points,
+                             self.internal_type, self.physical_type)
+        if result is None:
+            return super().convert_internal_to_physical_array(internal_values)
+
+        return result
+
+    def convert_physical_to_internal_array(self,
+                                           physical_values: "ArrayLike") -> "ConversionResult":
+        from .arrayconversion import interpolate
+
+        result = interpolate(physical_values, self._physical_points, self._internal_points,
+                             self.physical_type, self.internal_type)
+        if result is None:
+            return super().convert_physical_to_internal_array(physical_values)
+
+        return result
+
+
+def _is_ascending(points: list[int | float]) -> bool:
+    return all(points[i] <= points[i + 1] for i in range(len(points) - 1))
@@ -1,6 +1,7 @@
 # SPDX-License-Identifier: MIT
+from collections.abc import Hashable
 from dataclasses import dataclass
-from typing import cast
+from typing import TYPE_CHECKING, cast
 from xml.etree import ElementTree
 
 from ..exceptions import DecodeError, EncodeError, odxassert, odxraise, odxrequire
@@ -10,6 +11,12 @@ from ..utils import dataclass_fields_asdict
 from .compucategory import CompuCategory
 from .compumethod import CompuMethod
 from .compuscale import CompuScale
+from .intervalindex import build_interval_index
+
+if TYPE_CHECKING:
+    from numpy.typing import ArrayLike
+
+    from .arrayconversion import ConversionResult
 
 
 @dataclass(kw_only=True)
@@ -63,14 +70,71 @@ class TexttableCompuMethod(CompuMethod):
         if cpti is not None and (cdv := cpti.compu_default_value) is not None:
             self._compu_internal_default_value = self.internal_type.from_string(odxrequire(cdv.v))
 
-    def convert_physical_to_internal(self, physical_value: AtomicOdxType) -> AtomicOdxType:
-        scales = []
-        if (citp := self.compu_internal_to_phys) is not None:
-            scales = citp.compu_scales
-        matching_scales = [
-            x for x in scales if x.compu_const is not None and x.compu_const.value == physical_value
-        ]
+        # build the lookup structures for the scales: scales which
+        # specify only one limit apply to exactly this value, whilst
+        # the remaining ones apply to a range of values.
+        self._scales = scales
+        self._internal_point_scales: dict[Hashable, list[CompuScale]] = {}
+        self._internal_range_scales: list[CompuScale] = []
+        self._physical_scales: dict[Hashable, list[CompuScale]] = {}
+        for scale in scales:
+            if scale.lower_limit is not None and scale.upper_limit is None:
+                point = scale.lower_limit.value
+            elif scale.lower_limit is None and scale.upper_limit is not None:
+                point = scale.upper_limit.value
+            else:
+                self._internal_range_scales.append(scale)
+                point = None
+
+            if isinstance(point, bytearray):
+                point = bytes(point)
+            if point is not None and isinstance(point, Hashable):
+                self._internal_point_scales.setdefault(point, []).append(scale)
+            elif point is not None:
+                self._internal_range_scales.append(scale)
+
+            if scale.compu_const is not None:
+                physical_value = scale.compu_const.value
+                if isinstance(physical_value, bytearray):
+                    physical_value = bytes(physical_value)
+                if isinstance(physical_value, Hashable):
+                    self._physical_scales.setdefault(physical_value, []).append(scale)
+
+        self._internal_range_index = build_interval_index(
+            (x.lower_limit, x.upper_limit, x) for x in self._internal_range_scales)
+
+    def _find_physical_scales(self, physical_value: AtomicOdxType) -> list[CompuScale]:
+        """Return the scales which map to a given physical value"""
+        key = bytes(physical_value) if isinstance(physical_value, bytearray) else physical_value
+        if not isinstance(key, Hashable):
+            return [
+                x for x in self._scales
+                if x.compu_const is not None and x.compu_const.value == physical_value
+            ]
+
+        return self._physical_scales.get(key, [])
+
+    def _find_internal_scales(self, internal_value: AtomicOdxType) -> list[CompuScale]:
+        """Return the scales which apply to a given internal value"""
+        key = bytes(internal_value) if isinstance(internal_value, bytearray) else internal_value
+        if not isinstance(key, Hashable):
+            return [x for x in self._scales if x.applies(internal_value)]
+
+        candidates = self._internal_point_scales.get(key, [])
+        if self._internal_range_index is not None and isinstance(internal_value, (int, float)):
+            candidates = candidates + self._internal_range_index.find(internal_value)
+        else:
+            candidates = candidates + self._internal_range_scales
 
+        result = [x for x in candidates if x.applies(internal_value)]
+        if len(result) > 1:
+            # restore the order in which the scales are defined
+            result = [x for x in self._scales if any(x is y for y in result)]
+
+        return result
+
+    def _convert_physical_to_internal(self, physical_value: AtomicOdxType,
+                                      matching_scales: list[CompuScale]) -> AtomicOdxType:
         if len(matching_scales) == 0:
             if self._compu_internal_default_value is None:
                 odxraise(f"Texttable could not encode {physical_value!r}.", EncodeError)
@@ -91,12 +155,8 @@ class TexttableCompuMethod(CompuMethod):
 
         odxraise(f"Texttable compu method could not encode '{physical_value!r}'.", EncodeError)
 
-    def convert_internal_to_physical(self, internal_value: AtomicOdxType) -> AtomicOdxType:
-        scales = []
-        if (citp := self.compu_internal_to_phys) is not None:
-            scales = citp.compu_scales
-        matching_scales: list[CompuScale] = [x for x in scales if x.applies(internal_value)]
-
+    def _convert_internal_to_physical(self, internal_value: AtomicOdxType,
+                                      matching_scales: list[CompuScale]) -> AtomicOdxType:
         if len(matching_scales) == 0:
             if self._compu_physical_default_value is None:
                 odxraise(f"Texttable could not decode {internal_value!r}.", DecodeError)
@@ -118,24 +178,60 @@ class TexttableCompuMethod(CompuMethod):
 
         odxraise(f"Texttable compu method could not decode '{internal_value!r}'.", EncodeError)
 
+    def convert_physical_to_internal(self, physical_value: AtomicOdxType) -> AtomicOdxType:
+        return self._convert_physical_to_internal(physical_value,
+                                                  self._find_physical_scales(physical_value))
+
+    def convert_internal_to_physical(self, internal_value: AtomicOdxType) -> AtomicOdxType:
+        return self._convert_internal_to_physical(internal_value,
+                                                  self._find_internal_scales(internal_value))
+
     def is_valid_physical_value(self, physical_value: AtomicOdxType) -> bool:
         if self._compu_physical_default_value is not None:
             return True
 
-        scales = []
-        if (cpti := self.compu_internal_to_phys) is not None:
-            scales = cpti.compu_scales
-
-        return any(scale.compu_const.value == physical_value
-                   for scale in scales
-                   if scale.compu_const is not None)
+        return len(self._find_physical_scales(physical_value)) > 0
 
     def is_valid_internal_value(self, internal_value: AtomicOdxType) -> bool:
         if self._compu_internal_default_value is not None:
             return True
 
-        scales = []
-        if (citp := self.compu_internal_to_phys) is not None:
-            scales = citp.compu_scales
-
-        return any(scale.applies(internal_value) for scale in scales)
+        return len(self._find_internal_scales(internal_value)) > 0
+
+    def try_convert_physical_to_internal(self,
+                                         physical_value: AtomicOdxType) -> AtomicOdxType | None:
+        matching_scales = self._find_physical_scales(physical_value)
+        if len(matching_scales) == 0 and self._compu_physical_default_value is None:
+            return None
+
+        return self._convert_physical_to_internal(physical_value, matching_scales)
+
+    def try_convert_internal_to_physical(self,
+                                         internal_value: AtomicOdxType) -> AtomicOdxType | None:
+        matching_scales = self._find_internal_scales(internal_value)
+        if len(matching_scales) == 0 and self._compu_internal_default_value is None:
+            return None
+
+        return self._convert_internal_to_physical(internal_value, matching_scales)
+
+    def convert_internal_to_physical_array(self,
+                                           internal_values: "ArrayLike") -> "ConversionResult":
+        from .arrayconversion import convert_scalarwise
+
+        # texttables map categories: each distinct value only needs
+        # to be looked up once
+        return convert_scalarwise(
+            internal_values,
+            self.try_convert_internal_to_physical,
+            self.physical_type,
+            categorical=True)
+
+    def convert_physical_to_internal_array(self,
+                                           physical_values: "ArrayLike") -> "ConversionResult":
+        from .arrayconversion import convert_scalarwise
+
+        return convert_scalarwise(
+            physical_values,
+            self.try_convert_physical_to_internal,
+            self.internal_type,
+            categorical=True)
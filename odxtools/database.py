@@ -27,6 +27,7 @@ from .flash import Flash
 from .functiondictionary import FunctionDictionary
 from .multipleecujobspec import MultipleEcuJobSpec
 from .nameditemlist import NamedItemList
+from .networkindex import NetworkIndex
 from .odxdoccontext import OdxDocContext
 from .odxlink import DocType, OdxDocFragment, OdxLinkDatabase, OdxLinkId
 from .snrefcontext import SnRefContext
@@ -54,6 +55,7 @@ class Database:
         self._multiple_ecu_job_specs = NamedItemList[MultipleEcuJobSpec]()
         self._function_dictionaries = NamedItemList[FunctionDictionary]()
         self._short_name = "odx_database"
+        self._network_index: NetworkIndex | None = None
 
     def add_pdx_file(self, pdx_file: Union[str, "PathLike[Any]", IO[bytes], ZipFile]) -> None:
         """Add PDX file to database.
@@ -156,6 +158,9 @@ class Database:
         if use_weakrefs is None:
             use_weakrefs = self.use_weakrefs
 
+        # the network index needs to be rebuilt on demand
+        self._network_index = None
+
         # Create wrapper objects
         self._diag_layers = NamedItemList(
             chain(*[dlc.diag_layers for dlc in self.diag_layer_containers]))
@@ -360,6 +365,21 @@ class Database:
     def function_dictionaries(self) -> NamedItemList[FunctionDictionary]:
         return self._function_dictionaries
 
+    def network_index(self) -> NetworkIndex:
+        """Return the index which maps the CAN IDs and DoIP addresses
+        of the base and ECU variants to the variants
+
+        The index is built on the first call and reused until the
+        database is refreshed.
+        """
+        if (result := getattr(self, "_network_index", None)) is None:
+            result = NetworkIndex(
+                chain(self.base_variants, self.ecu_variants),
+                vehicle_info_specs=self.vehicle_info_specs)
+            self._network_index = result
+
+        return result
+
     def __getstate__(self) -> dict[str, Any]:
         """Returns a pickleable state of the database object
 
@@ -368,6 +388,7 @@ class Database:
 
         result = copy(self.__dict__)
         result["auxiliary_files"] = copy(result["auxiliary_files"])
+        result["_network_index"] = None
 
         # replace the contents of the auxiliary files by their content
         for file_name in result["auxiliary_files"]:
@@ -112,7 +112,10 @@ class DataObjectProperty(DopBase):
         """
         Convert a physical representation of a parameter to a string bytes that can be send over the wire
         """
-        if not self.is_valid_physical_value(physical_value):
+        # check the validity of the value and convert it in one go
+        internal_value = self.compu_method.try_convert_physical_to_internal(
+            cast(AtomicOdxType, physical_value))
+        if internal_value is None:
             raise EncodeError(
                 f"The value {repr(physical_value)} of type {type(physical_value).__name__}"
                 f" is not a valid.")
@@ -121,7 +124,6 @@ class DataObjectProperty(DopBase):
             odxraise(f"Invalid type '{type(physical_value).__name__}' for physical value. "
                      f"(Expect atomic type!)")
             return
-        internal_value = self.compu_method.convert_physical_to_internal(physical_value)
         self.diag_coded_type.encode_into_pdu(internal_value, encode_state)
 
     def decode_from_pdu(self, decode_state: DecodeState) -> ParameterValue:
@@ -132,8 +134,13 @@ class DataObjectProperty(DopBase):
         """
         internal = self.diag_coded_type.decode_from_pdu(decode_state)
 
-        if self.compu_method.is_valid_internal_value(internal):
-            return self.compu_method.convert_internal_to_physical(internal)
+        return self._convert_internal_to_physical(internal)
+
+    def _convert_internal_to_physical(self, internal: AtomicOdxType) -> ParameterValue:
+        """Convert an internal value that has been extracted from a
+        PDU into its physical representation"""
+        if (physical := self.compu_method.try_convert_internal_to_physical(internal)) is not None:
+            return physical
 
         internal_to_phys = self.compu_method.compu_internal_to_phys
         default_value = internal_to_phys.compu_default_value if internal_to_phys else None
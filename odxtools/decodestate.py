@@ -2,8 +2,9 @@
 from dataclasses import dataclass, field
 from typing import TYPE_CHECKING
 
+from . import exceptions
 from .encoding import Encoding, get_string_encoding
-from .exceptions import DecodeError, odxassert, odxraise, strict_mode
+from .exceptions import DecodeError, odxassert, odxraise
 from .odxtypes import AtomicOdxType, DataType, ParameterValue
 
 try:
@@ -51,6 +52,25 @@ class DecodeState:
     #: other parameters; i.e., environment data description parameters
     journal: list[tuple["Parameter", ParameterValue | None]] = field(default_factory=list)
 
+    #: If true, the values of fields are returned as a dictionary
+    #: that maps the short names of the parameters of their items to
+    #: the list of the respective values ("columnar" layout) instead
+    #: of as a list of dictionaries
+    columnar_fields: bool = False
+
+    #: The most recently decoded parameters and their values, indexed
+    #: by the short name of the parameter
+    #:
+    #: This allows to quickly look up the value of a parameter which is
+    #: referenced by another one without scanning the journal.
+    param_values: dict[str, tuple["Parameter", ParameterValue | None]] = field(default_factory=dict)
+
+    def record_param_value(self, param: "Parameter", value: ParameterValue | None) -> None:
+        """Add the value of a parameter which has been decoded to the
+        journal"""
+        self.journal.append((param, value))
+        self.param_values[param.short_name] = (param, value)
+
     def extract_atomic_value(
         self,
         *,
@@ -103,9 +123,10 @@ class DecodeState:
 
         # Deal with raw byte fields, ...
         if base_data_type == DataType.A_BYTEFIELD:
-            odxassert(
-                base_type_encoding in (None, Encoding.NONE, Encoding.BCD_P, Encoding.BCD_UP),
-                f"Illegal encoding '{base_type_encoding}' for A_BYTEFIELD")
+            if exceptions.hot_path_checks:
+                odxassert(
+                    base_type_encoding in (None, Encoding.NONE, Encoding.BCD_P, Encoding.BCD_UP),
+                    lambda: f"Illegal encoding '{base_type_encoding}' for A_BYTEFIELD")
 
             # note that we do not ensure that BCD-encoded byte fields
             # only represent "legal" values
@@ -114,7 +135,7 @@ class DecodeState:
         # ... string types, ...
         elif base_data_type in (DataType.A_UTF8STRING, DataType.A_ASCIISTRING,
                                 DataType.A_UNICODE2STRING):
-            text_errors = 'strict' if strict_mode else 'replace'
+            text_errors = 'strict' if exceptions.strict_mode else 'replace'
             str_encoding = get_string_encoding(base_data_type, base_type_encoding,
                                                is_highlow_byte_order)
             if str_encoding is not None:
@@ -181,10 +202,11 @@ class DecodeState:
 
         # ... and others (floating point values)
         else:
-            odxassert(base_data_type in (DataType.A_FLOAT32, DataType.A_FLOAT64))
-            odxassert(
-                base_type_encoding in (None, Encoding.NONE),
-                f"Specified illegal encoding '{base_type_encoding}' for float object")
+            if exceptions.hot_path_checks:
+                odxassert(base_data_type in (DataType.A_FLOAT32, DataType.A_FLOAT64))
+                odxassert(
+                    base_type_encoding in (None, Encoding.NONE),
+                    lambda: f"Specified illegal encoding '{base_type_encoding}' for float object")
 
             internal_value = float(raw_value)
 
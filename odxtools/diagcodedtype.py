@@ -95,7 +95,7 @@ class DiagCodedType:
 
             byte_length = len(bytes(internal_value, "utf-16-le"))
             odxassert(
-                byte_length % 2 == 0, f"The bit length of A_UNICODE2STRING must"
+                byte_length % 2 == 0, lambda: f"The bit length of A_UNICODE2STRING must"
                 f" be a multiple of 16 but is {8*byte_length}")
 
         return byte_length
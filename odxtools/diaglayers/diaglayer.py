@@ -7,9 +7,11 @@ from itertools import chain
 from typing import Any, Union, cast
 from xml.etree import ElementTree
 
+from .. import exceptions
 from ..additionalaudience import AdditionalAudience
 from ..admindata import AdminData
 from ..companydata import CompanyData
+from ..compositecodec import composite_codec_constants_match, composite_codec_verify_constants
 from ..description import Description
 from ..diagcomm import DiagComm
 from ..diagdatadictionaryspec import DiagDataDictionarySpec
@@ -23,7 +25,7 @@ from ..odxdoccontext import OdxDocContext
 from ..odxlink import OdxLinkDatabase, OdxLinkId, OdxLinkRef
 from ..parentref import ParentRef
 from ..request import Request
-from ..response import Response
+from ..response import Response, ResponseType
 from ..servicebinner import ServiceBinner
 from ..singleecujob import SingleEcuJob
 from ..snrefcontext import SnRefContext
@@ -36,6 +38,12 @@ from .diaglayertype import DiagLayerType
 
 PrefixTree = dict[int, Union[list[DiagService], "PrefixTree"]]
 
+#: Index of the responses which may be received in reply to a
+#: request. The index maps the length of the coded constant prefix of
+#: requests to a dictionary which maps the request prefix to the list
+#: of `(service, response, coded_response_prefix)` tuples that apply.
+ResponseIndex = dict[int, dict[bytes, list[tuple[DiagService, Response, bytes]]]]
+
 
 @dataclass(kw_only=True)
 class DiagLayer:
@@ -132,6 +140,12 @@ class DiagLayer:
     def _resolve_snrefs(self, context: SnRefContext) -> None:
         self.diag_layer_raw._resolve_snrefs(context)
 
+        # the set of services applicable to the layer may have
+        # changed, so the lookup structures for decoding must be
+        # re-created if they are needed
+        self.__dict__.pop("_prefix_tree", None)
+        self.__dict__.pop("_response_index", None)
+
     def _get_local_diag_comms(self, odxlinks: OdxLinkDatabase) -> Iterable[DiagComm]:
         """Return the list of locally defined diagnostic communications.
 
@@ -361,6 +375,40 @@ class DiagLayer:
         else:
             cast(list[DiagService], sub_tree[-1]).append(service)
 
+    @cached_property
+    def _response_index(self) -> ResponseIndex:
+        """Constructs the index of the responses which apply to a
+        given request
+
+        In contrast to the prefix tree, this considers the coded
+        constant prefix of the request when computing the prefixes of
+        the responses, i.e., matching request parameters which refer
+        to the constant part of the request are included. For each
+        request prefix, the list of candidate responses is sorted so
+        that the most specific response prefixes come first and global
+        negative responses come after the responses of the service.
+        """
+        response_index: ResponseIndex = {}
+        gnrs = getattr(self, "global_negative_responses", [])
+        for service in self.services:
+            if service.request is None:
+                continue
+
+            request_prefix = bytes(service.request.coded_const_prefix())
+            candidates = response_index.setdefault(len(request_prefix),
+                                                   {}).setdefault(request_prefix, [])
+            for response in chain(service.positive_responses, service.negative_responses, gnrs):
+                response_prefix = bytes(response.coded_const_prefix(request_prefix=request_prefix))
+                candidates.append((service, response, response_prefix))
+
+        for candidates_by_prefix in response_index.values():
+            for candidates in candidates_by_prefix.values():
+                candidates.sort(
+                    key=lambda x: (-len(x[2]), x[1].response_type == ResponseType.GLOBAL_NEGATIVE))
+
+        # make sure that the longest request prefixes are considered first
+        return dict(sorted(response_index.items(), key=lambda x: -x[0]))
+
     def _find_services_for_uds(self, message: bytes | bytearray) -> list[DiagService]:
         prefix_tree = self._prefix_tree
 
@@ -368,7 +416,8 @@ class DiagLayer:
         possible_services: list[DiagService] = []
         for b in message:
             if b in prefix_tree:
-                odxassert(isinstance(prefix_tree[b], dict))
+                if exceptions.hot_path_checks:
+                    odxassert(isinstance(prefix_tree[b], dict))
                 prefix_tree = cast(PrefixTree, prefix_tree[b])
             else:
                 break
@@ -376,19 +425,116 @@ class DiagLayer:
                 possible_services += cast(list[DiagService], prefix_tree[-1])
         return possible_services
 
-    def _decode(self, message: bytes | bytearray,
-                candidate_services: Iterable[DiagService]) -> list[Message]:
+    def _try_decode(self,
+                    message: bytes | bytearray,
+                    candidate_services: Iterable[DiagService],
+                    *,
+                    lazy: bool = False) -> list[Message] | None:
+        """Decode a message using a list of candidate services without
+        raising exceptions
+
+        If any of the candidate services (including the global
+        negative responses) cannot decode the message, `None` is
+        returned.
+        """
+        decoded_messages: list[Message] = []
+
+        for service in candidate_services:
+            # like for `_decode_verbose()`, services which apply but
+            # cannot decode the message are treated like services
+            # which do not apply, i.e., the global negative responses
+            # are tried
+            try:
+                decoded_message = service.try_decode_message(message, lazy=lazy)
+            except DecodeError:
+                decoded_message = None
+
+            if decoded_message is not None:
+                decoded_messages.append(decoded_message)
+                continue
+
+            # check if the message can be decoded as a global
+            # negative response for the service
+            gnr_found = False
+            for gnr in self.global_negative_responses:
+                if lazy:
+                    prefix = gnr.coded_const_prefix()
+                    if message[:len(prefix)] != prefix or \
+                       not composite_codec_constants_match(gnr, message):
+                        continue
+
+                    decoded_messages.append(
+                        Message.create_lazy(
+                            coded_message=bytes(message), service=service, coding_object=gnr))
+                else:
+                    try:
+                        decoded_gnr = gnr.try_decode(message)
+                    except DecodeError:
+                        continue
+
+                    if decoded_gnr is None:
+                        continue
+
+                    decoded_messages.append(
+                        Message(
+                            coded_message=bytes(message),
+                            service=service,
+                            coding_object=gnr,
+                            param_dict=decoded_gnr))
+
+                gnr_found = True
+
+            if not gnr_found:
+                return None
+
+        if len(decoded_messages) == 0:
+            return None
+
+        return decoded_messages
+
+    def _decode(self,
+                message: bytes | bytearray,
+                candidate_services: Iterable[DiagService],
+                *,
+                lazy: bool = False) -> list[Message]:
+        candidate_services = list(candidate_services)
+        if (decoded_messages := self._try_decode(message, candidate_services,
+                                                 lazy=lazy)) is not None:
+            return decoded_messages
+
+        # the message cannot be decoded. Go through the candidates
+        # again, this time producing the appropriate error.
+        return self._decode_verbose(message, candidate_services, lazy=lazy)
+
+    def _decode_verbose(self,
+                        message: bytes | bytearray,
+                        candidate_services: Iterable[DiagService],
+                        *,
+                        lazy: bool = False) -> list[Message]:
         decoded_messages: list[Message] = []
 
         for service in candidate_services:
             try:
-                decoded_messages.append(service.decode_message(message))
+                decoded_messages.append(service.decode_message(message, lazy=lazy))
             except DecodeError as e:
                 # check if the message can be decoded as a global
                 # negative response for the service
                 gnr_found = False
                 for gnr in self.global_negative_responses:
                     try:
+                        if lazy:
+                            prefix = gnr.coded_const_prefix()
+                            if message[:len(prefix)] != prefix:
+                                continue
+                            composite_codec_verify_constants(gnr, message)
+                            gnr_found = True
+                            decoded_messages.append(
+                                Message.create_lazy(
+                                    coded_message=bytes(message),
+                                    service=service,
+                                    coding_object=gnr))
+                            continue
+
                         decoded_gnr = gnr.decode(message)
                         gnr_found = True
                         if not isinstance(decoded_gnr, dict):
@@ -416,18 +562,116 @@ class DiagLayer:
 
         return decoded_messages
 
-    def decode(self, message: bytes | bytearray) -> list[Message]:
+    def decode(self, message: bytes | bytearray, *, lazy: bool = False) -> list[Message]:
+        """Decode a request or a response using the services of the layer
+
+        If `lazy` is true, the services and coding objects applicable
+        to the message are only identified by means of their constant
+        parameters and the values of the remaining parameters are
+        decoded on demand, i.e., when they are accessed via
+        `message[param_name]`.
+        """
         candidate_services = self._find_services_for_uds(message)
 
-        return self._decode(message, candidate_services)
+        return self._decode(message, candidate_services, lazy=lazy)
+
+    def try_decode(self, message: bytes | bytearray, *, lazy: bool = False) -> list[Message] | None:
+        """Decode a request or a response using the services of the
+        layer if possible
+
+        In contrast to `decode()`, `None` is returned instead of
+        raising an exception if the message cannot be decoded. No
+        error messages are built for the coding objects which do not
+        apply to the message.
+        """
+        candidate_services = self._find_services_for_uds(message)
+
+        return self._try_decode(message, candidate_services, lazy=lazy)
+
+    def decode_response(self,
+                        response: bytes | bytearray,
+                        request: bytes | bytearray,
+                        *,
+                        lazy: bool = False) -> list[Message]:
+        """Decode a response given the request that triggered it
+
+        The candidate responses are selected using the coded constant
+        prefixes of the request and the response before any actual
+        decoding is done. The first candidate which successfully
+        decodes the response is returned.
+        """
+        if (result := self.try_decode_response(response, request, lazy=lazy)) is not None:
+            return result
+
+        # no response object applies. Go through the responses of the
+        # services that match the request again to produce the
+        # appropriate error.
+        candidate_services = self._find_services_for_uds(request)
+
+        return self._decode_verbose(response, candidate_services, lazy=lazy)
+
+    def try_decode_response(self,
+                            response: bytes | bytearray,
+                            request: bytes | bytearray,
+                            *,
+                            lazy: bool = False) -> list[Message] | None:
+        """Decode a response given the request that triggered it if
+        possible
+
+        This is the non-raising variant of `decode_response()`: If the
+        response cannot be decoded, `None` is returned.
+        """
+        response = bytes(response)
+        request = bytes(request)
+
+        # retrieve the candidates for all applicable request prefixes,
+        # the most specific ones first.
+        candidates: list[tuple[DiagService, Response, bytes]] = []
+        for prefix_len, candidates_by_prefix in self._response_index.items():
+            if prefix_len > len(request):
+                continue
+            candidates += candidates_by_prefix.get(request[:prefix_len], [])
+
+        for service, coding_object, response_prefix in candidates:
+            if not response.startswith(response_prefix):
+                continue
+
+            if lazy:
+                if not composite_codec_constants_match(coding_object, response):
+                    continue
+
+                return [
+                    Message.create_lazy(
+                        coded_message=response, service=service, coding_object=coding_object)
+                ]
+
+            try:
+                param_dict = coding_object.try_decode(response)
+            except DecodeError:
+                # the response is malformed for a candidate which
+                # applies. Determine the result using the services of
+                # the request like `decode_response()` does.
+                break
+
+            if param_dict is None:
+                # the coding object does not apply (e.g., because of
+                # an NRC-CONST parameter which does not match)
+                continue
+
+            return [
+                Message(
+                    coded_message=response,
+                    service=service,
+                    coding_object=coding_object,
+                    param_dict=param_dict)
+            ]
 
-    def decode_response(self, response: bytes | bytearray,
-                        request: bytes | bytearray) -> list[Message]:
+        # no response object applies according to the index or one
+        # of them cannot decode the response. Fall back to trying all
+        # responses of the services that match the request.
         candidate_services = self._find_services_for_uds(request)
-        if candidate_services is None:
-            raise DecodeError(f"Couldn't find corresponding service for request {request.hex()}.")
 
-        return self._decode(response, candidate_services)
+        return self._try_decode(response, candidate_services, lazy=lazy)
 
     #####
     # </PDU decoding>
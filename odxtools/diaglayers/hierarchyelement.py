@@ -905,6 +905,42 @@ class HierarchyElement(DiagLayer):
         # the comparam specifies microseconds. convert this to seconds
         return float(result) / 1e6
 
+    def get_p2_max_time(self, protocol: Union[str, "Protocol"] | None = None) -> float | None:
+        """Maximum time in seconds the tester waits for the response
+        of the ECU to a request.
+
+        This is defined by the communication parameter "CP_P2Max".
+        """
+        com_param = self.get_comparam("CP_P2Max", protocol=protocol)
+        if com_param is None:
+            return None
+
+        result = com_param.get_value()
+        if result is None:
+            return None
+        odxassert(isinstance(result, str))
+
+        # the comparam specifies microseconds. convert this to seconds
+        return float(result) / 1e6
+
+    def get_p2_star_time(self, protocol: Union[str, "Protocol"] | None = None) -> float | None:
+        """Maximum time in seconds the tester waits for the response
+        of the ECU after a "response pending" reply has been received.
+
+        This is defined by the communication parameter "CP_P2Star".
+        """
+        com_param = self.get_comparam("CP_P2Star", protocol=protocol)
+        if com_param is None:
+            return None
+
+        result = com_param.get_value()
+        if result is None:
+            return None
+        odxassert(isinstance(result, str))
+
+        # the comparam specifies microseconds. convert this to seconds
+        return float(result) / 1e6
+
     #####
     # </communication parameter handling>
     #####
@@ -5,6 +5,7 @@ from xml.etree import ElementTree
 
 from .addressing import Addressing
 from .comparaminstance import ComparamInstance
+from .compositecodec import composite_codec_constants_match, composite_codec_verify_constants
 from .diagcomm import DiagComm
 from .exceptions import DecodeError, DecodeMismatch, odxassert, odxraise, odxrequire
 from .message import Message
@@ -183,7 +184,10 @@ class DiagService(DiagComm):
 
         self.request.print_free_parameters_info()
 
-    def decode_message(self, raw_message: bytes | bytearray) -> Message:
+    def _find_candidate_coding_objects(self,
+                                       raw_message: bytes | bytearray) -> list[Request | Response]:
+        """Return the request and responses of the service whose
+        coded constant prefix matches a message"""
         request_prefix = b''
         candidate_coding_objects: list[Request | Response] = [
             *self.positive_responses, *self.negative_responses
@@ -198,9 +202,65 @@ class DiagService(DiagComm):
             if len(raw_message) >= len(prefix) and prefix == raw_message[:len(prefix)]:
                 coding_objects.append(candidate_coding_object)
 
+        return coding_objects
+
+    def try_decode_message(self,
+                           raw_message: bytes | bytearray,
+                           *,
+                           lazy: bool = False) -> Message | None:
+        """Decode a request or a response of the service if it
+        unambiguously applies to the message
+
+        In contrast to `decode_message()`, `None` is returned instead
+        of raising an exception if none or multiple of the service's
+        coding objects apply to the message. Like for
+        `decode_message()`, a `DecodeError` is raised if a coding
+        object whose constant parameters match cannot decode the
+        message.
+        """
+        result: Message | None = None
+        for coding_object in self._find_candidate_coding_objects(raw_message):
+            if lazy:
+                if not composite_codec_constants_match(coding_object, raw_message):
+                    continue
+
+                message = Message.create_lazy(
+                    coded_message=bytes(raw_message), service=self, coding_object=coding_object)
+            elif (param_dict := coding_object.try_decode(raw_message)) is not None:
+                message = Message(
+                    coded_message=bytes(raw_message),
+                    service=self,
+                    coding_object=coding_object,
+                    param_dict=param_dict)
+            else:
+                continue
+
+            if result is not None:
+                # the message is ambiguous
+                return None
+            result = message
+
+        return result
+
+    def decode_message(self, raw_message: bytes | bytearray, *, lazy: bool = False) -> Message:
+        """Decode a request or a response of the service
+
+        If `lazy` is true, the applicable coding object is only
+        identified using its constant parameters and the values of
+        all parameters are decoded on demand (cf. `Message`).
+        """
         result_list: list[Message] = []
-        for coding_object in coding_objects:
+        for coding_object in self._find_candidate_coding_objects(raw_message):
             try:
+                if lazy:
+                    composite_codec_verify_constants(coding_object, raw_message)
+                    result_list.append(
+                        Message.create_lazy(
+                            coded_message=bytes(raw_message),
+                            service=self,
+                            coding_object=coding_object))
+                    continue
+
                 result_list.append(
                     Message(
                         coded_message=bytes(raw_message),
@@ -238,13 +298,14 @@ class DiagService(DiagComm):
         missing_params = {x.short_name
                           for x in self.request.required_parameters}.difference(kwargs.keys())
         odxassert(
-            len(missing_params) == 0, f"The parameters {missing_params} are required but missing!")
+            len(missing_params) == 0,
+            lambda: f"The parameters {missing_params} are required but missing!")
 
         # make sure that no unknown parameters are specified
         rq_all_param_names = {x.short_name for x in self.request.parameters}
         odxassert(
             set(kwargs.keys()).issubset(rq_all_param_names),
-            f"Unknown parameters specified for encoding: {kwargs.keys()}, "
+            lambda: f"Unknown parameters specified for encoding: {kwargs.keys()}, "
             f"known parameters are: {rq_all_param_names}")
         return self.request.encode(**kwargs)
 
@@ -0,0 +1,500 @@
+# SPDX-License-Identifier: MIT
+import asyncio
+import struct
+from collections import deque
+from collections.abc import AsyncIterator, Callable, Mapping
+from enum import IntEnum
+from types import TracebackType
+from typing import TYPE_CHECKING
+
+from .globals import logger
+
+if TYPE_CHECKING:
+    from .diaglayers.hierarchyelement import HierarchyElement
+    from .diaglayers.protocol import Protocol
+
+#: The TCP port used for diagnostics over IP (ISO 13400-2)
+DOIP_PORT = 13400
+
+#: The protocol version used by default (ISO 13400-2:2012)
+DEFAULT_PROTOCOL_VERSION = 0x02
+
+#: The logical address of the tester if the database does not
+#: specify one. (This is the first address of the range reserved for
+#: external test equipment.)
+DEFAULT_TESTER_ADDRESS = 0x0e00
+
+_HEADER_FORMAT = ">BBHI"
+_HEADER_SIZE = struct.calcsize(_HEADER_FORMAT)
+
+
+class DoIpPayloadType(IntEnum):
+    """The payload types of the DoIP messages sent via TCP"""
+
+    GenericNack = 0x0000
+    RoutingActivationRequest = 0x0005
+    RoutingActivationResponse = 0x0006
+    AliveCheckRequest = 0x0007
+    AliveCheckResponse = 0x0008
+    DiagnosticMessage = 0x8001
+    DiagnosticMessageAck = 0x8002
+    DiagnosticMessageNack = 0x8003
+
+
+class DoIpGenericNackCode(IntEnum):
+    IncorrectPattern = 0x00
+    UnknownPayloadType = 0x01
+    MessageTooLarge = 0x02
+    OutOfMemory = 0x03
+    InvalidPayloadLength = 0x04
+
+
+class DoIpRoutingActivationCode(IntEnum):
+    UnknownSourceAddress = 0x00
+    NoFreeSocket = 0x01
+    SourceAddressMismatch = 0x02
+    SourceAddressInUse = 0x03
+    MissingAuthentication = 0x04
+    RejectedConfirmation = 0x05
+    UnsupportedActivationType = 0x06
+    Success = 0x10
+    ConfirmationRequired = 0x11
+
+
+class DoIpDiagnosticNackCode(IntEnum):
+    InvalidSourceAddress = 0x02
+    UnknownTargetAddress = 0x03
+    MessageTooLarge = 0x04
+    OutOfMemory = 0x05
+    TargetUnreachable = 0x06
+    UnknownNetwork = 0x07
+    TransportProtocolError = 0x08
+
+
+class DoIpError(Exception):
+    """A DoIP message could not be transmitted or was rejected"""
+
+
+def encode_doip_message(payload_type: int,
+                        payload: bytes | bytearray = b"",
+                        protocol_version: int = DEFAULT_PROTOCOL_VERSION) -> bytes:
+    """Prepend the generic DoIP header to a payload"""
+    return struct.pack(_HEADER_FORMAT, protocol_version, protocol_version ^ 0xff, payload_type,
+                       len(payload)) + payload
+
+
+async def read_doip_message(reader: asyncio.StreamReader,
+                            max_payload_size: int = 0xffff) -> tuple[int, bytes]:
+    """Read the next DoIP message from a stream
+
+    Returns the payload type and the payload of the message.
+
+    :raises DoIpError: The header of the message is invalid
+    :raises asyncio.IncompleteReadError: The stream has been closed
+    """
+    header = await reader.readexactly(_HEADER_SIZE)
+    version, inverse_version, payload_type, payload_len = struct.unpack(_HEADER_FORMAT, header)
+    if version ^ 0xff != inverse_version:
+        raise DoIpError(f"Invalid DoIP header {header.hex()}")
+    if payload_len > max_payload_size:
+        raise DoIpError(f"DoIP message of {payload_len} bytes exceeds the maximum size")
+
+    return payload_type, await reader.readexactly(payload_len)
+
+
+class DoIpClient:
+    """A tester which communicates with DoIP entities via TCP
+
+    After the connection to the gateway has been established and the
+    routing has been activated, diagnostic messages can be exchanged
+    with any of the ECUs behind the gateway. Requests can be sent
+    concurrently and are pipelined: The acknowledgement of a
+    diagnostic message is awaited by its sender without blocking the
+    transmission of other requests. Received diagnostic messages are
+    queued per source address and retrieved using
+    :py:meth:`receive`.
+    """
+
+    def __init__(self,
+                 host: str,
+                 port: int = DOIP_PORT,
+                 *,
+                 tester_address: int = DEFAULT_TESTER_ADDRESS,
+                 activation_type: int = 0x00,
+                 protocol_version: int = DEFAULT_PROTOCOL_VERSION,
+                 routing_activation_timeout: float = 2.0,
+                 ack_timeout: float = 2.0) -> None:
+        self.host = host
+        self.port = port
+        self.tester_address = tester_address
+        self.activation_type = activation_type
+        self.protocol_version = protocol_version
+        self.routing_activation_timeout = routing_activation_timeout
+        #: The time to wait for the acknowledgement of a diagnostic
+        #: message by the gateway [s]
+        self.ack_timeout = ack_timeout
+
+        #: The logical address of the gateway as reported by its
+        #: routing activation response
+        self.gateway_address: int | None = None
+
+        self._reader: asyncio.StreamReader | None = None
+        self._writer: asyncio.StreamWriter | None = None
+        self._write_lock = asyncio.Lock()
+        self._rx_task: asyncio.Task[None] | None = None
+        self._rx_queues: dict[int, asyncio.Queue[bytes]] = {}
+        # the gateway acknowledges diagnostic messages in the order
+        # in which they were received
+        self._pending_acks: deque[tuple[int, asyncio.Future[None]]] = deque()
+
+    @staticmethod
+    def from_diag_layer(diag_layer: "HierarchyElement",
+                        host: str,
+                        port: int = DOIP_PORT,
+                        *,
+                        protocol: "str | Protocol | None" = None) -> "DoIpClient":
+        """Create a client using the DoIP communication parameters
+        of a diagnostic layer"""
+        tester_address = diag_layer.get_doip_logical_tester_address(protocol=protocol)
+        activation_type = diag_layer.get_doip_routing_activation_type(protocol=protocol)
+        timeout = diag_layer.get_doip_routing_activation_timeout(protocol=protocol)
+
+        return DoIpClient(
+            host,
+            port,
+            tester_address=tester_address if tester_address is not None else DEFAULT_TESTER_ADDRESS,
+            activation_type=activation_type or 0x00,
+            routing_activation_timeout=timeout or 2.0)
+
+    @property
+    def is_connected(self) -> bool:
+        return self._rx_task is not None and not self._rx_task.done()
+
+    async def connect(self) -> None:
+        """Connect to the gateway and activate the routing
+
+        :raises DoIpError: The gateway refused to activate the routing
+        """
+        if self._writer is not None:
+            return
+
+        self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+        try:
+            await asyncio.wait_for(self._activate_routing(), self.routing_activation_timeout)
+        except BaseException:
+            await self.close()
+            raise
+
+        self._rx_task = asyncio.create_task(self._rx_loop())
+
+    async def close(self) -> None:
+        if self._rx_task is not None:
+            self._rx_task.cancel()
+            try:
+                await self._rx_task
+            except asyncio.CancelledError:
+                pass
+            self._rx_task = None
+
+        if self._writer is not None:
+            self._writer.close()
+            try:
+                await self._writer.wait_closed()
+            except ConnectionError:
+                pass
+            self._writer = None
+            self._reader = None
+
+        self._fail_pending_acks(DoIpError("The connection has been closed"))
+
+    async def __aenter__(self) -> "DoIpClient":
+        await self.connect()
+        return self
+
+    async def __aexit__(self, exc_type: type[BaseException] | None, exc_value: BaseException | None,
+                        traceback: TracebackType | None) -> None:
+        await self.close()
+
+    async def send(self, target_address: int, payload: bytes | bytearray) -> None:
+        """Send a diagnostic message and wait for its acknowledgement
+
+        :raises DoIpError: The gateway rejected the message
+        :raises TimeoutError: The message was not acknowledged in time
+        """
+        if not self.is_connected:
+            raise DoIpError("Not connected")
+
+        ack: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        message = struct.pack(">HH", self.tester_address, target_address) + payload
+        async with self._write_lock:
+            self._pending_acks.append((target_address, ack))
+            await self._write(DoIpPayloadType.DiagnosticMessage, message)
+
+        await asyncio.wait_for(ack, self.ack_timeout)
+
+    async def receive(self, source_address: int, timeout: float | None = None) -> bytes:
+        """Wait for the next diagnostic message sent by an ECU
+
+        :raises TimeoutError: No message was received in time
+        """
+        return await asyncio.wait_for(self._rx_queue(source_address).get(), timeout)
+
+    def clear_rx_queue(self, source_address: int) -> None:
+        """Discard all diagnostic messages which have been received
+        from an ECU but not retrieved yet"""
+        queue = self._rx_queue(source_address)
+        while not queue.empty():
+            queue.get_nowait()
+
+    def _rx_queue(self, source_address: int) -> asyncio.Queue[bytes]:
+        queue = self._rx_queues.get(source_address)
+        if queue is None:
+            queue = asyncio.Queue()
+            self._rx_queues[source_address] = queue
+        return queue
+
+    async def _write(self, payload_type: int, payload: bytes | bytearray) -> None:
+        assert self._writer is not None
+        self._writer.write(encode_doip_message(payload_type, payload, self.protocol_version))
+        await self._writer.drain()
+
+    async def _activate_routing(self) -> None:
+        assert self._reader is not None
+
+        await self._write(DoIpPayloadType.RoutingActivationRequest,
+                          struct.pack(">HB4x", self.tester_address, self.activation_type))
+        while True:
+            payload_type, payload = await read_doip_message(self._reader)
+            if payload_type == DoIpPayloadType.AliveCheckRequest:
+                await self._write(DoIpPayloadType.AliveCheckResponse,
+                                  struct.pack(">H", self.tester_address))
+                continue
+            elif payload_type == DoIpPayloadType.GenericNack:
+                raise DoIpError(f"Routing activation request rejected "
+                                f"(generic NACK code {payload[:1].hex()})")
+            elif payload_type != DoIpPayloadType.RoutingActivationResponse:
+                continue
+
+            if len(payload) < 5:
+                raise DoIpError("Invalid routing activation response")
+            _, gateway_address, code = struct.unpack_from(">HHB", payload)
+            if code != DoIpRoutingActivationCode.Success:
+                raise DoIpError(f"Routing activation denied (code 0x{code:02x})")
+
+            self.gateway_address = gateway_address
+            return
+
+    async def _rx_loop(self) -> None:
+        assert self._reader is not None
+
+        error = DoIpError("The connection has been closed by the gateway")
+        try:
+            while True:
+                payload_type, payload = await read_doip_message(self._reader)
+
+                if payload_type == DoIpPayloadType.DiagnosticMessage:
+                    if len(payload) >= 4:
+                        source_address = struct.unpack_from(">H", payload)[0]
+                        self._rx_queue(source_address).put_nowait(payload[4:])
+                elif payload_type in (DoIpPayloadType.DiagnosticMessageAck,
+                                      DoIpPayloadType.DiagnosticMessageNack):
+                    self._handle_ack(payload_type, payload)
+                elif payload_type == DoIpPayloadType.AliveCheckRequest:
+                    async with self._write_lock:
+                        await self._write(DoIpPayloadType.AliveCheckResponse,
+                                          struct.pack(">H", self.tester_address))
+                elif payload_type == DoIpPayloadType.GenericNack:
+                    # the gateway could not process our last message
+                    code = payload[0] if payload else -1
+                    if self._pending_acks:
+                        _, ack = self._pending_acks.popleft()
+                        if not ack.done():
+                            ack.set_exception(DoIpError(f"Generic NACK (code {code})"))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        except DoIpError as e:
+            error = e
+        finally:
+            self._fail_pending_acks(error)
+
+    def _handle_ack(self, payload_type: int, payload: bytes) -> None:
+        if not self._pending_acks:
+            return  # unsolicited acknowledgement
+
+        target_address, ack = self._pending_acks.popleft()
+        if ack.done():
+            return  # the sender is no longer interested
+
+        if payload_type == DoIpPayloadType.DiagnosticMessageAck:
+            ack.set_result(None)
+            return
+
+        code = payload[4] if len(payload) > 4 else -1
+        try:
+            reason = DoIpDiagnosticNackCode(code).name
+        except ValueError:
+            reason = f"0x{code:02x}"
+        ack.set_exception(
+            DoIpError(f"Diagnostic message to 0x{target_address:04x} rejected ({reason})"))
+
+    def _fail_pending_acks(self, error: Exception) -> None:
+        while self._pending_acks:
+            _, ack = self._pending_acks.popleft()
+            if not ack.done():
+                ack.set_exception(error)
+
+
+#: A coroutine function which is called by :py:class:`DoIpServer` for
+#: each request received by an ECU and which yields the telegrams
+#: the ECU responds with
+DoIpRequestHandler = Callable[[bytes], AsyncIterator[bytes | bytearray]]
+
+
+class DoIpServer:
+    """A minimal DoIP gateway for testing and simulation
+
+    Routing activation requests of any tester are accepted, and the
+    diagnostic messages addressed to the ECUs which are behind the
+    gateway are acknowledged and passed to their handlers. Requests
+    for the same ECU are processed sequentially, requests for
+    different ECUs concurrently.
+
+    The server listens on the loopback interface and on a random
+    free port by default. The port used is available via
+    :py:attr:`port` after the server has been started.
+    """
+
+    def __init__(self,
+                 handlers: Mapping[int, DoIpRequestHandler],
+                 *,
+                 logical_address: int = 0x1000,
+                 host: str = "127.0.0.1",
+                 port: int = 0,
+                 protocol_version: int = DEFAULT_PROTOCOL_VERSION) -> None:
+        #: The request handlers of the ECUs indexed by their logical
+        #: addresses
+        self.handlers: dict[int, DoIpRequestHandler] = dict(handlers)
+        self.logical_address = logical_address
+        self.host = host
+        self.port = port
+        self.protocol_version = protocol_version
+
+        self._server: asyncio.Server | None = None
+        self._connections: dict[asyncio.Task[None], asyncio.StreamWriter] = {}
+
+    async def start(self) -> None:
+        if self._server is not None:
+            return
+
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        if self._server is None:
+            return
+
+        self._server.close()
+        # closing the sockets makes the connection handlers terminate
+        tasks = list(self._connections)
+        for writer in self._connections.values():
+            writer.close()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await self._server.wait_closed()
+        self._server = None
+
+    async def __aenter__(self) -> "DoIpServer":
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type: type[BaseException] | None, exc_value: BaseException | None,
+                        traceback: TracebackType | None) -> None:
+        await self.stop()
+
+    async def _handle_connection(self, reader: asyncio.StreamReader,
+                                 writer: asyncio.StreamWriter) -> None:
+        task = asyncio.current_task()
+        assert task is not None
+        self._connections[task] = writer
+
+        tester_address: int | None = None
+        ecu_queues: dict[int, asyncio.Queue[bytes]] = {}
+        ecu_tasks: list[asyncio.Task[None]] = []
+
+        def write(payload_type: int, payload: bytes | bytearray) -> None:
+            writer.write(encode_doip_message(payload_type, payload, self.protocol_version))
+
+        async def serve_ecu(ecu_address: int, queue: asyncio.Queue[bytes]) -> None:
+            assert tester_address is not None
+            address_header = struct.pack(">HH", ecu_address, tester_address)
+            while True:
+                request = await queue.get()
+                try:
+                    async for response in self.handlers[ecu_address](request):
+                        write(DoIpPayloadType.DiagnosticMessage, address_header + response)
+                        await writer.drain()
+                except Exception as e:
+                    # a broken handler must not stop the processing of
+                    # subsequent requests
+                    logger.warning(f"Could not handle request 0x{request.hex()} for "
+                                   f"ECU 0x{ecu_address:04x}: {e!r}")
+
+        try:
+            while True:
+                try:
+                    payload_type, payload = await read_doip_message(reader)
+                except DoIpError:
+                    write(DoIpPayloadType.GenericNack,
+                          bytes([DoIpGenericNackCode.IncorrectPattern]))
+                    break
+
+                if payload_type == DoIpPayloadType.RoutingActivationRequest:
+                    if len(payload) < 7:
+                        write(DoIpPayloadType.GenericNack,
+                              bytes([DoIpGenericNackCode.InvalidPayloadLength]))
+                        break
+                    tester_address = struct.unpack_from(">H", payload)[0]
+                    write(
+                        DoIpPayloadType.RoutingActivationResponse,
+                        struct.pack(">HHB4x", tester_address, self.logical_address,
+                                    DoIpRoutingActivationCode.Success))
+                elif payload_type == DoIpPayloadType.DiagnosticMessage:
+                    if len(payload) < 5:
+                        write(DoIpPayloadType.GenericNack,
+                              bytes([DoIpGenericNackCode.InvalidPayloadLength]))
+                        break
+
+                    source_address, target_address = struct.unpack_from(">HH", payload)
+                    nack_code: int | None = None
+                    if source_address != tester_address:
+                        nack_code = DoIpDiagnosticNackCode.InvalidSourceAddress
+                    elif target_address not in self.handlers:
+                        nack_code = DoIpDiagnosticNackCode.UnknownTargetAddress
+
+                    address_header = struct.pack(">HH", target_address, source_address)
+                    if nack_code is not None:
+                        write(DoIpPayloadType.DiagnosticMessageNack,
+                              address_header + bytes([nack_code]))
+                    else:
+                        write(DoIpPayloadType.DiagnosticMessageAck, address_header + b"\x00")
+
+                        queue = ecu_queues.get(target_address)
+                        if queue is None:
+                            queue = asyncio.Queue()
+                            ecu_queues[target_address] = queue
+                            ecu_tasks.append(asyncio.create_task(serve_ecu(target_address, queue)))
+                        queue.put_nowait(payload[4:])
+                elif payload_type == DoIpPayloadType.AliveCheckResponse:
+                    pass
+                else:
+                    write(DoIpPayloadType.GenericNack,
+                          bytes([DoIpGenericNackCode.UnknownPayloadType]))
+
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            for ecu_task in ecu_tasks:
+                ecu_task.cancel()
+            await asyncio.gather(*ecu_tasks, return_exceptions=True)
+            writer.close()
+            self._connections.pop(task, None)
@@ -5,6 +5,7 @@ from xml.etree import ElementTree
 
 from typing_extensions import override
 
+from . import exceptions
 from .compumethods.compumethod import CompuMethod
 from .compumethods.createanycompumethod import create_any_compu_method_from_et
 from .createanydiagcodedtype import create_any_diag_coded_type_from_et
@@ -18,7 +19,7 @@ from .linkeddtcdop import LinkedDtcDop
 from .nameditemlist import NamedItemList
 from .odxdoccontext import OdxDocContext
 from .odxlink import OdxLinkDatabase, OdxLinkId, OdxLinkRef
-from .odxtypes import ParameterValue, odxstr_to_bool
+from .odxtypes import AtomicOdxType, ParameterValue, odxstr_to_bool
 from .physicaltype import PhysicalType
 from .snrefcontext import SnRefContext
 from .utils import dataclass_fields_asdict
@@ -88,12 +89,46 @@ class DtcDop(DopBase):
     def __post_init__(self) -> None:
         self._init_finished = False
 
+        #: Mapping from the trouble code to the DTC object. This
+        #: includes the DTCs inherited from linked DTC-DOPs.
+        self._dtcs_by_trouble_code: dict[int, DiagnosticTroubleCode] = {}
+
+        #: The trouble codes which are used by more than one DTC
+        self._ambiguous_trouble_codes: set[int] = set()
+
+    def _build_dtc_index(self) -> None:
+        self._dtcs_by_trouble_code = {}
+        self._ambiguous_trouble_codes = set()
+        for dtc in self._dtcs:
+            if dtc.trouble_code in self._dtcs_by_trouble_code:
+                self._ambiguous_trouble_codes.add(dtc.trouble_code)
+                continue
+
+            self._dtcs_by_trouble_code[dtc.trouble_code] = dtc
+
+    def get_dtc(self, trouble_code: int) -> DiagnosticTroubleCode | None:
+        """Retrieve the DTC object for a given trouble code
+
+        If the DTC-DOP does not define a DTC exhibiting the trouble
+        code, `None` is returned.
+        """
+        if exceptions.hot_path_checks:
+            odxassert(trouble_code not in self._ambiguous_trouble_codes,
+                      lambda: f"Multiple matching DTCs for trouble code 0x{trouble_code:06x}")
+
+        return self._dtcs_by_trouble_code.get(trouble_code)
+
     @override
     def decode_from_pdu(self, decode_state: DecodeState) -> ParameterValue:
 
         int_trouble_code = self.diag_coded_type.decode_from_pdu(decode_state)
 
-        if not self.compu_method.is_valid_internal_value(int_trouble_code):
+        return self._convert_internal_to_dtc(int_trouble_code)
+
+    def _convert_internal_to_dtc(self, int_trouble_code: AtomicOdxType) -> ParameterValue:
+        """Convert the internal value of a trouble code to the DTC object"""
+        trouble_code = self.compu_method.try_convert_internal_to_physical(int_trouble_code)
+        if trouble_code is None:
             # TODO: How to prevent this?
             odxraise(
                 f"DTC-DOP {self.short_name} could not convert the coded value "
@@ -101,17 +136,11 @@ class DtcDop(DopBase):
                 DecodeError)
             return
 
-        trouble_code = self.compu_method.convert_internal_to_physical(int_trouble_code)
-
         assert isinstance(trouble_code, int)
 
-        dtcs = [x for x in self.dtcs if x.trouble_code == trouble_code]
-
-        odxassert(len(dtcs) < 2, f"Multiple matching DTCs for trouble code 0x{trouble_code:06x}")
-
-        if len(dtcs) == 1:
+        if (dtc := self.get_dtc(trouble_code)) is not None:
             # we found exactly one described DTC
-            return dtcs[0]
+            return dtc
 
         # the DTC was not specified. This probably means that the
         # diagnostic description file is incomplete.
@@ -169,13 +198,7 @@ class DtcDop(DopBase):
         if not isinstance(internal_trouble_code, int):
             odxraise()
 
-        found = False
-        for dtc in self.dtcs:
-            if internal_trouble_code == dtc.trouble_code:
-                found = True
-                break
-
-        if not found:
+        if internal_trouble_code not in self._dtcs_by_trouble_code:
             odxraise(
                 f"Unknown diagnostic trouble code {physical_value!r} "
                 f"(0x{internal_trouble_code: 06x}) specified", EncodeError)
@@ -213,6 +236,12 @@ class DtcDop(DopBase):
         for linked_dtc_dop in self.linked_dtc_dops_raw:
             linked_dtc_dop._resolve_odxlinks(odxlinks)
 
+        self._build_dtc_index()
+
+        # the DTCs inherited via linked DTC-DOPs are added when
+        # resolving the short name references
+        self._init_finished = False
+
     def _resolve_snrefs(self, context: SnRefContext) -> None:
         # hack to avoid initializing the DtcDop object multiple
         # times. This is required, because the linked DTC DOP feature
@@ -258,3 +287,5 @@ class DtcDop(DopBase):
         # at this place, the linked DTC DOPs exhibit .short_name, so
         # we can create a NamedItemList...
         self._linked_dtc_dops = NamedItemList(self.linked_dtc_dops_raw)
+
+        self._build_dtc_index()
@@ -15,6 +15,7 @@ from .odxdoccontext import OdxDocContext
 from .odxlink import OdxLinkDatabase, OdxLinkId
 from .odxtypes import ParameterValue
 from .snrefcontext import SnRefContext
+from .staticitemlayout import items_to_columns
 from .utils import dataclass_fields_asdict
 
 
@@ -119,9 +120,21 @@ class DynamicLengthField(Field):
             n = 0
 
         decode_state.cursor_byte_position = decode_state.origin_byte_position + self.offset
+
+        # if all items exhibit the same static layout, they can be
+        # decoded in one go
+        if (layout := self._get_static_item_layout()) is not None and \
+           (items := layout.decode_items(
+               decode_state, n, columnar=decode_state.columnar_fields)) is not None:
+            decode_state.origin_byte_position = orig_origin
+            return items
+
         for _ in range(n):
             result.append(self.structure.decode_from_pdu(decode_state))
 
         decode_state.origin_byte_position = orig_origin
 
+        if decode_state.columnar_fields:
+            return items_to_columns(result, self.structure)
+
         return result
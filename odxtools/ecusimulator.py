@@ -0,0 +1,310 @@
+# SPDX-License-Identifier: MIT
+from collections.abc import AsyncIterator, Callable, Iterable, Mapping
+from dataclasses import dataclass
+
+from . import uds
+from .diaglayers.diaglayer import DiagLayer
+from .diagservice import DiagService
+from .exceptions import EncodeError
+from .globals import logger
+from .isotp_transport import IsoTpChannel, IsoTpTransport
+from .message import Message
+from .odxtypes import ParameterValueDict
+from .request import Request
+from .response import Response
+from .statechart import StateChart
+from .statemachine import StateMachine
+from .uds import NegativeResponseCodes
+
+#: A callable which determines the values of the parameters of the
+#: positive response to a decoded request which cannot be derived
+#: from the request itself
+ValueProvider = Callable[[Message], ParameterValueDict]
+
+
+@dataclass(kw_only=True, frozen=True)
+class _CachedResponse:
+    service: DiagService
+    request_params: ParameterValueDict
+    response: Response
+    response_params: ParameterValueDict
+    coded_response: bytes
+
+
+class EcuSimulator:
+    """Simulates an ECU using the services of a diagnostic layer
+
+    Requests are decoded using the prefix tree of the layer and
+    answered with the first positive response of the respective
+    service. The values of response parameters which are neither
+    constant nor have a default value are taken from the value
+    providers, which are either static dictionaries or callables,
+    indexed by the short name of the service. Requests which cannot
+    be decoded or whose response cannot be encoded are answered
+    negatively.
+
+    The state charts of the layer are tracked: Requests for which
+    none of the applicable pre-condition states is active are
+    rejected with "conditions not correct", and the state transitions
+    of the executed services are applied.
+
+    The responses of services which use static values are cached by
+    their request, and those for requests which can be encoded without
+    specifying any parameter values (e.g., reading a fixed data
+    identifier) are computed in advance, so that the simulator does
+    not need to decode or encode anything for them.
+    """
+
+    def __init__(self,
+                 diag_layer: DiagLayer,
+                 value_providers: Mapping[str, ParameterValueDict | ValueProvider] | None = None,
+                 *,
+                 state_charts: Iterable[StateChart] | None = None,
+                 max_cache_size: int = 4096) -> None:
+        self.diag_layer = diag_layer
+        self.value_providers = dict(value_providers or {})
+        self.max_cache_size = max_cache_size
+
+        if state_charts is None:
+            state_charts = diag_layer.state_charts
+        #: The runtime states of the simulated state charts
+        self.state_machines = [StateMachine(diag_layer, x) for x in state_charts]
+
+        #: The number of requests which have been processed
+        self.num_requests = 0
+
+        #: The number of requests that were answered from the cache
+        self.num_cache_hits = 0
+
+        self._response_cache: dict[bytes, _CachedResponse] = {}
+        # the coded constant prefixes of all requests and the sets of
+        # their first bytes and first two bytes
+        self._request_prefixes = [
+            bytes(x.request.coded_const_prefix())
+            for x in diag_layer.services
+            if isinstance(x, DiagService) and x.request is not None and
+            len(x.request.coded_const_prefix()) > 0
+        ]
+        self._known_sids = {x[0] for x in self._request_prefixes}
+        self._sub_function_prefixes = {x[:2] for x in self._request_prefixes if len(x) >= 2}
+
+        self._precompute_responses()
+
+    def reset(self) -> None:
+        """Put all state machines into the start state of their chart"""
+        for state_machine in self.state_machines:
+            state_machine.active_state = state_machine.state_chart.start_state
+
+    def process_request(self, request: bytes | bytearray) -> bytes | None:
+        """Compute the response to a request
+
+        `None` is returned if the request ought not to be answered,
+        i.e., if it is empty or if it is answered positively and the
+        "suppress positive response" bit of its sub-function is set.
+        Unless the diagnostic layer explicitly specifies a request
+        with the bit set, such requests are processed as if the bit
+        was cleared.
+        """
+        if not request:
+            return None
+
+        request = bytes(request)
+        self.num_requests += 1
+
+        cached = self._response_cache.get(request)
+        if cached is not None:
+            return self._process_cached_request(request, cached)
+
+        suppress_positive_response = False
+        if uds.suppresses_positive_response(request) and \
+           request[:2] not in self._sub_function_prefixes:
+            suppress_positive_response = True
+            sub_function = request[1] & ~uds.SuppressPositiveResponseBit
+            request = bytes([request[0], sub_function]) + request[2:]
+
+        response = self._process_request(request)
+        if suppress_positive_response and response[0] != uds.NegativeResponseId:
+            return None
+
+        return response
+
+    async def handle_request(self, request: bytes) -> AsyncIterator[bytes]:
+        """Answer a request
+
+        This can be used as a request handler of
+        :py:class:`DoIpServer`.
+        """
+        response = self.process_request(request)
+        if response is not None:
+            yield response
+
+    async def serve_isotp(self, transport: IsoTpTransport, channel: IsoTpChannel) -> None:
+        """Answer the requests received on an ISO-TP channel forever
+
+        The channel is specified from the ECU's perspective, i.e., its
+        receive ID is the one used by the tester to send requests.
+        """
+        while True:
+            request = await transport.receive(channel.rx_id)
+            response = self.process_request(request)
+            if response is not None:
+                await transport.send(channel.tx_id, response)
+
+    def _process_cached_request(self, request: bytes, cached: _CachedResponse) -> bytes:
+        self.num_cache_hits += 1
+        if not self._check_pre_conditions(cached.service, cached.request_params):
+            return self._negative_response(request, NegativeResponseCodes.ConditionsIncorrect)
+
+        self._apply_state_transitions(cached.service, cached.request_params, cached.response,
+                                      cached.response_params)
+        return cached.coded_response
+
+    def _process_request(self, request: bytes) -> bytes:
+        cached = self._response_cache.get(request)
+        if cached is not None:
+            return self._process_cached_request(request, cached)
+
+        messages = self.diag_layer.try_decode(request) or []
+        message = next((x for x in messages if isinstance(x.coding_object, Request)), None)
+        if message is None:
+            return self._negative_response(request, self._rejection_code(request))
+
+        service = message.service
+        if not self._check_pre_conditions(service, message.param_dict):
+            return self._negative_response(request, NegativeResponseCodes.ConditionsIncorrect)
+
+        result = self._encode_response(service, message)
+        if result is None:
+            return self._negative_response(request, NegativeResponseCodes.ConditionsIncorrect)
+
+        self._apply_state_transitions(service, message.param_dict, result.response,
+                                      result.response_params)
+
+        if not callable(self.value_providers.get(service.short_name)) and \
+           len(self._response_cache) < self.max_cache_size:
+            self._response_cache[request] = result
+
+        return result.coded_response
+
+    def _rejection_code(self, request: bytes) -> NegativeResponseCodes:
+        """Determine the negative response code for a request which
+        cannot be decoded"""
+        if request[0] not in self._known_sids:
+            return NegativeResponseCodes.ServiceNotSupported
+
+        if any(request.startswith(x) for x in self._request_prefixes):
+            # the constant parameters of a request match, but its
+            # variable ones cannot be decoded
+            return NegativeResponseCodes.InvalidFormat
+
+        if request[0] in uds.SubFunctionServiceIds:
+            if len(request) < 2:
+                return NegativeResponseCodes.InvalidFormat
+            elif request[:2] not in self._sub_function_prefixes:
+                return NegativeResponseCodes.SubFunctionNotSupported
+
+        return NegativeResponseCodes.RequestOutOfRange
+
+    def _precompute_responses(self) -> None:
+        for service in self.diag_layer.services:
+            if not isinstance(service, DiagService) or service.request is None:
+                continue
+            if service.request.required_parameters:
+                continue
+
+            values = self.value_providers.get(service.short_name, {})
+            if callable(values) or any(x.short_name not in values
+                                       for response in service.positive_responses[:1]
+                                       for x in response.required_parameters):
+                continue
+
+            try:
+                request = bytes(service.request.encode())
+            except EncodeError:
+                continue
+
+            messages = self.diag_layer.try_decode(request) or []
+            message = next((x for x in messages if x.service is service), None)
+            if message is None:
+                # the request is ambiguous
+                continue
+
+            if (result := self._encode_response(service, message)) is not None:
+                self._response_cache[request] = result
+
+    def _encode_response(self, service: DiagService, message: Message) -> _CachedResponse | None:
+        if not service.positive_responses:
+            return None
+        response = service.positive_responses[0]
+        if not isinstance(response, Response):
+            return None
+
+        provider = self.value_providers.get(service.short_name, {})
+        values = provider(message) if callable(provider) else provider
+        missing_params = [
+            x.short_name for x in response.required_parameters if x.short_name not in values
+        ]
+        if missing_params:
+            logger.warning(f"No values for parameters {missing_params} of the response to "
+                           f"service {service.short_name} specified")
+            return None
+
+        try:
+            coded_response = bytes(response.encode(coded_request=message.coded_message, **values))
+        except EncodeError as e:
+            logger.warning(f"Could not encode the response to service {service.short_name}: {e}")
+            return None
+
+        if service.state_transition_refs:
+            # the values of the response parameters may be relevant
+            # for the state transitions
+            response_params = response.decode(coded_response)
+        else:
+            response_params = {}
+
+        return _CachedResponse(
+            service=service,
+            request_params=message.param_dict,
+            response=response,
+            response_params=response_params,
+            coded_response=coded_response)
+
+    def _check_pre_conditions(self, service: DiagService,
+                              request_params: ParameterValueDict) -> bool:
+        if not service.pre_condition_state_refs:
+            return True
+
+        assert service.request is not None
+        for state_machine in self.state_machines:
+            chart_states = state_machine.state_chart.states
+            refs = [
+                x for x in service.pre_condition_state_refs
+                if any(x.state.odx_id == state.odx_id for state in chart_states)
+            ]
+            if refs and not any(
+                    x.applies(state_machine, service.request.parameters, request_params)
+                    for x in refs):
+                return False
+
+        return True
+
+    def _apply_state_transitions(self, service: DiagService, request_params: ParameterValueDict,
+                                 response: Response, response_params: ParameterValueDict) -> None:
+        if not service.state_transition_refs:
+            return
+
+        assert service.request is not None
+        for state_machine in self.state_machines:
+            # like the StateMachine class, execute only the first
+            # applicable transition and consider the request
+            # parameters first
+            for params, param_values in ((service.request.parameters, request_params),
+                                         (response.parameters, response_params)):
+                if any(
+                        x.execute(state_machine, params, param_values)
+                        for x in service.state_transition_refs):
+                    break
+
+    @staticmethod
+    def _negative_response(request: bytes, code: int) -> bytes:
+        return bytes([uds.NegativeResponseId, request[0], code])
@@ -3,6 +3,7 @@ import warnings
 from dataclasses import dataclass, field
 from typing import TYPE_CHECKING
 
+from . import exceptions
 from .encoding import Encoding, get_string_encoding
 from .exceptions import EncodeError, OdxWarning, odxassert, odxraise
 from .odxtypes import AtomicOdxType, BytesTypes, DataType, ParameterValue
@@ -65,6 +66,13 @@ class EncodeState:
     #: other parameters; e.g., environment data description parameters
     journal: list[tuple["Parameter", ParameterValue | None]] = field(default_factory=list)
 
+    #: The most recently encoded parameters and their values, indexed
+    #: by the short name of the parameter
+    #:
+    #: This allows to quickly look up the value of a parameter which is
+    #: referenced by another one without scanning the journal.
+    param_values: dict[str, tuple["Parameter", ParameterValue | None]] = field(default_factory=dict)
+
     #: If this is True, specifying unknown parameters for encoding
     #: will raise an OdxError exception in strict mode.
     allow_unknown_parameters = False
@@ -81,6 +89,12 @@ class EncodeState:
                      f"0x{self.coded_message.hex()}")
             self.used_mask = self.used_mask[:len(self.coded_message)]
 
+    def record_param_value(self, param: "Parameter", value: ParameterValue | None) -> None:
+        """Add the value of a parameter which has been encoded to the
+        journal"""
+        self.journal.append((param, value))
+        self.param_values[param.short_name] = (param, value)
+
     def emplace_atomic_value(
         self,
         *,
@@ -101,9 +115,10 @@ class EncodeState:
                 odxraise(f"{internal_value!r} is not a bytefield", EncodeError)
                 return
 
-            odxassert(
-                base_type_encoding in (None, Encoding.NONE, Encoding.BCD_P, Encoding.BCD_UP),
-                f"Illegal encoding '{base_type_encoding}' for A_BYTEFIELD")
+            if exceptions.hot_path_checks:
+                odxassert(
+                    base_type_encoding in (None, Encoding.NONE, Encoding.BCD_P, Encoding.BCD_UP),
+                    lambda: f"Illegal encoding '{base_type_encoding}' for A_BYTEFIELD")
 
             # note that we do not ensure that BCD-encoded byte fields
             # only represent "legal" values
@@ -216,8 +231,9 @@ class EncodeState:
 
         # ... and others (floating point values)
         else:
-            odxassert(base_data_type in (DataType.A_FLOAT32, DataType.A_FLOAT64))
-            odxassert(base_type_encoding in (None, Encoding.NONE))
+            if exceptions.hot_path_checks:
+                odxassert(base_data_type in (DataType.A_FLOAT32, DataType.A_FLOAT64))
+                odxassert(base_type_encoding in (None, Encoding.NONE))
 
             if base_data_type == DataType.A_FLOAT32 and bit_length != 32:
                 odxraise(f"Illegal bit length for a float32 object ({bit_length})")
@@ -235,9 +251,10 @@ class EncodeState:
 
         format_char = base_data_type.bitstruct_format_letter
         padding = (8 - ((bit_length + self.cursor_bit_position) % 8)) % 8
-        odxassert((0 <= padding and padding < 8 and
-                   (padding + bit_length + self.cursor_bit_position) % 8 == 0),
-                  f"Incorrect padding {padding}")
+        if exceptions.hot_path_checks:
+            odxassert((0 <= padding and padding < 8 and
+                       (padding + bit_length + self.cursor_bit_position) % 8 == 0),
+                      lambda: f"Incorrect padding {padding}")
         left_pad = f"p{padding}" if padding > 0 else ""
 
         # actually encode the value
@@ -264,6 +281,39 @@ class EncodeState:
         self.cursor_bit_position = 0
         self.emplace_bytes(coded, obj_used_mask=used_mask_raw)
 
+    def ensure_length(self, min_length: int) -> None:
+        """Make sure that the PDU is at least `min_length` bytes long
+
+        Missing bytes are appended as unused zeros. If the size of the
+        PDU is known in advance, calling this before encoding avoids
+        growing the buffers incrementally.
+        """
+        if len(self.coded_message) < min_length:
+            pad = bytes(min_length - len(self.coded_message))
+            self.coded_message += pad
+            self.used_mask += pad
+
+    def emplace_padding(self, start: int, end: int) -> None:
+        """Mark the bytes of a given range of the PDU as used padding
+
+        Padding bits are zero. Bits of the range which have already
+        been used by other objects are left unchanged. The cursor
+        position is not changed.
+        """
+        self.ensure_length(end)
+        n = end - start
+        if self.used_mask.count(0, start, end) != n:
+            # some objects have been placed within the range, e.g.,
+            # because the byte positions of a structure's parameters
+            # are not in ascending order
+            coded_message = self.coded_message
+            used_mask = self.used_mask
+            for i in range(start, end):
+                coded_message[i] &= used_mask[i]
+        else:
+            self.coded_message[start:end] = bytes(n)
+        self.used_mask[start:end] = b'\xff' * n
+
     def emplace_bytes(self,
                       new_data: bytes,
                       obj_name: str | None = None,
@@ -273,21 +323,16 @@ class EncodeState:
                      "for a bit position of 0!", RuntimeError)
 
         pos = self.cursor_byte_position
+        n = len(new_data)
 
         # Make blob longer if necessary
-        min_length = pos + len(new_data)
-        if len(self.coded_message) < min_length:
-            pad = b'\x00' * (min_length - len(self.coded_message))
-            self.coded_message += pad
-            self.used_mask += pad
+        self.ensure_length(pos + n)
 
         if obj_used_mask is None:
             # Happy path for when no obj_used_mask has been
             # specified. In this case we assume that all bits of the
             # new data to be emplaced are used.
-            n = len(new_data)
-
-            if self.used_mask[pos:pos + n] != b'\x00' * n:
+            if exceptions.hot_path_checks and self.used_mask[pos:pos + n].count(0) != n:
                 warnings.warn(
                     f"Overlapping objects detected in between bytes {pos} and "
                     f"{pos+n}",
@@ -296,23 +341,27 @@ class EncodeState:
                 )
             self.coded_message[pos:pos + n] = new_data
             self.used_mask[pos:pos + n] = b'\xff' * n
-        else:
-            # insert data the hard way, i.e. we have to look at each
-            # individual byte to determine if it has already been used
-            # somewhere else (it would be nice if bytearrays supported
-            # bitwise operations!)
-            for i in range(len(new_data)):
-                if self.used_mask[pos + i] & obj_used_mask[i] != 0:
-                    warnings.warn(
-                        f"Overlapping objects detected at position {pos + i}",
-                        OdxWarning,
-                        stacklevel=1,
-                    )
-                self.coded_message[pos + i] &= ~obj_used_mask[i]
-                self.coded_message[pos + i] |= new_data[i] & obj_used_mask[i]
-                self.used_mask[pos + i] |= obj_used_mask[i]
-
-        self.cursor_byte_position += len(new_data)
+        elif n > 0:
+            # merge the data with the bits which are already present
+            # using integer arithmetic on the affected range
+            obj_mask = int.from_bytes(obj_used_mask[:n], "big")
+            prev_mask = int.from_bytes(self.used_mask[pos:pos + n], "big")
+
+            if exceptions.hot_path_checks and prev_mask & obj_mask != 0:
+                for i in range(n):
+                    if self.used_mask[pos + i] & obj_used_mask[i] != 0:
+                        warnings.warn(
+                            f"Overlapping objects detected at position {pos + i}",
+                            OdxWarning,
+                            stacklevel=1,
+                        )
+
+            prev_data = int.from_bytes(self.coded_message[pos:pos + n], "big")
+            data = (prev_data & ~obj_mask) | (int.from_bytes(new_data, "big") & obj_mask)
+            self.coded_message[pos:pos + n] = data.to_bytes(n, "big")
+            self.used_mask[pos:pos + n] = (prev_mask | obj_mask).to_bytes(n, "big")
+
+        self.cursor_byte_position += n
 
     @staticmethod
     def __encode_bcd_p(value: int) -> int:
@@ -11,6 +11,7 @@ from .exceptions import EncodeError, odxassert, odxraise
 from .field import Field
 from .odxdoccontext import OdxDocContext
 from .odxtypes import ParameterValue
+from .staticitemlayout import items_to_columns
 from .utils import dataclass_fields_asdict
 
 
@@ -68,6 +69,15 @@ class EndOfPduField(Field):
         odxassert(not decode_state.cursor_bit_position,
                   "No bit position can be specified for end-of-pdu fields!")
 
+        # if all items exhibit the same static layout, the number of
+        # items is known up front and all of them can be decoded in
+        # one go
+        if (layout := self._get_static_item_layout()) is not None and \
+           (num_items := layout.num_items_until_end(decode_state)) is not None and \
+           (items := layout.decode_items(
+               decode_state, num_items, columnar=decode_state.columnar_fields)) is not None:
+            return items
+
         orig_origin = decode_state.origin_byte_position
         decode_state.origin_byte_position = decode_state.cursor_byte_position
 
@@ -81,4 +91,7 @@ class EndOfPduField(Field):
 
         decode_state.origin_byte_position = orig_origin
 
+        if decode_state.columnar_fields:
+            return items_to_columns(result, self.structure)
+
         return result
@@ -45,6 +45,9 @@ class EnvironmentDataDescription(ComplexDop):
     env_datas: NamedItemList[EnvironmentData] = field(default_factory=NamedItemList)
     env_data_refs: list[OdxLinkRef] = field(default_factory=list)
 
+    def __post_init__(self) -> None:
+        self._build_env_data_index()
+
     @staticmethod
     def from_et(et_element: ElementTree.Element,
                 context: OdxDocContext) -> "EnvironmentDataDescription":
@@ -98,6 +101,8 @@ class EnvironmentDataDescription(ComplexDop):
             for ed in self.env_datas:
                 ed._resolve_odxlinks(odxlinks)
 
+        self._build_env_data_index()
+
     def _resolve_snrefs(self, context: SnRefContext) -> None:
         # ODX 2.0 specifies environment data objects here, ODX 2.2
         # uses references
@@ -105,12 +110,34 @@ class EnvironmentDataDescription(ComplexDop):
             for ed in self.env_datas:
                 ed._resolve_snrefs(context)
 
-    @override
-    def encode_into_pdu(self, physical_value: ParameterValue | None,
-                        encode_state: EncodeState) -> None:
-        """Convert a physical value into bytes and emplace them into a PDU.
+    def _build_env_data_index(self) -> None:
+        # the "all value" environment data holds parameters that are
+        # common to all DTCs. Be aware that the specification
+        # mandates that there is at most one such environment data
+        # object
+        self._all_value_env_data: EnvironmentData | None = None
+        self._env_datas_by_dtc: dict[int, EnvironmentData] = {}
+        for env_data in self.env_datas:
+            if env_data.all_value and self._all_value_env_data is None:
+                self._all_value_env_data = env_data
+
+            # if multiple environment data objects apply to a trouble
+            # code, the first one is used
+            for dtc_value in env_data.dtc_values:
+                self._env_datas_by_dtc.setdefault(dtc_value, env_data)
+
+    def get_env_data(self, numerical_dtc: int) -> EnvironmentData | None:
+        """Return the environment data object which is specific to a
+        given numerical trouble code
+
+        Note that the "all value" environment data object is not
+        considered by this method.
         """
+        return self._env_datas_by_dtc.get(numerical_dtc)
 
+    def _get_referenced_numerical_dtc(self, param_values: dict[str, tuple[Parameter,
+                                                                          ParameterValue | None]]
+                                     ) -> int | None:
         # retrieve the DTC as a numerical value from the referenced
         # parameter (which must be located somewhere before the
         # parameter using the environment data description)
@@ -119,92 +146,55 @@ class EnvironmentDataDescription(ComplexDop):
                      "descriptions via SNPATHREF is not supported yet")
             return None
 
-        numerical_dtc_value: ParameterValue | None = None
-        for prev_param, prev_param_value in reversed(encode_state.journal):
-            if prev_param.short_name == self.param_snref:
-                numerical_dtc_value = self._get_numerical_dtc_from_parameter(
-                    prev_param, prev_param_value)
-                break
-
-        if numerical_dtc_value is None:
+        if (prev_param_value := param_values.get(self.param_snref)) is None:
             odxraise("Environment data description parameters are only allowed following "
                      "the referenced parameter.")
-            return
+            return None
 
-        # deal with the "all value" environment data. This holds
-        # parameters that are common to all DTCs. Be aware that the
-        # specification mandates that there is at most one such
-        # environment data object
-        for env_data in self.env_datas:
-            if env_data.all_value:
-                tmp = encode_state.allow_unknown_parameters
-                encode_state.allow_unknown_parameters = True
-                env_data.encode_into_pdu(physical_value, encode_state)
-                encode_state.allow_unknown_parameters = tmp
-                break
-
-        # find the environment data corresponding to the given trouble
-        # code
-        for env_data in self.env_datas:
-            if numerical_dtc_value in env_data.dtc_values:
-                tmp = encode_state.allow_unknown_parameters
-                encode_state.allow_unknown_parameters = True
-                env_data.encode_into_pdu(physical_value, encode_state)
-                encode_state.allow_unknown_parameters = tmp
-                break
+        return self._get_numerical_dtc_from_parameter(*prev_param_value)
 
     @override
-    def decode_from_pdu(self, decode_state: DecodeState) -> ParameterValue:
-        """Extract the bytes from a PDU and convert them to a physical value.
+    def encode_into_pdu(self, physical_value: ParameterValue | None,
+                        encode_state: EncodeState) -> None:
+        """Convert a physical value into bytes and emplace them into a PDU.
         """
+        numerical_dtc_value = self._get_referenced_numerical_dtc(encode_state.param_values)
+        if numerical_dtc_value is None:
+            return
 
-        # retrieve the DTC as a numerical value from the referenced
-        # parameter (which must be located somewhere before the
-        # parameter using the environment data description)
-        if self.param_snref is None:
-            odxraise("Specifying the DTC parameter for environment data "
-                     "descriptions via SNPATHREF is not supported yet")
-            return None
+        tmp = encode_state.allow_unknown_parameters
+        encode_state.allow_unknown_parameters = True
+
+        if (all_value_env_data := self._all_value_env_data) is not None:
+            all_value_env_data.encode_into_pdu(physical_value, encode_state)
 
-        numerical_dtc_value: ParameterValue | None = None
-        for prev_param, prev_param_value in reversed(decode_state.journal):
-            if prev_param.short_name == self.param_snref:
-                numerical_dtc_value = self._get_numerical_dtc_from_parameter(
-                    prev_param, prev_param_value)
-                break
+        # the environment data corresponding to the given trouble code
+        if (env_data := self._env_datas_by_dtc.get(numerical_dtc_value)) is not None:
+            env_data.encode_into_pdu(physical_value, encode_state)
 
+        encode_state.allow_unknown_parameters = tmp
+
+    @override
+    def decode_from_pdu(self, decode_state: DecodeState) -> ParameterValue:
+        """Extract the bytes from a PDU and convert them to a physical value.
+        """
+        numerical_dtc_value = self._get_referenced_numerical_dtc(decode_state.param_values)
         if numerical_dtc_value is None:
-            odxraise("Environment data description parameters are only allowed following "
-                     "the referenced parameter.")
-            return
+            return {}
 
         result: ParameterValueDict = {}
 
-        # deal with the "all value" environment data. This holds
-        # parameters that are common to all DTCs. Be aware that the
-        # specification mandates that there is at most one such
-        # environment data object
-        for env_data in self.env_datas:
-            if env_data.all_value:
-                tmp = env_data.decode_from_pdu(decode_state)
-                if not isinstance(tmp, dict):
-                    odxraise()
-                    break
-                result.update(tmp)  # pyright: ignore[reportArgumentType,reportCallIssue]
-
-                break
+        # deal with the "all value" environment data and the one for
+        # the given trouble code
+        for env_data in (self._all_value_env_data, self._env_datas_by_dtc.get(numerical_dtc_value)):
+            if env_data is None:
+                continue
 
-        # find the environment data corresponding to the given trouble
-        # code
-        for env_data in self.env_datas:
-            if numerical_dtc_value in env_data.dtc_values:
-                tmp = env_data.decode_from_pdu(decode_state)
-                if not isinstance(tmp, dict):
-                    odxraise()
-                    break
-                result.update(tmp)  # pyright: ignore[reportArgumentType,reportCallIssue]
-
-                break
+            tmp = env_data.decode_from_pdu(decode_state)
+            if not isinstance(tmp, dict):
+                odxraise()
+                continue
+            result.update(tmp)  # pyright: ignore[reportArgumentType,reportCallIssue]
 
         return result
 
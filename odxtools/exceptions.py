@@ -1,4 +1,5 @@
 # SPDX-License-Identifier: MIT
+from collections.abc import Callable
 from typing import TYPE_CHECKING, NoReturn, TypeVar
 
 from .globals import logger
@@ -36,13 +37,30 @@ class OdxWarning(Warning):
 #: might start eating children...
 strict_mode = True
 
+#: Specify whether checks for the conformance of the database to the
+#: ODX specification which are located on hot paths (e.g., the
+#: checks for each value extracted from or emplaced into a PDU and
+#: the detection of overlapping parameters during encoding) are
+#: executed. Disabling these checks speeds up encoding and decoding
+#: considerably, but it should only be done for databases which have
+#: been loaded and exercised in strict mode without any errors.
+hot_path_checks = True
 
-def odxraise(message: str | None = None, error_type: type[Exception] = OdxError) -> NoReturn:
+#: The message of an error. To avoid formatting messages which are
+#: never shown, this may also be a function that produces the
+#: message on demand.
+ErrorMessage = str | Callable[[], str] | None
+
+
+def odxraise(message: ErrorMessage = None, error_type: type[Exception] = OdxError) -> NoReturn:
     """
     Raise an exception but only if in strict mode.
 
     Also, convince type checkers that the exception is always raised.
     """
+    if callable(message):
+        message = message()
+
     if TYPE_CHECKING or strict_mode:
         if message is None:
             raise error_type()
@@ -53,7 +71,7 @@ def odxraise(message: str | None = None, error_type: type[Exception] = OdxError)
 
 
 def odxassert(condition: bool,
-              message: str | None = None,
+              message: ErrorMessage = None,
               error_type: type[Exception] = OdxError) -> None:
     """
     This method works similar as the build-in `assert` statement
@@ -64,6 +82,11 @@ def odxassert(condition: bool,
     `False`. The latter is convenient when having to deal with files
     that do not comply to the ODX specification, but it may lead to
     undefined behavior. (Use the non-strict mode with great care.)
+
+    If formatting the message is expensive, a function returning the
+    message can be passed, e.g.,
+    `odxassert(x > 0, lambda: f"Invalid value {x}")`. This function is
+    only called if the assertion is violated.
     """
     if not condition:
         odxraise(message, error_type)
@@ -72,7 +95,7 @@ def odxassert(condition: bool,
 T = TypeVar("T")
 
 
-def odxrequire(obj: T | None, message: str | None = None) -> T:
+def odxrequire(obj: T | None, message: ErrorMessage = None) -> T:
     """This function ensures that an object required by the ODX
     specification is actually present.
 
@@ -1,5 +1,6 @@
 # SPDX-License-Identifier: MIT
 from dataclasses import dataclass
+from typing import TYPE_CHECKING
 from xml.etree import ElementTree
 
 from .basicstructure import BasicStructure
@@ -12,6 +13,9 @@ from .odxtypes import odxstr_to_bool
 from .snrefcontext import SnRefContext
 from .utils import dataclass_fields_asdict
 
+if TYPE_CHECKING:
+    from .staticitemlayout import StaticItemLayout
+
 
 @dataclass(kw_only=True)
 class Field(ComplexDop):
@@ -56,6 +60,8 @@ class Field(ComplexDop):
     def __post_init__(self) -> None:
         self._structure: BasicStructure | None = None
         self._env_data_desc: EnvironmentDataDescription | None = None
+        self._static_item_layout: StaticItemLayout | None = None
+        self._static_item_layout_computed = False
         num_struct_refs = 0 if self.structure_ref is None else 1
         num_struct_refs += 0 if self.structure_snref is None else 1
 
@@ -76,6 +82,8 @@ class Field(ComplexDop):
             self._env_data_desc = odxlinks.resolve(self.env_data_desc_ref,
                                                    EnvironmentDataDescription)
 
+        self._static_item_layout_computed = False
+
     def _resolve_snrefs(self, context: SnRefContext) -> None:
         """Recursively resolve any short-name references"""
         ddds = odxrequire(context.diag_layer).diag_data_dictionary_spec
@@ -94,5 +102,26 @@ class Field(ComplexDop):
                 EnvironmentDataDescription,
                 use_weakrefs=context.use_weakrefs)
 
+        self._static_item_layout_computed = False
+
+    def _get_static_item_layout(self) -> "StaticItemLayout | None":
+        """Return the precomputed layout of the repeated items if
+        these can be decoded in bulk
+
+        The layout is determined on first use because the parameters
+        of the structure must be fully resolved for this.
+        """
+        if self._static_item_layout_computed:
+            return self._static_item_layout
+
+        from .staticitemlayout import StaticItemLayout
+
+        self._static_item_layout_computed = True
+        self._static_item_layout = None
+        if self._structure is not None:
+            self._static_item_layout = StaticItemLayout.from_structure(self._structure)
+
+        return self._static_item_layout
+
     def get_static_bit_length(self) -> int | None:
         return None
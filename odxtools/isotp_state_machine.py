@@ -1,10 +1,8 @@
 #! /usr/bin/python3
 #
 # SPDX-License-Identifier: MIT
-import asyncio
 import re
-import sys
-from collections.abc import AsyncGenerator, Iterable
+from collections.abc import AsyncGenerator, Iterable, Iterator
 from enum import IntEnum
 from io import TextIOBase
 from typing import TextIO
@@ -12,6 +10,9 @@ from typing import TextIO
 import bitstruct
 import can
 
+from .canbusreceiver import CanBusReceiver
+from .canlogreader import CanFrame, read_candump_frames
+
 
 class IsoTp(IntEnum):
     # Frame types
@@ -26,7 +27,16 @@ class IsoTp(IntEnum):
     FLOW_CONTROL_ABORT = 2
 
 
+#: The maximum size of the buffer which is allocated up-front for
+#: receiving a telegram, i.e., the maximum length of telegrams which
+#: do not use the escape sequence of the first frame
+_MAX_PREALLOCATED_LEN = 0xfff
+
+
 class IsoTpStateMachine:
+    # deprecated: these regular expressions are no longer used to parse
+    # CAN logs (see `odxtools.canlogreader`). they are only kept for
+    # compatibility with external code.
     can_normal_frame_re = re.compile(
         "([a-zA-Z0-9_-]*) *([0-9A-Fa-f ]*) *\\[[0-9]+\\] *([ 0-9A-Fa-f]+)")
     can_log_frame_re = re.compile("\\([0-9.]*\\) *([a-zA-Z0-9_-]*) ([0-9A-Fa-f]+)#([0-9A-Fa-f]+)")
@@ -40,8 +50,17 @@ class IsoTpStateMachine:
         self._can_rx_ids = can_rx_ids
         assert isinstance(self._can_rx_ids, list)
 
+        # map from CAN IDs to telegram indices. if a CAN ID is
+        # specified multiple times, the first occurrence is used.
+        self._telegram_idx_by_rx_id: dict[int, int] = {}
+        for telegram_idx, rx_id in enumerate(can_rx_ids):
+            self._telegram_idx_by_rx_id.setdefault(rx_id, telegram_idx)
+
         self._telegram_specified_len = [0] * len(can_rx_ids)
         self._telegram_data: list[bytearray | None] = [None] * len(can_rx_ids)
+        # the number of payload bytes of each telegram which have
+        # been received so far
+        self._telegram_rx_len = [0] * len(can_rx_ids)
         self._telegram_last_rx_fragment_idx = [0] * len(can_rx_ids)
 
     def decode_rx_frame(self, rx_id: int, data: bytes | bytearray) -> Iterable[tuple[int, bytes]]:
@@ -49,134 +68,157 @@ class IsoTpStateMachine:
 
         E.g., add some data to a telegram, etc. Returns a generator of
         (receive_id, payload_data) tuples.
-        """
-        try:
-            telegram_idx = self._can_rx_ids.index(rx_id)
-        except ValueError:
-            return  # unknown CAN ID
 
-        # decode the isotp segment
-        frame_type, _ = bitstruct.unpack("u4u4", data)
-        assert isinstance(frame_type, int)
+        Besides classic CAN frames, this also supports the escape
+        sequences for CAN-FD single frames and for first frames of
+        telegrams larger than 4095 bytes which have been introduced
+        by ISO 15765-2:2016.
+        """
+        telegram_idx = self._telegram_idx_by_rx_id.get(rx_id)
+        if telegram_idx is None or len(data) == 0:
+            return  # unknown CAN ID or empty frame
 
-        telegram_len = None
+        # decode the protocol control information of the isotp segment
+        frame_type = data[0] >> 4
         if frame_type == IsoTp.FRAME_TYPE_SINGLE:
-            frame_type, telegram_len = bitstruct.unpack("u4u4", data)
-            assert isinstance(telegram_len, int)
+            telegram_len = data[0] & 0x0f
+            payload_start = 1
+            if telegram_len == 0 and len(data) > 8:
+                # CAN-FD single frame: the length is specified by
+                # the second byte
+                telegram_len = data[1]
+                payload_start = 2
 
-            self.on_single_frame(telegram_idx, data[1:1 + telegram_len])
-            self.on_telegram_complete(telegram_idx, data[1:1 + telegram_len])
+            payload = bytes(data[payload_start:payload_start + telegram_len])
+            self.on_single_frame(telegram_idx, payload)
+            self.on_telegram_complete(telegram_idx, payload)
 
-            yield (rx_id, bytes(data[1:1 + telegram_len]))
+            yield (rx_id, payload)
 
         elif frame_type == IsoTp.FRAME_TYPE_FIRST:
-            frame_type, telegram_len = bitstruct.unpack("u4u12", data)
-            assert isinstance(telegram_len, int)
+            if len(data) < 2:
+                return  # truncated first frame
+
+            telegram_len = ((data[0] & 0x0f) << 8) | data[1]
+            payload_start = 2
+            if telegram_len == 0:
+                # escape sequence for telegrams larger than 4095
+                # bytes: the length is specified by the next four
+                # bytes. first frames which are too short or specify
+                # a length that would not require the escape sequence
+                # are invalid and are thus ignored.
+                if len(data) < 6:
+                    return
+                telegram_len = int.from_bytes(data[2:6], "big")
+                if telegram_len <= 0xfff:
+                    return
+                payload_start = 6
+
+            # allocate the buffer for the complete telegram in one go
+            # unless it is large. (the length specified by the escape
+            # sequence can be up to 4 GiB, so large buffers grow as the
+            # consecutive frames arrive.)
+            telegram_data = bytearray(min(telegram_len, _MAX_PREALLOCATED_LEN))
+            n = min(telegram_len, len(data) - payload_start)
+            telegram_data[:n] = data[payload_start:payload_start + n]
 
             self._telegram_specified_len[telegram_idx] = telegram_len
-            self._telegram_data[telegram_idx] = bytearray(data[2:])
+            self._telegram_data[telegram_idx] = telegram_data
+            self._telegram_rx_len[telegram_idx] = n
             self._telegram_last_rx_fragment_idx[telegram_idx] = 0
 
             self.on_first_frame(telegram_idx, data)
 
         elif frame_type == IsoTp.FRAME_TYPE_CONSECUTIVE:
-            frame_type, rx_segment_idx = bitstruct.unpack("u4u4", data)
-            assert isinstance(rx_segment_idx, int)
+            rx_segment_idx = data[0] & 0x0f
 
             expected_segment_idx = (self._telegram_last_rx_fragment_idx[telegram_idx] + 1) % 16
-            telegram_data = self._telegram_data[telegram_idx]
-            assert isinstance(telegram_data, bytearray)
+            rx_buffer = self._telegram_data[telegram_idx]
+            telegram_len = self._telegram_specified_len[telegram_idx]
+            rx_len = self._telegram_rx_len[telegram_idx]
 
-            n = -1
-            if expected_segment_idx == rx_segment_idx:
+            # consecutive frames which do not belong to any telegram
+            # that is currently being received are ignored
+            is_active = rx_buffer is not None and rx_len < telegram_len
+
+            if is_active and expected_segment_idx == rx_segment_idx:
+                assert rx_buffer is not None
                 self._telegram_last_rx_fragment_idx[telegram_idx] = rx_segment_idx
-                telegram_data += data[1:]
 
-                n = self._telegram_specified_len[telegram_idx]
-                if len(telegram_data) > n:
-                    # can frames can include padding, i.e. the length
-                    # of the telegram payload is not necessarily a
-                    # multiple of the segment payloads
-                    telegram_data = telegram_data[:n]
+                # can frames can include padding, i.e. the length of
+                # the telegram payload is not necessarily a multiple
+                # of the segment payloads
+                n = min(telegram_len - rx_len, len(data) - 1)
+                rx_buffer[rx_len:rx_len + n] = data[1:1 + n]
+                rx_len += n
+                self._telegram_rx_len[telegram_idx] = rx_len
 
             self.on_consecutive_frame(telegram_idx, rx_segment_idx, data[1:])
 
-            if expected_segment_idx != rx_segment_idx:
+            if is_active and expected_segment_idx != rx_segment_idx:
                 self.on_sequence_error(telegram_idx, expected_segment_idx, rx_segment_idx)
-            elif len(telegram_data) == n:
-                self.on_telegram_complete(telegram_idx, telegram_data)
-                yield (rx_id, bytes(telegram_data))
+            elif is_active and rx_len == telegram_len:
+                assert rx_buffer is not None
+                self.on_telegram_complete(telegram_idx, rx_buffer)
+                yield (rx_id, bytes(rx_buffer))
 
         elif frame_type == IsoTp.FRAME_TYPE_FLOW_CONTROL:
-            frame_type, flow_control_flag = bitstruct.unpack("u4u4", data)
-            assert isinstance(flow_control_flag, int)
+            flow_control_flag = data[0] & 0x0f
 
             self.on_flow_control_frame(telegram_idx, flow_control_flag)
         else:
             self.on_frame_type_error(telegram_idx, frame_type)
 
-    async def read_telegrams(self,
-                             bus: can.BusABC | TextIO) -> AsyncGenerator[tuple[int, bytes], None]:
+    async def read_telegrams(self, bus: can.BusABC | CanBusReceiver | TextIO
+                            ) -> AsyncGenerator[tuple[int, bytes], None]:
         """This is equivalent to the :py:meth:`file.readlines()` method, but
         it yields ISO-TP telegrams instead of lines.
 
         The  yielded telegrams are (can_id, payload_data) tuples.
 
-        :param bus: Input file or socket of can bus to read the can frames
+        :param bus: Input file or socket of can bus to read the can
+                    frames. For CAN busses, a :py:class:`CanBusReceiver`
+                    can be passed to configure the queue used for
+                    reception and to monitor its metrics.
         """
 
-        if isinstance(bus, can.BusABC):
-            # create an "on receive" event for the can bus
-            rx_event = asyncio.Event()
-            loop = asyncio.get_running_loop()
-            loop.add_reader(bus, rx_event.set)
-
-            while True:
-                await rx_event.wait()
-
-                msg = bus.recv()
-                if msg is None:
-                    continue
-                for tmp in self.decode_rx_frame(msg.arbitration_id, msg.data):
-                    yield tmp
+        if isinstance(bus, (can.BusABC, CanBusReceiver)):
+            receiver = bus if isinstance(bus, CanBusReceiver) else CanBusReceiver(bus)
+            decode_rx_frame = self.decode_rx_frame
+
+            receiver.start()
+            try:
+                while True:
+                    # process all frames which have been received since
+                    # the last iteration in one go
+                    for msg in await receiver.receive_batch():
+                        if msg.is_error_frame or msg.is_remote_frame:
+                            continue
+                        for tmp in decode_rx_frame(msg.arbitration_id, msg.data):
+                            yield tmp
+            finally:
+                if receiver is not bus:
+                    receiver.stop()
         else:
             assert isinstance(bus, TextIOBase)
             # input is a file
-            while bus:
-                cur_line = bus.readline()
-                if cur_line == "":
-                    return
-
-                if m := self.can_normal_frame_re.match(cur_line.strip()):
-                    # frame_interface = m.group(1)
-                    frame_id = int(m.group(2), 16)
-
-                    frame_data_formatted = m.group(3).strip()
-                    frame_data = bytearray([int(x, 16) for x in frame_data_formatted.split(" ")])
-
-                    for tmp in self.decode_rx_frame(frame_id, frame_data):
-                        yield tmp
-
-                elif (m := self.can_log_frame_re.match(
-                        cur_line.strip())) or (m := self.can_fd_log_frame_re.match(
-                            cur_line.strip())):
-                    # frame_interface = m.group(2)
-                    frame_id = int(m.group(2), 16)
-
-                    frame_data_formatted = m.group(3).strip()
-                    frame_data_list = [
-                        frame_data_formatted[i:i + 2]
-                        for i in range(0, len(frame_data_formatted), 2)
-                    ]
-                    frame_data = bytearray([int(x, 16) for x in frame_data_list])
-
-                    for tmp in self.decode_rx_frame(frame_id, frame_data):
-                        yield tmp
-
-                else:
-                    print(
-                        f"Warning: unrecognized frame format: '{cur_line.strip()}'",
-                        file=sys.stderr)
+            for _, telegram_id, payload in self.decode_frames(read_candump_frames(bus)):
+                yield telegram_id, payload
+
+    def decode_frames(self,
+                      frames: Iterable[CanFrame]) -> Iterator[tuple[float | None, int, bytes]]:
+        """Decode the ISO-TP telegrams contained by a sequence of CAN frames
+
+        The frames are (timestamp, can_id, data) tuples as produced by
+        the readers of the :py:mod:`odxtools.canlogreader`
+        module. The yielded telegrams are (timestamp, can_id,
+        payload_data) tuples, where the timestamp is the one of the
+        frame which completed the telegram.
+        """
+        decode_rx_frame = self.decode_rx_frame
+        for timestamp, can_id, data in frames:
+            for telegram_id, payload in decode_rx_frame(can_id, data):
+                yield timestamp, telegram_id, payload
 
     def can_rx_id(self, telegram_idx: int) -> int:
         """Given a Telegram index, returns the CAN ID for receiving data.
@@ -191,7 +233,11 @@ class IsoTpStateMachine:
 
         :raises IndexError: The telegram index is invalid.
         """
-        return self._telegram_data[telegram_idx]
+        telegram_data = self._telegram_data[telegram_idx]
+        if telegram_data is None:
+            return None
+
+        return telegram_data[:self._telegram_rx_len[telegram_idx]]
 
     ##############
     # Callbacks
@@ -265,23 +311,10 @@ class IsoTpActiveDecoder(IsoTpStateMachine):
         return self._can_tx_ids[telegram_idx]
 
     def on_single_frame(self, telegram_idx: int, frame_payload: bytes | bytearray) -> None:
-        # send ACK
-        # rx_id = self.can_rx_id(telegram_idx)
-        tx_id = self.can_tx_id(telegram_idx)
-        block_size = 0xFF
-        min_separation_time = 0  # ms
-        fc_payload = bitstruct.pack(
-            "u4u4u8u8",
-            IsoTp.FRAME_TYPE_FLOW_CONTROL,
-            IsoTp.FLOW_CONTROL_CONTINUE,
-            block_size,  # does not matter here?!
-            min_separation_time,
-        )
-
-        self._send_can_message(tx_id, fc_payload)
+        # single frames are not acknowledged
         self._frames_received[telegram_idx] = None
 
-        super().on_first_frame(telegram_idx, frame_payload)
+        super().on_single_frame(telegram_idx, frame_payload)
 
     def on_first_frame(self, telegram_idx: int, frame_payload: bytes | bytearray) -> None:
         # send ACK
@@ -312,9 +345,10 @@ class IsoTpActiveDecoder(IsoTpStateMachine):
             # consequtive frame received before a first frame.
             # TODO (?): throw an exception
             return
-        self._frames_received[telegram_idx] = num_received + 1
+        num_received += 1
+        self._frames_received[telegram_idx] = num_received
 
-        # send new ACK if necessary
+        # send new ACK if the sender has transmitted a complete block
         block_size = self._block_size[telegram_idx]
         if block_size is not None and num_received >= block_size:
             # rx_id = self.can_rx_id(telegram_idx)
@@ -329,7 +363,7 @@ class IsoTpActiveDecoder(IsoTpStateMachine):
             )
             self._send_can_message(tx_id, fc_payload)
 
-            self._frames_received[telegram_idx] = 0  # TODO: 1?
+            self._frames_received[telegram_idx] = 0
 
         super().on_consecutive_frame(telegram_idx, segment_idx, frame_payload)
 
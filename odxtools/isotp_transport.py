@@ -0,0 +1,330 @@
+# SPDX-License-Identifier: MIT
+import asyncio
+from collections.abc import Iterable
+from dataclasses import dataclass
+from types import TracebackType
+from typing import TYPE_CHECKING
+
+import can
+
+from .canbusreceiver import CanBusReceiver
+from .isotp_state_machine import IsoTp, IsoTpActiveDecoder
+
+if TYPE_CHECKING:
+    from .diaglayers.hierarchyelement import HierarchyElement
+    from .diaglayers.protocol import Protocol
+
+#: The payload sizes which can be transported by CAN-FD frames
+CAN_FD_FRAME_SIZES = (8, 12, 16, 20, 24, 32, 48, 64)
+
+
+class IsoTpError(Exception):
+    """An ISO-TP telegram could not be transmitted"""
+
+
+@dataclass(kw_only=True, frozen=True)
+class IsoTpChannel:
+    """The CAN IDs used for a bidirectional ISO-TP connection"""
+
+    #: The CAN ID used to send telegrams
+    tx_id: int
+
+    #: The CAN ID on which telegrams and flow control frames are received
+    rx_id: int
+
+    #: The maximum payload size of the CAN frames
+    #:
+    #: This is 8 for classic CAN and up to 64 for CAN-FD (cf.
+    #: :py:meth:`HierarchyElement.get_max_can_payload_size`)
+    max_frame_size: int = 8
+
+    #: Use 29 bit CAN IDs
+    is_extended_id: bool = False
+
+    @property
+    def is_fd(self) -> bool:
+        return self.max_frame_size > 8
+
+    @staticmethod
+    def from_diag_layer(diag_layer: "HierarchyElement",
+                        protocol: "str | Protocol | None" = None) -> "IsoTpChannel":
+        """Create the channel of a tester which communicates with an
+        ECU using the latter's communication parameters"""
+        rx_id = diag_layer.get_can_send_id(protocol=protocol)
+        tx_id = diag_layer.get_can_receive_id(protocol=protocol)
+        if rx_id is None or tx_id is None:
+            raise IsoTpError(f"Diagnostic layer {diag_layer.short_name} does not specify "
+                             f"the CAN IDs used for diagnostics")
+
+        return IsoTpChannel(
+            tx_id=tx_id,
+            rx_id=rx_id,
+            max_frame_size=diag_layer.get_max_can_payload_size(protocol=protocol) or 8)
+
+
+def separation_time_from_stmin(stmin: int) -> float:
+    """Convert the STmin value of a flow control frame to seconds"""
+    if stmin <= 0x7f:
+        return stmin / 1000.0
+    elif 0xf1 <= stmin <= 0xf9:
+        return (stmin - 0xf0) / 10000.0
+
+    # reserved values must be treated like the maximum separation
+    # time
+    return 0.127
+
+
+def segment_telegram(payload: bytes | bytearray,
+                     max_frame_size: int = 8) -> tuple[bytes, list[bytes]]:
+    """Split a telegram into the frames needed to transmit it
+
+    Returns the single frame or first frame and the list of
+    consecutive frames. Padding is not applied.
+    """
+    n = len(payload)
+    if n <= 7:
+        return bytes([n]) + payload, []
+    elif max_frame_size > 8 and n <= max_frame_size - 2:
+        # CAN-FD single frame with escape sequence
+        return bytes([0x00, n]) + payload, []
+
+    if n <= 0xfff:
+        header = bytes([0x10 | (n >> 8), n & 0xff])
+    else:
+        # escape sequence for telegrams larger than 4095 bytes
+        header = bytes([0x10, 0x00]) + n.to_bytes(4, "big")
+
+    first_len = max_frame_size - len(header)
+    first_frame = header + payload[:first_len]
+
+    cf_len = max_frame_size - 1
+    consecutive_frames = [
+        bytes([0x20 | (i + 1) % 16]) + payload[pos:pos + cf_len]
+        for i, pos in enumerate(range(first_len, n, cf_len))
+    ]
+
+    return first_frame, consecutive_frames
+
+
+class _TxChannelState:
+
+    def __init__(self, channel: IsoTpChannel) -> None:
+        self.channel = channel
+        # only a single telegram can be in transmission per channel
+        self.lock = asyncio.Lock()
+        # the flow control frames received during the transmission
+        self.flow_control_frames: asyncio.Queue[bytes] | None = None
+
+
+class IsoTpTransmitter:
+    """Sends ISO-TP telegrams on a CAN bus using asyncio
+
+    Telegrams which do not fit into a single frame are segmented and
+    the block size and minimum separation time requested by the flow
+    control frames of the receiver are honored. The flow control
+    frames need to be passed to :py:meth:`handle_rx_frame` by whatever
+    receives the frames of the bus, e.g., :py:class:`IsoTpTransport`.
+    Telegrams can be sent concurrently on different channels.
+    """
+
+    def __init__(self,
+                 bus: can.BusABC,
+                 channels: Iterable[IsoTpChannel],
+                 *,
+                 padding_value: int | None = 0xcc,
+                 flow_control_timeout: float = 1.0,
+                 max_wait_frames: int = 16) -> None:
+        self.bus = bus
+        self.padding_value = padding_value
+        #: The time to wait for a flow control frame (N_Bs) [s]
+        self.flow_control_timeout = flow_control_timeout
+        #: The maximum number of consecutive WAIT flow control frames
+        self.max_wait_frames = max_wait_frames
+
+        self._channels: dict[int, _TxChannelState] = {}
+        self._channels_by_rx_id: dict[int, _TxChannelState] = {}
+        for channel in channels:
+            state = _TxChannelState(channel)
+            self._channels[channel.tx_id] = state
+            self._channels_by_rx_id[channel.rx_id] = state
+
+    def handle_rx_frame(self, can_id: int, data: bytes | bytearray) -> bool:
+        """Process a received CAN frame
+
+        Returns `True` if the frame is a flow control frame for a
+        telegram that is currently being sent.
+        """
+        state = self._channels_by_rx_id.get(can_id)
+        if state is None or state.flow_control_frames is None or not data or (
+                data[0] >> 4) != IsoTp.FRAME_TYPE_FLOW_CONTROL:
+            return False
+
+        state.flow_control_frames.put_nowait(bytes(data))
+        return True
+
+    async def send(self, tx_id: int, payload: bytes | bytearray) -> None:
+        """Send a telegram on the channel with the specified CAN ID
+
+        :raises IsoTpError: The receiver aborted the transmission
+        :raises TimeoutError: No flow control frame was received in time
+        """
+        state = self._channels[tx_id]
+        channel = state.channel
+
+        first_frame, consecutive_frames = segment_telegram(payload, channel.max_frame_size)
+        async with state.lock:
+            if not consecutive_frames:
+                self._send_frame(channel, first_frame)
+                return
+
+            state.flow_control_frames = asyncio.Queue()
+            try:
+                self._send_frame(channel, first_frame)
+
+                idx = 0
+                while idx < len(consecutive_frames):
+                    block_size, separation_time = await self._wait_for_clear_to_send(state)
+
+                    block_end = len(consecutive_frames)
+                    if block_size > 0:
+                        block_end = min(idx + block_size, block_end)
+
+                    for frame in consecutive_frames[idx:block_end]:
+                        if separation_time > 0:
+                            await asyncio.sleep(separation_time)
+                        self._send_frame(channel, frame)
+                    idx = block_end
+
+                    # give the other channels a chance to transmit
+                    await asyncio.sleep(0)
+            finally:
+                state.flow_control_frames = None
+
+    async def _wait_for_clear_to_send(self, state: _TxChannelState) -> tuple[int, float]:
+        assert state.flow_control_frames is not None
+
+        for _ in range(self.max_wait_frames + 1):
+            frame = await asyncio.wait_for(state.flow_control_frames.get(),
+                                           self.flow_control_timeout)
+            flag = frame[0] & 0x0f
+            if flag == IsoTp.FLOW_CONTROL_CONTINUE:
+                block_size = frame[1] if len(frame) > 1 else 0
+                stmin = frame[2] if len(frame) > 2 else 0
+                return block_size, separation_time_from_stmin(stmin)
+            elif flag == IsoTp.FLOW_CONTROL_ABORT:
+                raise IsoTpError(f"Receiver of CAN ID 0x{state.channel.tx_id:x} "
+                                 f"aborted the transmission (overflow)")
+            elif flag != IsoTp.FLOW_CONTROL_WAIT:
+                raise IsoTpError(f"Invalid flow control flag {flag}")
+
+        raise IsoTpError(f"Receiver of CAN ID 0x{state.channel.tx_id:x} sent too many "
+                         f"WAIT flow control frames")
+
+    def _send_frame(self, channel: IsoTpChannel, data: bytes) -> None:
+        if self.padding_value is not None:
+            frame_len = 8
+            if len(data) > 8:
+                frame_len = next(x for x in CAN_FD_FRAME_SIZES if x >= len(data))
+            data += bytes([self.padding_value]) * (frame_len - len(data))
+
+        self.bus.send(
+            can.Message(
+                arbitration_id=channel.tx_id,
+                is_extended_id=channel.is_extended_id,
+                is_fd=channel.is_fd,
+                bitrate_switch=channel.is_fd,
+                data=data))
+
+
+class IsoTpTransport:
+    """Bidirectional ISO-TP communication on a CAN bus
+
+    Telegrams are received using an :py:class:`IsoTpActiveDecoder`,
+    i.e., flow control frames are sent for incoming multi-frame
+    telegrams, and sent using an :py:class:`IsoTpTransmitter`. The
+    frames of the bus are retrieved by a background task which must be
+    started using :py:meth:`start` or by using the transport as an
+    asynchronous context manager.
+    """
+
+    def __init__(self,
+                 bus: can.BusABC,
+                 channels: Iterable[IsoTpChannel],
+                 *,
+                 padding_value: int | None = 0xcc,
+                 receiver: CanBusReceiver | None = None) -> None:
+        self.channels = list(channels)
+        self.bus = bus
+        self.receiver = receiver if receiver is not None else CanBusReceiver(bus)
+        self.transmitter = IsoTpTransmitter(bus, self.channels, padding_value=padding_value)
+        self.decoder = IsoTpActiveDecoder(
+            can_bus=bus,
+            can_rx_ids=[x.rx_id for x in self.channels],
+            can_tx_ids=[x.tx_id for x in self.channels],
+            padding_size=0 if padding_value is None else 8,
+            padding_value=0 if padding_value is None else padding_value)
+
+        self._rx_queues: dict[int, asyncio.Queue[bytes]] = {
+            x.rx_id: asyncio.Queue()
+            for x in self.channels
+        }
+        self._rx_task: asyncio.Task[None] | None = None
+
+    async def send(self, tx_id: int, payload: bytes | bytearray) -> None:
+        """Send a telegram using the channel with the specified CAN ID"""
+        await self.transmitter.send(tx_id, payload)
+
+    async def receive(self, rx_id: int, timeout: float | None = None) -> bytes:
+        """Wait for the next telegram on the channel with the
+        specified receive ID
+
+        :raises TimeoutError: No telegram was received in time
+        """
+        return await asyncio.wait_for(self._rx_queues[rx_id].get(), timeout)
+
+    def clear_rx_queue(self, rx_id: int) -> None:
+        """Discard all telegrams which have been received on a channel
+        but not retrieved yet"""
+        queue = self._rx_queues[rx_id]
+        while not queue.empty():
+            queue.get_nowait()
+
+    def start(self) -> None:
+        if self._rx_task is not None:
+            return
+
+        self.receiver.start()
+        self._rx_task = asyncio.create_task(self._rx_loop())
+
+    async def stop(self) -> None:
+        if self._rx_task is None:
+            return
+
+        self._rx_task.cancel()
+        try:
+            await self._rx_task
+        except asyncio.CancelledError:
+            pass
+        self._rx_task = None
+        self.receiver.stop()
+
+    async def __aenter__(self) -> "IsoTpTransport":
+        self.start()
+        return self
+
+    async def __aexit__(self, exc_type: type[BaseException] | None, exc_value: BaseException | None,
+                        traceback: TracebackType | None) -> None:
+        await self.stop()
+
+    async def _rx_loop(self) -> None:
+        handle_rx_frame = self.transmitter.handle_rx_frame
+        decode_rx_frame = self.decoder.decode_rx_frame
+        rx_queues = self._rx_queues
+        while True:
+            for msg in await self.receiver.receive_batch():
+                if msg.is_error_frame or msg.is_remote_frame:
+                    continue
+                if handle_rx_frame(msg.arbitration_id, msg.data):
+                    continue
+                for rx_id, payload in decode_rx_frame(msg.arbitration_id, msg.data):
+                    rx_queues[rx_id].put_nowait(payload)
@@ -1,7 +1,8 @@
 # SPDX-License-Identifier: MIT
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import TYPE_CHECKING, Union
 
+from .decodestate import DecodeState
 from .odxtypes import ParameterValue, ParameterValueDict
 
 if TYPE_CHECKING:
@@ -18,6 +19,13 @@ class Message:
     over the wire using ISO-TP (CAN/LIN) or DoIP (Ethernet), while the
     remaining attributes of the class specify the "human readable"
     interpretation of the same data.
+
+    Messages may be decoded lazily (cf. `Message.create_lazy()`). In
+    this case, the values of the parameters are only decoded when
+    they are accessed via `message[param_name]` and `param_dict`
+    only contains the parameters which have been decoded so far. Use
+    `decode_all()` to retrieve the values of all parameters of such
+    messages.
     """
 
     coded_message: bytes
@@ -25,5 +33,75 @@ class Message:
     coding_object: Union["Request", "Response"]
     param_dict: ParameterValueDict
 
+    #: The state used to decode the remaining parameters of lazily
+    #: decoded messages. If this is `None`, all parameters have been
+    #: decoded.
+    _lazy_decode_state: DecodeState | None = field(
+        default=None, init=False, repr=False, compare=False)
+
+    #: The number of parameters of the coding object which have
+    #: already been decoded for lazily decoded messages
+    _num_decoded_params: int = field(default=0, init=False, repr=False, compare=False)
+
+    @staticmethod
+    def create_lazy(*, coded_message: bytes, service: "DiagService",
+                    coding_object: Union["Request", "Response"]) -> "Message":
+        """Create a message object whose parameters are decoded on
+        demand
+
+        Note that this method does not check if the coding object is
+        applicable to the message. (For this,
+        `composite_codec_verify_constants()` can be used.)
+        """
+        result = Message(
+            coded_message=coded_message,
+            service=service,
+            coding_object=coding_object,
+            param_dict={})
+
+        if len(coding_object.parameters) > 0:
+            result._lazy_decode_state = DecodeState(coded_message=coded_message)
+
+        return result
+
+    @property
+    def is_fully_decoded(self) -> bool:
+        """True if the values of all parameters of the message are
+        available in `param_dict`"""
+        return self._lazy_decode_state is None
+
+    def decode_all(self) -> ParameterValueDict:
+        """Decode all parameters of the message which have not yet
+        been decoded and return the complete dictionary of parameter
+        values"""
+        while self._lazy_decode_state is not None:
+            self._decode_next_parameter()
+
+        return self.param_dict
+
+    def _decode_next_parameter(self) -> None:
+        decode_state = self._lazy_decode_state
+        if decode_state is None:
+            return
+
+        # since the positions of parameters may depend on the
+        # preceeding parameters and since length- and table keys as
+        # well as environment data descriptions refer to parameters
+        # that have been decoded earlier, the parameters are decoded
+        # in order.
+        params = self.coding_object.parameters
+        param = params[self._num_decoded_params]
+        value = param.decode_from_pdu(decode_state)
+
+        decode_state.record_param_value(param, value)
+        self.param_dict[param.short_name] = value
+        self._num_decoded_params += 1
+
+        if self._num_decoded_params >= len(params):
+            self._lazy_decode_state = None
+
     def __getitem__(self, key: str) -> ParameterValue:
+        while key not in self.param_dict and self._lazy_decode_state is not None:
+            self._decode_next_parameter()
+
         return self.param_dict[key]
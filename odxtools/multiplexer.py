@@ -1,4 +1,5 @@
 # SPDX-License-Identifier: MIT
+from bisect import bisect_right
 from dataclasses import dataclass, field
 from typing import Any, cast
 from xml.etree import ElementTree
@@ -39,6 +40,23 @@ class Multiplexer(ComplexDop):
     def is_visible(self) -> bool:
         return self.is_visible_raw is True
 
+    def __post_init__(self) -> None:
+        self._case_index_built = False
+
+        #: The sorted and non-overlapping key intervals of the cases
+        #: as (lower limit, upper limit, case) tuples. If a key value
+        #: is covered by multiple cases, the interval is attributed to
+        #: the case which is defined first. `None` means that the
+        #: limits of the cases are not integers, so no index can be
+        #: used.
+        self._case_intervals: list[tuple[int, int, MultiplexerCase]] | None = None
+
+        #: The lower limits of the entries in `_case_intervals`
+        self._case_interval_starts: list[int] = []
+
+        #: Mapping from short names to the cases
+        self._cases_by_short_name: dict[str, list[MultiplexerCase]] = {}
+
     @staticmethod
     @override
     def from_et(et_element: ElementTree.Element, context: OdxDocContext) -> "Multiplexer":
@@ -88,6 +106,9 @@ class Multiplexer(ComplexDop):
             mux_case._mux_case_resolve_odxlinks(
                 odxlinks, key_physical_type=self.switch_key.dop.physical_type.base_data_type)
 
+        # the limits of the cases depend on the switch key's DOP
+        self._case_index_built = False
+
     @override
     def _resolve_snrefs(self, context: SnRefContext) -> None:
         super()._resolve_snrefs(context)
@@ -108,6 +129,75 @@ class Multiplexer(ComplexDop):
             odxraise("Upper and lower bounds of limits must compareable")
         return lower_limit, upper_limit
 
+    def _build_case_index(self) -> None:
+        self._cases_by_short_name = {}
+        for mux_case in self.cases:
+            self._cases_by_short_name.setdefault(mux_case.short_name, []).append(mux_case)
+
+        self._case_intervals = self._compute_case_intervals()
+        self._case_interval_starts = [x[0] for x in self._case_intervals or []]
+        self._case_index_built = True
+
+    def _compute_case_intervals(self) -> list[tuple[int, int, MultiplexerCase]] | None:
+        intervals: list[tuple[int, int, MultiplexerCase]] = []
+        starts: list[int] = []
+        for mux_case in self.cases:
+            lower, upper = self._get_case_limits(mux_case)
+            if not isinstance(lower, int) or not isinstance(upper, int):
+                return None
+
+            # determine the parts of the case's range which are not
+            # yet covered by any of the previous cases
+            new_intervals = []
+            cursor = lower
+            idx = bisect_right(starts, lower) - 1
+            if idx < 0 or intervals[idx][1] < lower:
+                idx += 1
+            while idx < len(intervals) and intervals[idx][0] <= upper:
+                if intervals[idx][0] > cursor:
+                    new_intervals.append((cursor, intervals[idx][0] - 1, mux_case))
+                cursor = max(cursor, intervals[idx][1] + 1)
+                idx += 1
+            if cursor <= upper:
+                new_intervals.append((cursor, upper, mux_case))
+
+            for interval in new_intervals:
+                idx = bisect_right(starts, interval[0])
+                starts.insert(idx, interval[0])
+                intervals.insert(idx, interval)
+
+        return intervals
+
+    def _find_case(self, key_value: AtomicOdxType) -> MultiplexerCase | None:
+        """Return the first case whose range contains a key value
+
+        `None` is returned if no such case exists.
+        """
+        if not self._case_index_built:
+            self._build_case_index()
+
+        if self._case_intervals is None or not isinstance(key_value, int):
+            for mux_case in self.cases:
+                lower, upper = self._get_case_limits(mux_case)
+                if lower <= key_value and key_value <= upper:  # type: ignore[operator]
+                    return mux_case
+
+            return None
+
+        idx = bisect_right(self._case_interval_starts, key_value) - 1
+        if idx >= 0:
+            _, upper, mux_case = self._case_intervals[idx]
+            if key_value <= upper:
+                return mux_case
+
+        return None
+
+    def _find_cases_by_short_name(self, short_name: str) -> list[MultiplexerCase]:
+        if not self._case_index_built:
+            self._build_case_index()
+
+        return self._cases_by_short_name.get(short_name, [])
+
     @override
     def encode_into_pdu(self, physical_value: ParameterValue, encode_state: EncodeState) -> None:
 
@@ -132,7 +222,7 @@ class Multiplexer(ComplexDop):
         applicable_cases: list[MultiplexerCase | MultiplexerDefaultCase]
 
         if isinstance(case_spec, str):
-            applicable_cases = [x for x in self.cases if x.short_name == case_spec]
+            applicable_cases = list(self._find_cases_by_short_name(case_spec))
             if not applicable_cases and self.default_case:
                 applicable_cases.append(self.default_case)
             if len(applicable_cases) == 0:
@@ -146,20 +236,15 @@ class Multiplexer(ComplexDop):
             else:
                 key_value = 0
         elif isinstance(case_spec, int):
-            applicable_cases = []
-            for x in self.cases:
-                lower, upper = cast(tuple[int, int], self._get_case_limits(x))
-                if lower <= case_spec and case_spec <= upper:
-                    applicable_cases.append(x)
-
-            if len(applicable_cases) == 0:
+            applicable_case = self._find_case(case_spec)
+            if applicable_case is None:
                 if self.default_case is None:
                     raise EncodeError(
                         f"Multiplexer {self.short_name} does not know any case called {case_spec}")
                 mux_case = self.default_case
                 key_value = case_spec
             else:
-                mux_case = applicable_cases[0]
+                mux_case = applicable_case
                 key_value = case_spec
         elif isinstance(case_spec, MultiplexerCase):
             mux_case = case_spec
@@ -210,12 +295,8 @@ class Multiplexer(ComplexDop):
         # relatively to the byte position of the MUX."
         decode_state.cursor_byte_position = decode_state.origin_byte_position + self.byte_position
 
-        applicable_case: MultiplexerCase | MultiplexerDefaultCase | None = None
-        for mux_case in self.cases:
-            lower, upper = self._get_case_limits(mux_case)
-            if lower <= key_value and key_value <= upper:  # type: ignore[operator]
-                applicable_case = mux_case
-                break
+        applicable_case: MultiplexerCase | MultiplexerDefaultCase | None = self._find_case(
+            cast(AtomicOdxType, key_value))
 
         if applicable_case is None:
             applicable_case = self.default_case
@@ -0,0 +1,188 @@
+# SPDX-License-Identifier: MIT
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+from .diaglayers.basevariant import BaseVariant
+from .diaglayers.ecuvariant import EcuVariant
+from .diaglayers.hierarchyelement import HierarchyElement
+from .diaglayers.protocol import Protocol
+from .logicallink import LogicalLink
+
+if TYPE_CHECKING:
+    from .vehicleinfospec import VehicleInfoSpec
+
+
+@dataclass(kw_only=True)
+class NetworkNode:
+    """The bus identifiers used by a diagnostic layer for a protocol
+
+    The identifiers are taken from the communication parameters of
+    the layer. Identifiers which are not specified are `None`.
+    """
+
+    diag_layer: HierarchyElement
+
+    #: The protocol for which the identifiers apply. This is `None`
+    #: if the diagnostic layer does not use any protocol layer.
+    protocol: Protocol | None
+
+    #: The CAN ID used by the tester for physically addressed requests
+    can_request_id: int | None = None
+
+    #: The CAN ID used by the ECU for its responses
+    can_response_id: int | None = None
+
+    #: The CAN ID used by the tester for functionally addressed requests
+    can_functional_request_id: int | None = None
+
+    #: The logical DoIP address of the ECU
+    doip_logical_address: int | None = None
+
+    #: The logical DoIP address used for functionally addressed requests
+    doip_functional_address: int | None = None
+
+    #: The logical DoIP address of the gateway behind which the ECU is located
+    doip_gateway_address: int | None = None
+
+    #: The logical links of the vehicle information specifications
+    #: which lead to the diagnostic layer using the protocol
+    logical_links: list[LogicalLink] = field(default_factory=list)
+
+    @staticmethod
+    def from_diag_layer(diag_layer: HierarchyElement,
+                        protocol: Protocol | None = None) -> "NetworkNode":
+        return NetworkNode(
+            diag_layer=diag_layer,
+            protocol=protocol,
+            can_request_id=diag_layer.get_can_receive_id(protocol=protocol),
+            can_response_id=diag_layer.get_can_send_id(protocol=protocol),
+            can_functional_request_id=diag_layer.get_can_func_req_id(protocol=protocol),
+            doip_logical_address=diag_layer.get_doip_logical_ecu_address(protocol=protocol),
+            doip_functional_address=diag_layer.get_doip_logical_functional_address(
+                protocol=protocol),
+            doip_gateway_address=diag_layer.get_doip_logical_gateway_address(protocol=protocol))
+
+
+def _add_node(index: dict[int, list[NetworkNode]], key: int | None, node: NetworkNode) -> None:
+    if key is not None:
+        index.setdefault(key, []).append(node)
+
+
+class NetworkIndex:
+    """Maps the identifiers used on vehicle networks to diagnostic layers
+
+    The index contains a :py:class:`NetworkNode` for each combination
+    of a base or ECU variant and one of its protocols. All lookups are
+    dictionary accesses which return the list of matching nodes in
+    the order of the diagnostic layers in the database, base
+    variants first. Since several variants of the same ECU usually
+    share their identifiers, the lists often contain more than one
+    node.
+
+    The index is usually retrieved via
+    :py:meth:`Database.network_index`, which builds it once and
+    discards it when the database is refreshed.
+    """
+
+    def __init__(
+        self,
+        diag_layers: Iterable[HierarchyElement],
+        vehicle_info_specs: Iterable["VehicleInfoSpec"] = ()
+    ) -> None:
+        #: All nodes of the index
+        self.nodes: list[NetworkNode] = []
+
+        self._by_can_request_id: dict[int, list[NetworkNode]] = {}
+        self._by_can_response_id: dict[int, list[NetworkNode]] = {}
+        self._by_can_functional_request_id: dict[int, list[NetworkNode]] = {}
+        self._by_doip_address: dict[int, list[NetworkNode]] = {}
+        self._by_doip_functional_address: dict[int, list[NetworkNode]] = {}
+        self._by_doip_gateway_address: dict[int, list[NetworkNode]] = {}
+        self._by_diag_layer: dict[str, list[NetworkNode]] = {}
+        self._by_logical_link: dict[str, list[NetworkNode]] = {}
+
+        logical_links = [
+            link for spec in vehicle_info_specs for vehicle_info in spec.vehicle_informations
+            for link in vehicle_info.logical_links
+        ]
+
+        for diag_layer in diag_layers:
+            protocols: list[Protocol | None] = list(diag_layer.protocols) or [None]
+            for protocol in protocols:
+                node = NetworkNode.from_diag_layer(diag_layer, protocol)
+                node.logical_links = [
+                    x for x in logical_links if self._link_applies(x, diag_layer, protocol)
+                ]
+                self._add(node)
+
+    def for_can_request_id(self, can_id: int) -> list[NetworkNode]:
+        """Return the nodes that receive physically addressed requests
+        using a CAN ID"""
+        return self._by_can_request_id.get(can_id, [])
+
+    def for_can_response_id(self, can_id: int) -> list[NetworkNode]:
+        """Return the nodes that send responses using a CAN ID"""
+        return self._by_can_response_id.get(can_id, [])
+
+    def for_can_functional_request_id(self, can_id: int) -> list[NetworkNode]:
+        """Return the nodes that receive functionally addressed
+        requests using a CAN ID"""
+        return self._by_can_functional_request_id.get(can_id, [])
+
+    def for_can_id(self, can_id: int) -> list[NetworkNode]:
+        """Return the nodes which use a CAN ID for any purpose"""
+        return self.for_can_request_id(can_id) + self.for_can_response_id(can_id) + \
+            self.for_can_functional_request_id(can_id)
+
+    def for_doip_address(self, address: int) -> list[NetworkNode]:
+        """Return the nodes that use a logical DoIP address"""
+        return self._by_doip_address.get(address, [])
+
+    def for_doip_functional_address(self, address: int) -> list[NetworkNode]:
+        """Return the nodes that receive functionally addressed
+        requests via a logical DoIP address"""
+        return self._by_doip_functional_address.get(address, [])
+
+    def for_doip_gateway_address(self, address: int) -> list[NetworkNode]:
+        """Return the nodes that are located behind the DoIP gateway
+        with a given logical address"""
+        return self._by_doip_gateway_address.get(address, [])
+
+    def for_diag_layer(self, diag_layer: HierarchyElement | str) -> list[NetworkNode]:
+        """Return the nodes of a diagnostic layer, one per protocol"""
+        if not isinstance(diag_layer, str):
+            diag_layer = diag_layer.short_name
+        return self._by_diag_layer.get(diag_layer, [])
+
+    def for_logical_link(self, logical_link: LogicalLink | str) -> list[NetworkNode]:
+        """Return the nodes which can be reached via a logical link"""
+        if not isinstance(logical_link, str):
+            logical_link = logical_link.short_name
+        return self._by_logical_link.get(logical_link, [])
+
+    def _add(self, node: NetworkNode) -> None:
+        self.nodes.append(node)
+        _add_node(self._by_can_request_id, node.can_request_id, node)
+        _add_node(self._by_can_response_id, node.can_response_id, node)
+        _add_node(self._by_can_functional_request_id, node.can_functional_request_id, node)
+        _add_node(self._by_doip_address, node.doip_logical_address, node)
+        _add_node(self._by_doip_functional_address, node.doip_functional_address, node)
+        _add_node(self._by_doip_gateway_address, node.doip_gateway_address, node)
+        self._by_diag_layer.setdefault(node.diag_layer.short_name, []).append(node)
+        for link in node.logical_links:
+            self._by_logical_link.setdefault(link.short_name, []).append(node)
+
+    @staticmethod
+    def _link_applies(link: LogicalLink, diag_layer: HierarchyElement,
+                      protocol: Protocol | None) -> bool:
+        if link.protocol is not None and (protocol is None or
+                                          link.protocol.short_name != protocol.short_name):
+            return False
+
+        base_variant = diag_layer.base_variant if isinstance(diag_layer, EcuVariant) \
+            else diag_layer
+        if not isinstance(base_variant, BaseVariant) or link.base_variant is None:
+            return False
+
+        return link.base_variant.short_name == base_variant.short_name
@@ -222,7 +222,7 @@ class TableKeyParameter(Parameter):
             tr_short_name = encode_state.table_keys[self.short_name]
 
         # We need to encode the table key using the associated DOP into the PDU.
-        tr_candidates = [x for x in self.table.table_rows if x.short_name == tr_short_name]
+        tr_candidates = self.table.get_table_rows_by_short_name(tr_short_name)
         if len(tr_candidates) == 0:
             odxraise(f"No table row with short name '{tr_short_name}' found", EncodeError)
             return
@@ -246,7 +246,7 @@ class TableKeyParameter(Parameter):
             key_dop = odxrequire(self.table.key_dop)
             key_dop_val = key_dop.decode_from_pdu(decode_state)
 
-            table_row_candidates = [x for x in self.table.table_rows if x.key == key_dop_val]
+            table_row_candidates = self.table.get_table_rows_by_key(key_dop_val)
             if len(table_row_candidates) == 0:
                 raise DecodeError(f"No table row exhibiting the key '{str(key_dop_val)}' found")
             elif len(table_row_candidates) > 1:
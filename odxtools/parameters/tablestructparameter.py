@@ -132,7 +132,7 @@ class TableStructParameter(Parameter):
         # encode the user specified value using the structure (or DOP)
         # of the selected table row
         table = self.table_key.table
-        candidate_trs = [tr for tr in table.table_rows if tr.short_name == tr_short_name]
+        candidate_trs = table.get_table_rows_by_short_name(tr_short_name)
         if len(candidate_trs) == 0:
             odxraise(
                 f"Could not find a table row named "
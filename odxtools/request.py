@@ -1,18 +1,17 @@
 # SPDX-License-Identifier: MIT
+from collections.abc import Iterable, Iterator, Mapping
 from dataclasses import dataclass, field
-from typing import Any, cast
+from functools import cached_property
+from typing import TYPE_CHECKING, Any, cast
 from xml.etree import ElementTree
 
 from .admindata import AdminData
-from .compositecodec import (composite_codec_decode_from_pdu, composite_codec_encode_into_pdu,
-                             composite_codec_get_coded_const_prefix,
-                             composite_codec_get_free_parameters,
-                             composite_codec_get_required_parameters,
-                             composite_codec_get_static_bit_length)
+from .compositecodec import (CompositeCodecMetadata, composite_codec_constants_match,
+                             composite_codec_decode_from_pdu, composite_codec_encode_into_pdu)
 from .decodestate import DecodeState
 from .element import IdentifiableElement
 from .encodestate import EncodeState
-from .exceptions import odxraise
+from .exceptions import DecodeMismatch, odxraise
 from .nameditemlist import NamedItemList
 from .odxdoccontext import OdxDocContext
 from .odxlink import OdxLinkDatabase, OdxLinkId
@@ -23,6 +22,9 @@ from .snrefcontext import SnRefContext
 from .specialdatagroup import SpecialDataGroup
 from .utils import dataclass_fields_asdict
 
+if TYPE_CHECKING:
+    from .compiledencoder import CompiledEncoder, EncodeResult
+
 
 @dataclass(kw_only=True)
 class Request(IdentifiableElement):
@@ -36,11 +38,15 @@ class Request(IdentifiableElement):
 
     @property
     def required_parameters(self) -> list[Parameter]:
-        return composite_codec_get_required_parameters(self)
+        return self.codec_metadata.required_parameters
 
     @property
     def free_parameters(self) -> list[Parameter]:
-        return composite_codec_get_free_parameters(self)
+        return self.codec_metadata.free_parameters
+
+    @cached_property
+    def codec_metadata(self) -> CompositeCodecMetadata:
+        return CompositeCodecMetadata(self)
 
     @staticmethod
     def from_et(et_element: ElementTree.Element, context: OdxDocContext) -> "Request":
@@ -70,6 +76,8 @@ class Request(IdentifiableElement):
         return result
 
     def _resolve_odxlinks(self, odxlinks: OdxLinkDatabase) -> None:
+        self.__dict__.pop("codec_metadata", None)
+
         if self.admin_data is not None:
             self.admin_data._resolve_odxlinks(odxlinks)
 
@@ -95,8 +103,12 @@ class Request(IdentifiableElement):
         context.request = None
         context.parameters = None
 
+        # the referenced objects may have changed, so the structural
+        # properties must be determined again when they are needed
+        self.__dict__.pop("codec_metadata", None)
+
     def get_static_bit_length(self) -> int | None:
-        return composite_codec_get_static_bit_length(self)
+        return self.codec_metadata.static_bit_length
 
     def print_free_parameters_info(self) -> None:
         """Print a human readable description of the composite codec's
@@ -108,13 +120,56 @@ class Request(IdentifiableElement):
 
     def encode(self, **kwargs: ParameterValue) -> bytearray:
         encode_state = EncodeState(is_end_of_pdu=True)
+        if (bit_length := self.codec_metadata.static_bit_length) is not None:
+            encode_state.ensure_length(bit_length // 8)
 
         self.encode_into_pdu(physical_value=kwargs, encode_state=encode_state)
 
         return encode_state.coded_message
 
-    def decode(self, message: bytes | bytearray) -> ParameterValueDict:
-        decode_state = DecodeState(coded_message=bytes(message))
+    def compile_encoder(self,
+                        fixed_params: dict[str, ParameterValue] | None = None) -> "CompiledEncoder":
+        """Create a function which efficiently encodes the request
+
+        The values of the parameters specified by `fixed_params` are
+        the same for all messages produced by the returned encoder.
+        The values of the remaining parameters are passed to the
+        encoder as keyword arguments, e.g.::
+
+            encoder = request.compile_encoder(fixed_params={"did": 0xf190})
+            coded_message = encoder(value=123)
+
+        Note that compiled encoders must be recreated after the
+        database has been refreshed.
+        """
+        from .compiledencoder import CompiledEncoder
+
+        return CompiledEncoder(self, fixed_params or {})
+
+    def encode_many(self,
+                    rows: Iterable[ParameterValueDict] | Mapping[str, Iterable[ParameterValue]],
+                    *,
+                    fixed_params: dict[str, ParameterValue] | None = None
+                   ) -> Iterator["EncodeResult"]:
+        """Encode the request for each of a batch of parameter values
+
+        This is a shortcut for
+        `request.compile_encoder(fixed_params).encode_many(rows)`; see
+        `CompiledEncoder.encode_many()` for details.
+        """
+        return self.compile_encoder(fixed_params).encode_many(rows)
+
+    def decode(self,
+               message: bytes | bytearray,
+               *,
+               columnar_fields: bool = False) -> ParameterValueDict:
+        """Decode a message
+
+        If `columnar_fields` is true, the values of fields are
+        represented as a dictionary of lists instead of a list of
+        dictionaries (cf. `DecodeState.columnar_fields`).
+        """
+        decode_state = DecodeState(coded_message=bytes(message), columnar_fields=columnar_fields)
         param_values = self.decode_from_pdu(decode_state)
 
         if not isinstance(param_values, dict):
@@ -122,6 +177,26 @@ class Request(IdentifiableElement):
 
         return cast(ParameterValueDict, param_values)
 
+    def try_decode(self, message: bytes | bytearray) -> ParameterValueDict | None:
+        """Decode a message if the request applies to it
+
+        In contrast to `decode()`, `None` is returned instead of
+        raising an exception if the request does not apply to the
+        message, i.e., if any of its constant parameters do not
+        match. The constant parameters are checked before the
+        variable parts of the message are decoded, so this is cheap
+        for messages to which the request does not apply. Other
+        decoding errors, e.g., for truncated messages, are raised
+        like for `decode()`.
+        """
+        if not composite_codec_constants_match(self, message):
+            return None
+
+        try:
+            return self.decode(message)
+        except DecodeMismatch:
+            return None
+
     def encode_into_pdu(self, physical_value: ParameterValue | None,
                         encode_state: EncodeState) -> None:
         composite_codec_encode_into_pdu(self, physical_value, encode_state)
@@ -130,4 +205,4 @@ class Request(IdentifiableElement):
         return composite_codec_decode_from_pdu(self, decode_state)
 
     def coded_const_prefix(self, request_prefix: bytes = b'') -> bytearray:
-        return composite_codec_get_coded_const_prefix(self, request_prefix)
+        return bytearray(self.codec_metadata.coded_const_prefix(request_prefix))
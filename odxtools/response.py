@@ -1,19 +1,17 @@
 # SPDX-License-Identifier: MIT
 from dataclasses import dataclass, field
 from enum import Enum
+from functools import cached_property
 from typing import Any, cast
 from xml.etree import ElementTree
 
 from .admindata import AdminData
-from .compositecodec import (composite_codec_decode_from_pdu, composite_codec_encode_into_pdu,
-                             composite_codec_get_coded_const_prefix,
-                             composite_codec_get_free_parameters,
-                             composite_codec_get_required_parameters,
-                             composite_codec_get_static_bit_length)
+from .compositecodec import (CompositeCodecMetadata, composite_codec_constants_match,
+                             composite_codec_decode_from_pdu, composite_codec_encode_into_pdu)
 from .decodestate import DecodeState
 from .element import IdentifiableElement
 from .encodestate import EncodeState
-from .exceptions import odxraise
+from .exceptions import DecodeMismatch, odxraise
 from .nameditemlist import NamedItemList
 from .odxdoccontext import OdxDocContext
 from .odxlink import OdxLinkDatabase, OdxLinkId
@@ -84,6 +82,8 @@ class Response(IdentifiableElement):
         return result
 
     def _resolve_odxlinks(self, odxlinks: OdxLinkDatabase) -> None:
+        self.__dict__.pop("codec_metadata", None)
+
         if self.admin_data is not None:
             self.admin_data._resolve_odxlinks(odxlinks)
 
@@ -109,19 +109,34 @@ class Response(IdentifiableElement):
         context.response = None
         context.parameters = None
 
+        # the referenced objects may have changed, so the structural
+        # properties must be determined again when they are needed
+        self.__dict__.pop("codec_metadata", None)
+
     def encode(self,
                coded_request: bytes | bytearray | None = None,
                **kwargs: ParameterValue) -> bytearray:
         encode_state = EncodeState(
             triggering_request=bytes(coded_request) if coded_request is not None else None,
             is_end_of_pdu=True)
+        if (bit_length := self.codec_metadata.static_bit_length) is not None:
+            encode_state.ensure_length(bit_length // 8)
 
         self.encode_into_pdu(physical_value=kwargs, encode_state=encode_state)
 
         return encode_state.coded_message
 
-    def decode(self, message: bytes | bytearray) -> ParameterValueDict:
-        decode_state = DecodeState(coded_message=message)
+    def decode(self,
+               message: bytes | bytearray,
+               *,
+               columnar_fields: bool = False) -> ParameterValueDict:
+        """Decode a message
+
+        If `columnar_fields` is true, the values of fields are
+        represented as a dictionary of lists instead of a list of
+        dictionaries (cf. `DecodeState.columnar_fields`).
+        """
+        decode_state = DecodeState(coded_message=message, columnar_fields=columnar_fields)
         param_values = self.decode_from_pdu(decode_state)
 
         if not isinstance(param_values, dict):
@@ -129,6 +144,26 @@ class Response(IdentifiableElement):
 
         return cast(ParameterValueDict, param_values)
 
+    def try_decode(self, message: bytes | bytearray) -> ParameterValueDict | None:
+        """Decode a message if the response applies to it
+
+        In contrast to `decode()`, `None` is returned instead of
+        raising an exception if the response does not apply to the
+        message, i.e., if any of its constant parameters do not
+        match. The constant parameters are checked before the
+        variable parts of the message are decoded, so this is cheap
+        for messages to which the response does not apply. Other
+        decoding errors, e.g., for truncated messages, are raised
+        like for `decode()`.
+        """
+        if not composite_codec_constants_match(self, message):
+            return None
+
+        try:
+            return self.decode(message)
+        except DecodeMismatch:
+            return None
+
     def encode_into_pdu(self, physical_value: ParameterValue | None,
                         encode_state: EncodeState) -> None:
         composite_codec_encode_into_pdu(self, physical_value, encode_state)
@@ -137,15 +172,19 @@ class Response(IdentifiableElement):
         return composite_codec_decode_from_pdu(self, decode_state)
 
     def get_static_bit_length(self) -> int | None:
-        return composite_codec_get_static_bit_length(self)
+        return self.codec_metadata.static_bit_length
 
     @property
     def required_parameters(self) -> list[Parameter]:
-        return composite_codec_get_required_parameters(self)
+        return self.codec_metadata.required_parameters
 
     @property
     def free_parameters(self) -> list[Parameter]:
-        return composite_codec_get_free_parameters(self)
+        return self.codec_metadata.free_parameters
+
+    @cached_property
+    def codec_metadata(self) -> CompositeCodecMetadata:
+        return CompositeCodecMetadata(self)
 
     def print_free_parameters_info(self) -> None:
         """Return a human readable description of the structure's
@@ -156,4 +195,4 @@ class Response(IdentifiableElement):
         print(parameter_info(self.free_parameters), end="")
 
     def coded_const_prefix(self, request_prefix: bytes = b'') -> bytearray:
-        return composite_codec_get_coded_const_prefix(self, request_prefix)
+        return bytearray(self.codec_metadata.coded_const_prefix(request_prefix))
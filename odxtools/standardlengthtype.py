@@ -46,7 +46,7 @@ class StandardLengthType(DiagCodedType):
             maskable_types = (DataType.A_UINT32, DataType.A_INT32, DataType.A_BYTEFIELD)
             odxassert(
                 self.base_data_type in maskable_types,
-                'Can not apply a bit_mask on a value of type {self.base_data_type}',
+                lambda: f"Can not apply a bit_mask on a value of type {self.base_data_type}",
             )
 
     def __get_used_mask(self, internal_value: AtomicOdxType) -> bytes | None:
@@ -3,7 +3,7 @@ from collections.abc import Generator
 from dataclasses import dataclass
 from typing import TYPE_CHECKING, Any
 
-from .exceptions import odxraise
+from .exceptions import DecodeError, odxraise
 from .odxtypes import ParameterValueDict
 from .state import State
 from .statechart import StateChart
@@ -162,7 +162,14 @@ class StateMachine:
         if raw_resp is None:
             raise RuntimeError("The calling code must send back a reply")
         elif isinstance(raw_resp, (bytes, bytearray)):
-            for decoded_resp_msg in self.diag_layer.decode_response(raw_resp, raw_req):
+            decoded_resp_msgs = self.diag_layer.try_decode_response(raw_resp, raw_req)
+            if decoded_resp_msgs is None:
+                odxraise(
+                    f"The response {raw_resp.hex()} to the request of service "
+                    f"{service.short_name} could not be decoded", DecodeError)
+                decoded_resp_msgs = []
+
+            for decoded_resp_msg in decoded_resp_msgs:
                 for stransref in service.state_transition_refs:
                     # we only execute the first applicable state
                     # transition: The spec seems to imply a
@@ -0,0 +1,307 @@
+# SPDX-License-Identifier: MIT
+import struct
+from collections.abc import Callable
+from typing import Literal, Optional
+
+from .basicstructure import BasicStructure
+from .compumethods.identicalcompumethod import IdenticalCompuMethod
+from .dataobjectproperty import DataObjectProperty
+from .decodestate import DecodeState
+from .diagcodedtype import DiagCodedType
+from .dtcdop import DtcDop
+from .encoding import Encoding
+from .odxtypes import AtomicOdxType, DataType, ParameterValue, ParameterValueDict
+from .parameters.codedconstparameter import CodedConstParameter
+from .parameters.parameter import Parameter
+from .parameters.valueparameter import ValueParameter
+from .standardlengthtype import StandardLengthType
+
+#: Function which extracts the internal value of a parameter from a
+#: PDU given the absolute byte position of the parameter
+Extractor = Callable[[bytes | bytearray, int], AtomicOdxType]
+
+#: Function which converts the internal value of a parameter to its
+#: physical value
+Converter = Callable[[AtomicOdxType], ParameterValue]
+
+_STRUCT_INT_FORMATS = {1: "B", 2: "H", 4: "I", 8: "Q"}
+_STRUCT_FLOAT_FORMATS = {4: "f", 8: "d"}
+
+
+def _make_extractor(dct: StandardLengthType) -> Extractor | None:
+    """Create a function that extracts values of a byte aligned diag
+    coded type without going through the generic machinery"""
+    n = dct.bit_length // 8
+    byteorder: Literal["big", "little"] = "big" if dct.is_highlow_byte_order else "little"
+    base_data_type = dct.base_data_type
+    encoding = dct.base_type_encoding
+
+    if base_data_type == DataType.A_UINT32 and encoding in (None, Encoding.NONE):
+        return lambda data, pos: int.from_bytes(data[pos:pos + n], byteorder)
+    elif base_data_type == DataType.A_INT32 and encoding in (None, Encoding.TWOC):
+        return lambda data, pos: int.from_bytes(data[pos:pos + n], byteorder, signed=True)
+    elif base_data_type == DataType.A_BYTEFIELD and encoding in (None, Encoding.NONE):
+        return lambda data, pos: bytes(data[pos:pos + n])
+    elif base_data_type in (DataType.A_FLOAT32, DataType.A_FLOAT64) and \
+         encoding in (None, Encoding.NONE) and n in _STRUCT_FLOAT_FORMATS:
+        float_struct = struct.Struct(("<", ">")[dct.is_highlow_byte_order] +
+                                     _STRUCT_FLOAT_FORMATS[n])
+        return lambda data, pos: float(float_struct.unpack_from(data, pos)[0])
+
+    return None
+
+
+def _struct_format_letter(dct: StandardLengthType) -> str | None:
+    n = dct.bit_length // 8
+    if dct.base_data_type == DataType.A_UINT32:
+        return _STRUCT_INT_FORMATS.get(n)
+    elif dct.base_data_type == DataType.A_INT32:
+        letter = _STRUCT_INT_FORMATS.get(n)
+        return None if letter is None else letter.lower()
+    elif dct.base_data_type in (DataType.A_FLOAT32, DataType.A_FLOAT64):
+        return _STRUCT_FLOAT_FORMATS.get(n)
+
+    return None
+
+
+def _get_plain_coded_type(diag_coded_type: DiagCodedType) -> StandardLengthType | None:
+    if not isinstance(diag_coded_type, StandardLengthType) or \
+       diag_coded_type.bit_mask is not None or \
+       diag_coded_type.bit_length <= 0 or \
+       diag_coded_type.bit_length % 8 != 0:
+        return None
+
+    return diag_coded_type
+
+
+class StaticItemLayout:
+    """The precomputed layout of structures which are repeated by fields
+
+    Static item layouts are only available for structures with a
+    fixed size whose parameters are all byte aligned value or
+    coded-const parameters of simple types. For these, all
+    repetitions of the structure can be decoded in one go, without
+    going through the generic decoding machinery for each item.
+    """
+
+    @staticmethod
+    def from_structure(structure: BasicStructure) -> Optional["StaticItemLayout"]:
+        """Compute the layout of the items of a structure
+
+        If the structure is not suitable for being decoded using a
+        static layout, `None` is returned.
+        """
+        params: list[Parameter] = []
+        offsets: list[int] = []
+        coded_types: list[StandardLengthType] = []
+        extractors: list[Extractor] = []
+        converters: list[Converter | None] = []
+
+        cursor = 0
+        extent = 0
+        for param in structure.parameters:
+            if param.bit_position not in (None, 0):
+                return None
+
+            converter: Converter | None
+            if isinstance(param, ValueParameter):
+                dop = param.dop
+                if isinstance(dop, DtcDop):
+                    converter = dop._convert_internal_to_dtc
+                elif isinstance(dop, DataObjectProperty):
+                    compu_method = dop.compu_method
+                    if isinstance(compu_method, IdenticalCompuMethod) and \
+                       compu_method.internal_type == compu_method.physical_type == \
+                       dop.diag_coded_type.base_data_type:
+                        # the physical value is the internal one
+                        converter = None
+                    else:
+                        converter = dop._convert_internal_to_physical
+                else:
+                    return None
+
+                dct = _get_plain_coded_type(dop.diag_coded_type)
+            elif isinstance(param, CodedConstParameter):
+                converter = None
+                dct = _get_plain_coded_type(param.diag_coded_type)
+            else:
+                return None
+
+            if dct is None or (extractor := _make_extractor(dct)) is None:
+                return None
+
+            if param.byte_position is not None:
+                cursor = param.byte_position
+
+            params.append(param)
+            offsets.append(cursor)
+            coded_types.append(dct)
+            extractors.append(extractor)
+            converters.append(converter)
+
+            cursor += dct.bit_length // 8
+            extent = max(extent, cursor)
+
+        # the next item starts where the last parameter ends unless
+        # the structure specifies its size explicitly
+        stride = cursor
+        if structure.byte_size is not None:
+            if extent > structure.byte_size:
+                return None
+            stride = structure.byte_size
+
+        if stride <= 0:
+            return None
+
+        return StaticItemLayout(
+            params=params,
+            offsets=offsets,
+            coded_types=coded_types,
+            extractors=extractors,
+            converters=converters,
+            stride=stride,
+            extent=extent)
+
+    def __init__(self, *, params: list[Parameter], offsets: list[int],
+                 coded_types: list[StandardLengthType], extractors: list[Extractor],
+                 converters: list[Converter | None], stride: int, extent: int) -> None:
+        self.params = params
+        self.param_names = [param.short_name for param in params]
+        self.offsets = offsets
+        self.extractors = extractors
+        self.converters = converters
+
+        #: The distance in bytes between the beginnings of two
+        #: consecutive items
+        self.stride = stride
+
+        #: The number of bytes covered by a single item
+        self.extent = extent
+
+        self._coded_consts = [(i, param.coded_value)
+                              for i, param in enumerate(params)
+                              if isinstance(param, CodedConstParameter)]
+
+        self._struct = self._compile_struct(coded_types)
+
+    def _compile_struct(self, coded_types: list[StandardLengthType]) -> struct.Struct | None:
+        # if the items are a sequence of non-overlapping numeric
+        # values of the same byte order, the values of all items can
+        # be unpacked using the struct module
+        fmt = ""
+        cursor = 0
+        byte_orders = set()
+        for offset, dct in sorted(zip(self.offsets, coded_types, strict=True), key=lambda x: x[0]):
+            letter = _struct_format_letter(dct)
+            if letter is None or offset < cursor:
+                return None
+
+            fmt += "x" * (offset - cursor) + letter
+            cursor = offset + dct.bit_length // 8
+            if dct.bit_length > 8:
+                byte_orders.add(dct.is_highlow_byte_order)
+
+        if len(byte_orders) > 1 or cursor > self.stride:
+            return None
+
+        # the struct module returns the values in the order of their
+        # positions, which must correspond to the order of the
+        # parameters
+        if self.offsets != sorted(self.offsets):
+            return None
+
+        fmt += "x" * (self.stride - cursor)
+        return struct.Struct(("<", ">")[byte_orders != {False}] + fmt)
+
+    def num_items_until_end(self, decode_state: DecodeState) -> int | None:
+        """Return the number of items which are located between the
+        cursor and the end of the PDU
+
+        If the remaining PDU does not consist of a whole number of
+        items, `None` is returned.
+        """
+        remaining = len(decode_state.coded_message) - decode_state.cursor_byte_position
+        if remaining < 0 or remaining % self.stride != 0:
+            return None
+
+        return remaining // self.stride
+
+    def decode_items(self,
+                     decode_state: DecodeState,
+                     num_items: int,
+                     *,
+                     columnar: bool = False) -> ParameterValue | None:
+        """Decode a number of items starting at the cursor position
+
+        If `columnar` is false, the result is a list of dictionaries
+        with one entry per item. Else it is a dictionary which maps
+        the short names of the parameters to the list of their
+        values. If the items cannot be decoded using the fast path
+        (e.g., because the PDU is too short or a coded-const
+        parameter does not match), `None` is returned without
+        modifying the decode state; the items must then be decoded
+        using the generic procedure.
+        """
+        coded_message = decode_state.coded_message
+        start = decode_state.cursor_byte_position
+        if num_items > 0 and start + (num_items - 1) * self.stride + self.extent > len(
+                coded_message):
+            return None
+        end = start + num_items * self.stride
+
+        # extract the internal values of all items, column by column
+        columns: list[list[AtomicOdxType]]
+        if num_items == 0:
+            columns = [[] for _ in self.params]
+        elif self._struct is not None and end <= len(coded_message):
+            rows = self._struct.iter_unpack(memoryview(coded_message)[start:end])
+            columns = [list(x) for x in zip(*rows, strict=True)]
+        else:
+            positions = range(start, start + num_items * self.stride, self.stride)
+            columns = [[extract(coded_message, pos + offset)
+                        for pos in positions]
+                       for offset, extract in zip(self.offsets, self.extractors, strict=True)]
+
+        for i, coded_value in self._coded_consts:
+            if any(x != coded_value for x in columns[i]):
+                return None
+
+        phys_columns: list[list[ParameterValue]] = [
+            list(map(convert, column)) if convert is not None else list(column)
+            for convert, column in zip(self.converters, columns, strict=True)
+        ]
+
+        # record the decoded values for parameters which refer to
+        # them
+        item_values = list(zip(*phys_columns, strict=True))
+        params = self.params
+        decode_state.journal.extend((param, value)
+                                    for values in item_values
+                                    for param, value in zip(params, values, strict=True))
+        if item_values:
+            for param, value in zip(params, item_values[-1], strict=True):
+                decode_state.param_values[param.short_name] = (param, value)
+
+        decode_state.cursor_byte_position = end
+        decode_state.cursor_bit_position = 0
+
+        names = self.param_names
+        if columnar:
+            column_result: ParameterValueDict = dict(zip(names, phys_columns, strict=True))
+            return column_result
+
+        return [dict(zip(names, values, strict=True)) for values in item_values]
+
+
+def items_to_columns(items: list[ParameterValue], structure: BasicStructure) -> ParameterValueDict:
+    """Convert a list of decoded structures into a dictionary of lists
+
+    The keys of the result are the short names of the parameters of
+    the structure, i.e., they are also present if there are no items.
+    """
+    dict_items = [item for item in items if isinstance(item, dict)]
+
+    return {
+        param.short_name: [item[param.short_name] for item in dict_items]
+        for param in structure.parameters
+    }
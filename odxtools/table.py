@@ -1,4 +1,5 @@
 # SPDX-License-Identifier: MIT
+from collections.abc import Hashable
 from dataclasses import dataclass, field
 from typing import Any
 from xml.etree import ElementTree
@@ -10,6 +11,7 @@ from .exceptions import odxassert
 from .nameditemlist import NamedItemList
 from .odxdoccontext import OdxDocContext
 from .odxlink import OdxLinkDatabase, OdxLinkId, OdxLinkRef
+from .odxtypes import ParameterValue
 from .snrefcontext import SnRefContext
 from .specialdatagroup import SpecialDataGroup
 from .tablediagcommconnector import TableDiagCommConnector
@@ -17,6 +19,18 @@ from .tablerow import TableRow
 from .utils import dataclass_fields_asdict
 
 
+def _hashable_key(key: ParameterValue | None) -> Hashable:
+    # byte fields might be represented by bytearray objects, which
+    # cannot be used as dictionary keys
+    if isinstance(key, bytearray):
+        return bytes(key)
+    elif not isinstance(key, Hashable):
+        # keys of table rows are always atomic values
+        return None
+
+    return key
+
+
 @dataclass(kw_only=True)
 class Table(IdentifiableElement):
     """This class represents a TABLE."""
@@ -29,6 +43,15 @@ class Table(IdentifiableElement):
     sdgs: list[SpecialDataGroup] = field(default_factory=list)
     semantic: str | None = None
 
+    def __post_init__(self) -> None:
+        # the indices used to look up table rows. These are created on
+        # demand because the keys of table rows which are referenced
+        # by a TABLE-ROW-REF are only available after the short name
+        # references of the table they are defined by have been
+        # resolved.
+        self._table_rows_by_key: dict[Hashable, list[TableRow]] | None = None
+        self._table_rows_by_short_name: dict[str, list[TableRow]] | None = None
+
     @property
     def key_dop(self) -> DataObjectProperty | None:
         """The key data object property associated with this table."""
@@ -39,6 +62,34 @@ class Table(IdentifiableElement):
         """The table rows (both local and referenced) in this table."""
         return self._table_rows
 
+    def get_table_rows_by_key(self, key: ParameterValue) -> list[TableRow]:
+        """Return the table rows which exhibit a given key
+
+        If the table is well-formed, the result contains at most one
+        table row.
+        """
+        if self._table_rows_by_key is None:
+            self._table_rows_by_key = {}
+            for table_row in self.table_rows:
+                self._table_rows_by_key.setdefault(_hashable_key(table_row.key),
+                                                   []).append(table_row)
+
+        return self._table_rows_by_key.get(_hashable_key(key), [])
+
+    def get_table_rows_by_short_name(self, short_name: str) -> list[TableRow]:
+        """Return the table rows which exhibit a given short name
+
+        If the table is well-formed, the result contains at most one
+        table row.
+        """
+        if self._table_rows_by_short_name is None:
+            self._table_rows_by_short_name = {}
+            for table_row in self.table_rows:
+                self._table_rows_by_short_name.setdefault(table_row.short_name,
+                                                          []).append(table_row)
+
+        return self._table_rows_by_short_name.get(short_name, [])
+
     @staticmethod
     def from_et(et_element: ElementTree.Element, context: OdxDocContext) -> "Table":
         """Reads a TABLE."""
@@ -108,6 +159,8 @@ class Table(IdentifiableElement):
             table_rows.append(table_row)
 
         self._table_rows = NamedItemList(table_rows)
+        self._table_rows_by_key = None
+        self._table_rows_by_short_name = None
 
         for dcc in self.table_diag_comm_connectors:
             dcc._resolve_odxlinks(odxlinks)
@@ -116,6 +169,10 @@ class Table(IdentifiableElement):
             sdg._resolve_odxlinks(odxlinks)
 
     def _resolve_snrefs(self, context: SnRefContext) -> None:
+        # the keys of the table rows get (re-)computed when resolving
+        # their short name references
+        self._table_rows_by_key = None
+
         for table_row_wrapper in self.table_rows_raw:
             if isinstance(table_row_wrapper, TableRow):
                 table_row_wrapper._resolve_snrefs(context)
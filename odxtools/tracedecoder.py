@@ -0,0 +1,555 @@
+# SPDX-License-Identifier: MIT
+import csv
+import heapq
+import json
+import multiprocessing
+import multiprocessing.process
+import os
+import queue
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
+from typing import Any, SupportsBytes, TextIO
+
+from . import uds
+from .canlogreader import CanFrame, read_trace_frames
+from .database import Database
+from .diaglayers.diaglayer import DiagLayer
+from .diaglayers.ecuvariant import EcuVariant
+from .diagnostictroublecode import DiagnosticTroubleCode
+from .exceptions import odxrequire
+from .isotp_state_machine import IsoTpStateMachine
+from .loadfile import load_file
+from .message import Message
+from .odxtypes import ParameterValue
+
+
+@dataclass(kw_only=True, frozen=True)
+class TraceChannel:
+    """A diagnostic connection between a tester and an ECU which is
+    decoded from a CAN trace"""
+
+    #: The CAN ID used by the tester to send requests
+    request_id: int
+
+    #: The CAN ID used by the ECU to send responses
+    response_id: int
+
+    #: The short name of the diagnostic layer used for decoding
+    diag_layer: str
+
+    #: The CAN ID used by the tester to send functional requests
+    functional_request_id: int | None = None
+
+
+@dataclass(kw_only=True)
+class DecodedTelegram:
+    """An ISO-TP telegram of a trace and its decoded contents"""
+
+    #: The index of the CAN frame which completed the telegram
+    frame_index: int
+
+    #: The timestamp of the CAN frame which completed the telegram
+    timestamp: float | None
+
+    #: The CAN ID which the telegram was received on
+    can_id: int
+
+    #: True if the telegram was sent by the ECU
+    is_response: bool
+
+    #: The short name of the diagnostic layer used for decoding
+    diag_layer: str
+
+    #: The raw payload of the telegram
+    payload: bytes
+
+    #: The short name of the service which decoded the telegram
+    service: str | None = None
+
+    #: The short name of the request or response which decoded the telegram
+    coding_object: str | None = None
+
+    #: The decoded parameters of the telegram
+    #:
+    #: The values are converted to plain Python objects (cf.
+    #: :py:func:`to_plain_value`), so they can be serialized and
+    #: passed between processes. If the telegram could not be
+    #: decoded, this is `None`.
+    params: dict[str, Any] | None = None
+
+    #: True if the telegram is a "response pending" reply
+    is_response_pending: bool = False
+
+    #: True if the telegram is a functionally addressed request
+    is_functional: bool = False
+
+    #: For responses, the frame index of the request which was
+    #: outstanding when the response was received
+    #:
+    #: Responses to a functional request of several ECUs all refer
+    #: to the same request.
+    request_frame_index: int | None = None
+
+    #: The decoded message
+    #:
+    #: This references the database and is thus only available in
+    #: the process which decoded the telegram.
+    message: Message | None = field(default=None, repr=False, compare=False)
+
+    def __getstate__(self) -> dict[str, Any]:
+        result = dict(self.__dict__)
+        result["message"] = None
+        return result
+
+    def to_json_dict(self) -> dict[str, Any]:
+        return {
+            "timestamp": self.timestamp,
+            "can_id": self.can_id,
+            "direction": "response" if self.is_response else "request",
+            "diag_layer": self.diag_layer,
+            "payload": self.payload.hex(),
+            "service": self.service,
+            "coding_object": self.coding_object,
+            "params": self.params,
+            "response_pending": self.is_response_pending,
+            "functional": self.is_functional,
+            "request_frame_index": self.request_frame_index,
+        }
+
+
+def to_plain_value(value: ParameterValue) -> Any:
+    """Convert a decoded parameter value to an object which does not
+    reference the database
+
+    Diagnostic trouble codes are represented by dictionaries and
+    objects supporting the buffer protocol by `bytes`. Tuples and
+    other iterables are converted to lists, all other values are left
+    unchanged.
+    """
+    if isinstance(value, (str, int, float, bytes, bytearray)):
+        return value
+    elif isinstance(value, dict):
+        return {k: to_plain_value(v) for k, v in value.items()}
+    elif isinstance(value, DiagnosticTroubleCode):
+        return {
+            "short_name": value.short_name,
+            "trouble_code": value.trouble_code,
+            "display_trouble_code": value.display_trouble_code,
+        }
+    elif isinstance(value, SupportsBytes):
+        return bytes(value)
+
+    return [to_plain_value(x) for x in value]
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (bytes, bytearray)):
+        return value.hex()
+
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class _ChannelDecoder:
+    """Keeps track of the outstanding request of a diagnostic
+    connection and decodes its telegrams"""
+
+    def __init__(self, channel: TraceChannel, diag_layer: DiagLayer) -> None:
+        self.channel = channel
+        self.diag_layer = diag_layer
+
+        # the payload and the index of the last request sent to the ECU
+        self.last_request: bytes | None = None
+        self.last_request_frame_index: int | None = None
+
+    def decode(self, telegram: DecodedTelegram) -> None:
+        messages: list[Message] | None
+        if not telegram.is_response:
+            messages = self.diag_layer.try_decode(telegram.payload)
+        elif uds.is_response_pending(telegram.payload):
+            # the ECU will send the final response later
+            telegram.is_response_pending = True
+            return
+        elif self.last_request is not None:
+            messages = self.diag_layer.try_decode_response(telegram.payload, self.last_request)
+        else:
+            messages = self.diag_layer.try_decode(telegram.payload)
+
+        if messages:
+            message = messages[0]
+            telegram.message = message
+            telegram.service = message.service.short_name
+            telegram.coding_object = message.coding_object.short_name
+            telegram.params = {k: to_plain_value(v) for k, v in message.param_dict.items()}
+
+
+class TraceDecoder:
+    """Decodes the telegrams exchanged by a tester and multiple ECUs
+
+    Telegrams are routed to their diagnostic connection using their
+    CAN ID. The outstanding request is tracked for each ECU, so
+    requests and responses of different ECUs may be interleaved
+    arbitrarily. A functional request is outstanding for all ECUs
+    which listen to its CAN ID, i.e., it is correlated with the
+    responses of each of them.
+    """
+
+    def __init__(self, database: Database, channels: Iterable[TraceChannel]) -> None:
+        self._decoders: list[_ChannelDecoder] = []
+        # map from physical CAN IDs to the responsible decoder. if a
+        # CAN ID is used by multiple channels, the first one wins.
+        self._decoder_by_can_id: dict[int, _ChannelDecoder] = {}
+        # map from functional request IDs to the decoders of all ECUs
+        # which listen to it
+        self._decoders_by_func_id: dict[int, list[_ChannelDecoder]] = {}
+
+        for channel in channels:
+            diag_layer = odxrequire(
+                database.diag_layers.get(channel.diag_layer),
+                f"Unknown diagnostic layer '{channel.diag_layer}'")
+            decoder = _ChannelDecoder(channel, diag_layer)
+            self._decoders.append(decoder)
+            self._decoder_by_can_id.setdefault(channel.request_id, decoder)
+            self._decoder_by_can_id.setdefault(channel.response_id, decoder)
+            if channel.functional_request_id is not None:
+                self._decoders_by_func_id.setdefault(channel.functional_request_id,
+                                                     []).append(decoder)
+
+    @property
+    def channels(self) -> list[TraceChannel]:
+        return [x.channel for x in self._decoders]
+
+    @property
+    def can_ids(self) -> list[int]:
+        """The CAN IDs of all telegrams which can be decoded"""
+        result = list(self._decoder_by_can_id)
+        result += [x for x in self._decoders_by_func_id if x not in self._decoder_by_can_id]
+        return result
+
+    def decode_telegram(self, frame_index: int, timestamp: float | None, can_id: int,
+                        payload: bytes) -> DecodedTelegram | None:
+        """Decode an ISO-TP telegram
+
+        If the CAN ID is not used by any channel, `None` is returned.
+        """
+        if (decoder := self._decoder_by_can_id.get(can_id)) is not None:
+            is_response = can_id == decoder.channel.response_id
+            telegram = DecodedTelegram(
+                frame_index=frame_index,
+                timestamp=timestamp,
+                can_id=can_id,
+                is_response=is_response,
+                diag_layer=decoder.channel.diag_layer,
+                payload=payload)
+
+            if is_response:
+                telegram.request_frame_index = decoder.last_request_frame_index
+            else:
+                decoder.last_request = payload
+                decoder.last_request_frame_index = frame_index
+
+            decoder.decode(telegram)
+            return telegram
+
+        if (decoders := self._decoders_by_func_id.get(can_id)) is not None:
+            # functional request: it is decoded using the layer of the
+            # first ECU listening to it and becomes the outstanding
+            # request of all of them
+            for decoder in decoders:
+                decoder.last_request = payload
+                decoder.last_request_frame_index = frame_index
+
+            telegram = DecodedTelegram(
+                frame_index=frame_index,
+                timestamp=timestamp,
+                can_id=can_id,
+                is_response=False,
+                is_functional=True,
+                diag_layer=decoders[0].channel.diag_layer,
+                payload=payload)
+            decoders[0].decode(telegram)
+            return telegram
+
+        return None
+
+
+def channels_from_database(database: Database,
+                           *,
+                           protocol: str | None = None) -> list[TraceChannel]:
+    """Determine the diagnostic connections of all ECUs of a database
+
+    The CAN IDs are taken from the network index of the database.
+    ECU variants which do not specify both, the physical request and
+    the response ID, are ignored. If several ECU variants use the same
+    CAN IDs, only the first one is considered.
+    """
+    result: list[TraceChannel] = []
+    known_ids: set[tuple[int, int]] = set()
+    for node in database.network_index().nodes:
+        if not isinstance(node.diag_layer, EcuVariant):
+            continue
+        if protocol is not None and (node.protocol is None or node.protocol.short_name != protocol):
+            continue
+
+        request_id = node.can_request_id
+        response_id = node.can_response_id
+        if request_id is None or response_id is None or (request_id, response_id) in known_ids:
+            continue
+
+        known_ids.add((request_id, response_id))
+        result.append(
+            TraceChannel(
+                request_id=request_id,
+                response_id=response_id,
+                functional_request_id=node.can_functional_request_id,
+                diag_layer=node.diag_layer.short_name))
+
+    return result
+
+
+def decode_trace(frames: Iterable[CanFrame], database: Database,
+                 channels: Iterable[TraceChannel]) -> Iterator[DecodedTelegram]:
+    """Decode the diagnostic communication contained in a sequence
+    of CAN frames
+
+    The frames are reassembled to ISO-TP telegrams, requests are
+    paired with their responses and both are decoded using the
+    diagnostic layer specified by the respective channel (cf.
+    :py:class:`TraceDecoder`). Telegrams are yielded in the order in
+    which they were completed.
+    """
+    decoder = TraceDecoder(database, channels)
+    decode_telegram = decoder.decode_telegram
+
+    isotp_decoder = IsoTpStateMachine(can_rx_ids=decoder.can_ids)
+    decode_rx_frame = isotp_decoder.decode_rx_frame
+    for frame_index, (timestamp, can_id, data) in enumerate(frames):
+        for telegram_id, payload in decode_rx_frame(can_id, data):
+            if (telegram := decode_telegram(frame_index, timestamp, telegram_id,
+                                            payload)) is not None:
+                yield telegram
+
+
+#: The number of relevant CAN frames which are passed to the worker
+#: processes of `decode_trace_file()` at once
+_CHUNK_SIZE = 2048
+
+#: The maximum number of chunks of frames which may be in flight
+#: before the parent process waits for the decoded telegrams
+_MAX_PENDING_CHUNKS = 4
+
+#: A CAN frame and its index within the trace
+_IndexedFrame = tuple[int, float | None, int, bytes]
+
+
+def _run_worker(database: Database | str, channels: list[TraceChannel],
+                frame_queue: "multiprocessing.Queue[list[_IndexedFrame] | None]",
+                result_queue: "multiprocessing.Queue[list[DecodedTelegram] | Exception]") -> None:
+    """Decode chunks of CAN frames until `None` is received
+
+    For each chunk, the list of completed telegrams is sent back. The
+    state of the ISO-TP reassembly and the outstanding requests are
+    kept across chunks.
+    """
+    try:
+        if isinstance(database, str):
+            database = load_file(database)
+
+        decoder = TraceDecoder(database, channels)
+        decode_telegram = decoder.decode_telegram
+        decode_rx_frame = IsoTpStateMachine(can_rx_ids=decoder.can_ids).decode_rx_frame
+
+        while (chunk := frame_queue.get()) is not None:
+            telegrams: list[DecodedTelegram] = []
+            for frame_index, timestamp, can_id, data in chunk:
+                for telegram_id, payload in decode_rx_frame(can_id, data):
+                    if (telegram := decode_telegram(frame_index, timestamp, telegram_id,
+                                                    payload)) is not None:
+                        telegrams.append(telegram)
+            result_queue.put(telegrams)
+
+        # the results which have not been retrieved by the parent
+        # process when it stops the worker are not needed anymore
+        result_queue.cancel_join_thread()
+    except Exception as e:
+        result_queue.put(e)
+
+
+def _get_result(result_queue: "multiprocessing.Queue[list[DecodedTelegram] | Exception]",
+                worker: multiprocessing.process.BaseProcess) -> list[DecodedTelegram]:
+    while True:
+        try:
+            result = result_queue.get(timeout=1.0)
+        except queue.Empty:
+            if not worker.is_alive():
+                raise RuntimeError(
+                    f"Trace decoder worker exited unexpectedly (exit code {worker.exitcode})"
+                ) from None
+            continue
+
+        if isinstance(result, Exception):
+            raise result
+
+        return result
+
+
+def _decode_trace_parallel(trace_file: str, database: Database | str, channels: list[TraceChannel],
+                           num_workers: int) -> Iterator[DecodedTelegram]:
+    # the channels are distributed over the workers. frames are
+    # routed to the worker of the first channel which uses their CAN
+    # ID (like `TraceDecoder` does), functional requests to all
+    # workers of the channels that listen to them.
+    shards = [channels[i::num_workers] for i in range(num_workers)]
+    physical_routes: dict[int, int] = {}
+    functional_routes: dict[int, list[int]] = {}
+    for shard_index, shard in enumerate(shards):
+        for channel in shard:
+            physical_routes.setdefault(channel.request_id, shard_index)
+            physical_routes.setdefault(channel.response_id, shard_index)
+            if channel.functional_request_id is not None:
+                shard_indices = functional_routes.setdefault(channel.functional_request_id, [])
+                if shard_index not in shard_indices:
+                    shard_indices.append(shard_index)
+    routes = {can_id: [shard_index] for can_id, shard_index in physical_routes.items()}
+    for can_id, shard_indices in functional_routes.items():
+        routes.setdefault(can_id, shard_indices)
+
+    context = multiprocessing.get_context()
+    frame_queues: list[multiprocessing.Queue[list[_IndexedFrame]
+                                             | None]] = [context.Queue() for _ in shards]
+    result_queues: list[multiprocessing.Queue[list[DecodedTelegram]
+                                              | Exception]] = [context.Queue() for _ in shards]
+    workers = [
+        context.Process(
+            target=_run_worker, args=(database, shard, frame_queue, result_queue), daemon=True)
+        for shard, frame_queue, result_queue in zip(
+            shards, frame_queues, result_queues, strict=True)
+    ]
+    for worker in workers:
+        worker.start()
+
+    # functional requests are decoded by the workers of all ECUs
+    # which listen to them. only the first copy is kept.
+    last_functional_index: int | None = None
+
+    def merge_chunk() -> Iterator[DecodedTelegram]:
+        nonlocal last_functional_index
+
+        results = [_get_result(x, y) for x, y in zip(result_queues, workers, strict=True)]
+        for telegram in heapq.merge(*results, key=lambda telegram: telegram.frame_index):
+            if telegram.is_functional:
+                if telegram.frame_index == last_functional_index:
+                    continue
+                last_functional_index = telegram.frame_index
+
+            yield telegram
+
+    try:
+        chunks: list[list[_IndexedFrame]] = [[] for _ in shards]
+        chunk_size = 0
+        num_pending_chunks = 0
+        for frame_index, (timestamp, can_id, data) in enumerate(read_trace_frames(trace_file)):
+            if (targets := routes.get(can_id)) is None:
+                continue
+
+            frame = (frame_index, timestamp, can_id, data)
+            for shard_index in targets:
+                chunks[shard_index].append(frame)
+
+            chunk_size += 1
+            if chunk_size < _CHUNK_SIZE:
+                continue
+
+            # every worker receives every chunk, even if it is empty,
+            # so the results of all workers can be merged chunk by
+            # chunk
+            for frame_queue, chunk in zip(frame_queues, chunks, strict=True):
+                frame_queue.put(chunk)
+            chunks = [[] for _ in shards]
+            chunk_size = 0
+            num_pending_chunks += 1
+
+            if num_pending_chunks >= _MAX_PENDING_CHUNKS:
+                yield from merge_chunk()
+                num_pending_chunks -= 1
+
+        if chunk_size > 0:
+            for frame_queue, chunk in zip(frame_queues, chunks, strict=True):
+                frame_queue.put(chunk)
+            num_pending_chunks += 1
+
+        for _ in range(num_pending_chunks):
+            yield from merge_chunk()
+
+    finally:
+        for frame_queue in frame_queues:
+            frame_queue.put(None)
+        for worker in workers:
+            worker.join(timeout=1.0)
+            if worker.is_alive():
+                worker.terminate()
+        for frame_queue in frame_queues:
+            # the workers may have been terminated before reading
+            # all frames
+            frame_queue.cancel_join_thread()
+
+
+def decode_trace_file(trace_file: str,
+                      database: Database | str,
+                      channels: Iterable[TraceChannel],
+                      *,
+                      num_workers: int | None = 1) -> Iterator[DecodedTelegram]:
+    """Decode the diagnostic communication contained in a CAN trace file
+
+    The trace file may be any format supported by
+    :py:func:`odxtools.canlogreader.read_trace_frames`. If more than
+    one worker is used, the channels are distributed over a pool of
+    processes, each of which holds its own copy of the database. The
+    trace is read once by the calling process, which passes chunks
+    of the relevant CAN frames to the workers and merges the decoded
+    telegrams in the order of the trace as soon as all workers have
+    processed a chunk. `database` can either be a database object,
+    which is then passed to the worker processes, or the name of a
+    file which is loaded by each worker.
+
+    :param num_workers: The number of worker processes. `None` uses
+                        one process per CPU.
+    """
+    channels = list(channels)
+    if num_workers is None:
+        num_workers = os.cpu_count() or 1
+    num_workers = min(num_workers, len(channels))
+
+    if num_workers <= 1:
+        if isinstance(database, str):
+            database = load_file(database)
+        yield from decode_trace(read_trace_frames(trace_file), database, channels)
+        return
+
+    yield from _decode_trace_parallel(trace_file, database, channels, num_workers)
+
+
+def write_jsonl(telegrams: Iterable[DecodedTelegram], output: TextIO) -> None:
+    """Write decoded telegrams to a file using the JSON lines format"""
+    for telegram in telegrams:
+        output.write(json.dumps(telegram.to_json_dict(), default=_json_default))
+        output.write("\n")
+
+
+#: The columns of the CSV files written by `write_csv()`
+CSV_COLUMNS = ("timestamp", "can_id", "direction", "diag_layer", "payload", "service",
+               "coding_object", "params", "response_pending", "functional", "request_frame_index")
+
+
+def write_csv(telegrams: Iterable[DecodedTelegram], output: TextIO) -> None:
+    """Write decoded telegrams to a CSV file
+
+    The decoded parameters are stored as a JSON object.
+    """
+    writer = csv.writer(output)
+    writer.writerow(CSV_COLUMNS)
+    for telegram in telegrams:
+        row = telegram.to_json_dict()
+        row["can_id"] = f"0x{telegram.can_id:x}"
+        if row["params"] is not None:
+            row["params"] = json.dumps(row["params"], default=_json_default)
+        writer.writerow([row[x] for x in CSV_COLUMNS])
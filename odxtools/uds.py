@@ -141,6 +141,36 @@ def negative_response_id(service_id: int) -> int:
     return NegativeResponseId
 
 
+#: The services whose requests exhibit a sub-function parameter as
+#: their second byte
+SubFunctionServiceIds = frozenset({
+    UDSSID.DiagnosticSessionControl,
+    UDSSID.EcuReset,
+    UDSSID.ReadDtcInformation,
+    UDSSID.SecurityAccess,
+    UDSSID.CommunicationControl,
+    UDSSID.Authentication,
+    UDSSID.DynamicallyDefineDataIdentifier,
+    UDSSID.RoutineControl,
+    UDSSID.TesterPresent,
+    UDSSID.AccessTimingParameters,
+    UDSSID.ControlDtcSettings,
+    UDSSID.ResponseOnEvent,
+    UDSSID.LinkControl,
+})
+
+#: The bit of the sub-function parameter which indicates that the
+#: server shall not send a positive response
+SuppressPositiveResponseBit = 0x80
+
+
+def suppresses_positive_response(request: bytes | bytearray) -> bool:
+    """Return true if the "suppress positive response" bit of a
+    request's sub-function is set"""
+    return len(request) >= 2 and request[0] in SubFunctionServiceIds and \
+        bool(request[1] & SuppressPositiveResponseBit)
+
+
 def is_response_pending(telegram_payload: bytes, request_sid: int | None = None) -> bool:
     # "response pending" responses exhibit at least three bytes
     if len(telegram_payload) < 3:
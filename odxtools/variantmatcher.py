@@ -182,8 +182,11 @@ class VariantMatcher:
 
         for cur_response in all_responses:
             try:
-                decoded_vals = cur_response.decode(response_bytes)
+                decoded_vals = cur_response.try_decode(response_bytes)
             except DecodeError:
+                decoded_vals = None
+
+            if decoded_vals is None:
                 # the current response object could not decode the received
                 # data. Ignore it.
                 continue
@@ -0,0 +1,155 @@
+# SPDX-License-Identifier: MIT
+import asyncio
+import unittest
+from collections.abc import AsyncIterator
+
+import can
+
+from odxtools.client import DiagClient, DoIpClientTransport, IsoTpClientTransport
+from odxtools.doip import DoIpClient, DoIpError, DoIpRequestHandler, DoIpServer
+from odxtools.isotp_transport import IsoTpChannel, IsoTpTransport
+from odxtools.loadfile import load_pdx_file
+from odxtools.response import Response
+
+odxdb = load_pdx_file("./examples/somersault.pdx")
+
+
+class TestDiagClient(unittest.TestCase):
+
+    def test_client(self) -> None:
+        ecu = odxdb.ecus.somersault_lazy
+        forward_flips = ecu.services.do_forward_flips
+        positive_response = forward_flips.positive_responses[0]
+        assert isinstance(positive_response, Response)
+
+        # two instances of the same ECU which use different CAN IDs
+        tester_channels = [
+            IsoTpChannel.from_diag_layer(ecu),
+            IsoTpChannel(tx_id=0x7c, rx_id=0x1c9),
+        ]
+        ecu_channels = [IsoTpChannel(tx_id=x.rx_id, rx_id=x.tx_id) for x in tester_channels]
+        self.assertEqual(tester_channels[0], IsoTpChannel(tx_id=123, rx_id=456))
+
+        requests: list[tuple[int, bytes]] = []
+
+        async def simulate_ecu(transport: IsoTpTransport, channel: IsoTpChannel) -> None:
+            while True:
+                request = await transport.receive(channel.rx_id)
+                requests.append((channel.rx_id, request))
+                if request[0] == 0x3e:
+                    await transport.send(channel.tx_id, b"\x7e\x00")
+                elif request[0] == 0xba:
+                    # let the tester wait for the response
+                    await transport.send(channel.tx_id, b"\x7f" + request[:1] + b"\x78")
+                    await asyncio.sleep(0.1)
+                    await transport.send(
+                        channel.tx_id,
+                        positive_response.encode(coded_request=request, sault_time=42))
+                # other requests are not answered
+
+        async def run_test() -> None:
+            with can.Bus(interface="virtual", channel="test_client") as tester_bus, \
+                 can.Bus(interface="virtual", channel="test_client") as ecu_bus:
+                async with IsoTpTransport(tester_bus, tester_channels) as tester_transport, \
+                           IsoTpTransport(ecu_bus, ecu_channels) as ecu_transport:
+                    ecu_tasks = [
+                        asyncio.create_task(simulate_ecu(ecu_transport, x)) for x in ecu_channels
+                    ]
+
+                    clients = [
+                        DiagClient(ecu, IsoTpClientTransport(tester_transport, x), p2_time=0.05)
+                        for x in tester_channels
+                    ]
+                    # the ECU needs longer than P2 to respond, i.e., the
+                    # "response pending" reply must extend the timeout
+                    self.assertLess(clients[0].p2_time, 0.1)
+
+                    # requests to both ECUs are in flight concurrently
+                    loop = asyncio.get_running_loop()
+                    start_time = loop.time()
+                    results = await asyncio.gather(*[
+                        x.call("do_forward_flips", forward_soberness_check=0x12, num_flips=3)
+                        for x in clients
+                    ])
+                    self.assertLess(loop.time() - start_time, 0.19)
+                    for result in results:
+                        self.assertEqual(result.coding_object.short_name, "grudging_forward")
+                        self.assertEqual(result.param_dict["sault_time"], 42)
+
+                    # the ECU does not respond to this request
+                    with self.assertRaises(asyncio.TimeoutError):
+                        await clients[0].call("session_stop")
+
+                    # tester present messages are sent if the
+                    # connection is idle
+                    requests.clear()
+                    clients[1].tester_present_time = 0.05
+                    async with clients[1]:
+                        clients[1].start_tester_present()
+                        await asyncio.sleep(0.3)
+                    self.assertGreaterEqual(len(requests), 2)
+                    self.assertEqual(set(requests), {(0x7c, b"\x3e\x00")})
+
+                    for task in ecu_tasks:
+                        task.cancel()
+
+        asyncio.run(run_test())
+
+    def test_doip(self) -> None:
+        ecu = odxdb.ecus.somersault_lazy
+
+        def make_handler(delay: float) -> DoIpRequestHandler:
+
+            async def handle_request(request: bytes) -> AsyncIterator[bytes | bytearray]:
+                # answer with the first positive response of the
+                # somersault ECU
+                service = ecu.decode(request)[0].service
+                response = service.positive_responses[0]
+                assert isinstance(response, Response)
+                if delay > 0:
+                    yield bytes([0x7f, request[0], 0x78])
+                    await asyncio.sleep(delay)
+                params = {"sault_time": 7} if service.short_name == "do_forward_flips" else {}
+                yield response.encode(coded_request=request, **params)
+
+            return handle_request
+
+        async def run_test() -> None:
+            handlers = {0x10: make_handler(0.1), 0x11: make_handler(0)}
+            async with DoIpServer(handlers, logical_address=0x1234) as server, \
+                       DoIpClient.from_diag_layer(ecu, "127.0.0.1", server.port) as doip_client:
+                self.assertEqual(doip_client.gateway_address, 0x1234)
+
+                clients = [
+                    DiagClient(ecu, DoIpClientTransport(doip_client, x), p2_time=0.5)
+                    for x in handlers
+                ]
+
+                # the requests for both ECUs are pipelined, so the
+                # response of the fast ECU does not need to wait for
+                # the one of the slow ECU
+                finish_times: list[float] = []
+
+                async def call(client: DiagClient) -> None:
+                    result = await client.call(
+                        "do_forward_flips", forward_soberness_check=0x12, num_flips=3)
+                    self.assertEqual(result.coding_object.short_name, "grudging_forward")
+                    self.assertEqual(result.param_dict["sault_time"], 7)
+                    finish_times.append(asyncio.get_running_loop().time())
+
+                await asyncio.gather(*[call(x) for x in clients])
+                self.assertGreater(finish_times[1] - finish_times[0], 0.05)
+
+                # messages for unknown ECUs are not acknowledged
+                with self.assertRaises(DoIpError):
+                    await doip_client.send(0x42, b"\x3e\x00")
+
+                # the connection is still usable afterwards
+                response = await clients[1].send_request(b"\x3e\x00")
+                self.assertEqual(response, b"\x7e\x00")
+
+        asyncio.run(run_test())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -22,6 +22,7 @@ from odxtools.compumethods.linearcompumethod import LinearCompuMethod
 from odxtools.compumethods.ratfunccompumethod import RatFuncCompuMethod
 from odxtools.compumethods.scaleratfunccompumethod import ScaleRatFuncCompuMethod
 from odxtools.compumethods.tabintpcompumethod import TabIntpCompuMethod
+from odxtools.compumethods.texttablecompumethod import TexttableCompuMethod
 from odxtools.exceptions import DecodeError, EncodeError, OdxError
 from odxtools.odxdoccontext import OdxDocContext
 from odxtools.odxlink import DocType, OdxDocFragment
@@ -29,6 +30,11 @@ from odxtools.odxtypes import DataType
 from odxtools.progcode import ProgCode
 from odxtools.writepdxfile import jinja2_odxraise_helper, make_bool_xml_attrib, make_xml_attrib
 
+try:
+    import numpy as np
+except ImportError:
+    np = None  # type: ignore[assignment]
+
 doc_frags = (OdxDocFragment("UnitTest", DocType.CONTAINER),)
 
 
@@ -275,6 +281,22 @@ class TestLinearCompuMethod(unittest.TestCase):
         self.assertEqual(compu_method.convert_internal_to_physical(4), 21)
         self.assertEqual(compu_method.convert_physical_to_internal(21), 4)
 
+        if np is not None:
+            values, mask = compu_method.convert_internal_to_physical_array([1, 2, 4, 15, 16])
+            self.assertEqual(mask.tolist(), [False, True, True, True, False])
+            self.assertEqual(values[mask].tolist(), [11, 21, 76])
+
+            values, mask = compu_method.convert_physical_to_internal_array(
+                np.array([10, 11, 21, 76, 77]))
+            self.assertEqual(mask.tolist(), [False, True, True, True, False])
+            self.assertEqual(values[mask].tolist(), [2, 4, 15])
+
+            # like for scalars, floating point values are not valid
+            # for integer types, even if they are whole numbers
+            self.assertFalse(compu_method.is_valid_physical_value(21.0))
+            values, mask = compu_method.convert_physical_to_internal_array(np.array([21.0, 21.5]))
+            self.assertEqual(mask.tolist(), [False, False])
+
     def test_linear_compu_method_physical_limits(self) -> None:
         # Define decoding function: f: (2, 15] -> [-74, -14], f(x) = -5*x + 1
         compu_method = LinearCompuMethod(
@@ -619,6 +641,77 @@ class TestScaleRatFuncCompuMethod(unittest.TestCase):
             compu_method.convert_internal_to_physical(9.01)
 
 
+class TestTexttableCompuMethod(unittest.TestCase):
+
+    def test_texttable_compu_method(self) -> None:
+
+        def make_scale(lower: str | None,
+                       upper: str | None,
+                       text: str,
+                       interval_type: IntervalType | None = None) -> CompuScale:
+            return CompuScale(
+                lower_limit=None if lower is None else Limit(
+                    value_raw=lower, value_type=DataType.A_UINT32, interval_type=interval_type),
+                upper_limit=None if upper is None else Limit(
+                    value_raw=upper, value_type=DataType.A_UINT32, interval_type=interval_type),
+                compu_const=CompuConst(vt=text, data_type=DataType.A_UNICODE2STRING),
+                domain_type=DataType.A_UINT32,
+                range_type=DataType.A_UNICODE2STRING)
+
+        compu_method = TexttableCompuMethod(
+            category=CompuCategory.TEXTTABLE,
+            compu_internal_to_phys=CompuInternalToPhys(compu_scales=[
+                make_scale("0", None, "zero"),
+                make_scale(None, "1", "one"),
+                make_scale("2", "9", "small"),
+                make_scale("10", "20", "medium", IntervalType.OPEN),
+                make_scale("100", "200", "large"),
+                make_scale("150", "150", "ambiguous"),
+            ]),
+            internal_type=DataType.A_UINT32,
+            physical_type=DataType.A_UNICODE2STRING)
+
+        for internal, physical in [
+            (0, "zero"),
+            (1, "one"),
+            (2, "small"),
+            (9, "small"),
+            (11, "medium"),
+            (19, "medium"),
+            (100, "large"),
+            (200, "large"),
+        ]:
+            self.assertEqual(compu_method.convert_internal_to_physical(internal), physical)
+            self.assertEqual(compu_method.try_convert_internal_to_physical(internal), physical)
+
+        # the interval of the "medium" scale is open
+        for internal in [10, 20, 21, 99, 201]:
+            self.assertFalse(compu_method.is_valid_internal_value(internal))
+            self.assertIsNone(compu_method.try_convert_internal_to_physical(internal))
+            with self.assertRaises(DecodeError):
+                compu_method.convert_internal_to_physical(internal)
+
+        # internal values covered by multiple scales cannot be decoded
+        self.assertTrue(compu_method.is_valid_internal_value(150))
+        with self.assertRaises(DecodeError):
+            compu_method.convert_internal_to_physical(150)
+
+        self.assertEqual(compu_method.convert_physical_to_internal("one"), 1)
+        self.assertEqual(compu_method.try_convert_physical_to_internal("medium"), 10)
+        self.assertIsNone(compu_method.try_convert_physical_to_internal("huge"))
+        with self.assertRaises(EncodeError):
+            compu_method.convert_physical_to_internal("huge")
+
+        if np is not None:
+            values, mask = compu_method.convert_internal_to_physical_array([0, 9, 10, 150, 200, 9])
+            self.assertEqual(mask.tolist(), [True, True, False, False, True, True])
+            self.assertEqual(values[mask].tolist(), ["zero", "small", "large", "small"])
+
+            values, mask = compu_method.convert_physical_to_internal_array(["one", "huge"])
+            self.assertEqual(mask.tolist(), [True, False])
+            self.assertEqual(values.tolist(), [1, 0])
+
+
 class TestTabIntpCompuMethod(unittest.TestCase):
 
     def setUp(self) -> None:
@@ -711,11 +804,34 @@ class TestTabIntpCompuMethod(unittest.TestCase):
             self.assertEqual(method.convert_internal_to_physical(internal), physical)
             self.assertEqual(method.convert_physical_to_internal(physical), internal)
 
+        self.assertEqual(method.try_convert_internal_to_physical(25), 1.75)
+        self.assertEqual(method.try_convert_physical_to_internal(1.75), 25)
+        self.assertIsNone(method.try_convert_internal_to_physical(31))
+        self.assertIsNone(method.try_convert_physical_to_internal(-2))
+
         self.assertRaises(DecodeError, method.convert_internal_to_physical, -2)
         self.assertRaises(DecodeError, method.convert_internal_to_physical, 31)
         self.assertRaises(EncodeError, method.convert_physical_to_internal, -2)
         self.assertRaises(EncodeError, method.convert_physical_to_internal, 2.1)
 
+    @unittest.skipIf(np is None, "NumPy is not available")
+    def test_tabintp_convert_array(self) -> None:
+        method = self.tab_intp_compumethod
+
+        internal_values = np.arange(-5, 35)
+        physical_values, mask = method.convert_internal_to_physical_array(internal_values)
+        self.assertEqual(physical_values.dtype, np.float64)
+        self.assertEqual(mask.tolist(), [0 <= x <= 30 for x in internal_values])
+        for internal, physical in zip(internal_values[mask], physical_values[mask], strict=True):
+            expected = method.convert_internal_to_physical(int(internal))
+            assert isinstance(expected, float)
+            self.assertAlmostEqual(expected, float(physical), places=9)
+
+        internal_values, mask = method.convert_physical_to_internal_array([-2, -1, 0.5, 1.75, 2])
+        self.assertEqual(internal_values.dtype, np.int64)
+        self.assertEqual(mask.tolist(), [False, True, True, True, True])
+        self.assertEqual(internal_values[mask].tolist(), [0, 7, 25, 30])
+
     def test_read_odx(self) -> None:
         expected = self.tab_intp_compumethod
 
@@ -35,6 +35,8 @@ from odxtools.parameters.matchingrequestparameter import MatchingRequestParamete
 from odxtools.parameters.nrcconstparameter import NrcConstParameter
 from odxtools.parameters.physicalconstantparameter import PhysicalConstantParameter
 from odxtools.parameters.reservedparameter import ReservedParameter
+from odxtools.parameters.tablekeyparameter import TableKeyParameter
+from odxtools.parameters.tablestructparameter import TableStructParameter
 from odxtools.parameters.valueparameter import ValueParameter
 from odxtools.physicaltype import PhysicalType
 from odxtools.request import Request
@@ -43,6 +45,8 @@ from odxtools.snrefcontext import SnRefContext
 from odxtools.standardlengthtype import StandardLengthType
 from odxtools.staticfield import StaticField
 from odxtools.structure import Structure
+from odxtools.table import Table
+from odxtools.tablerow import TableRow
 from odxtools.termination import Termination
 from odxtools.text import Text
 
@@ -306,6 +310,28 @@ class TestDecoding(unittest.TestCase):
         with self.assertRaises(DecodeError):
             decoded_list = ecu_variant.decode_response(bytes.fromhex("12bc"), bytes.fromhex("B0"))
 
+        # the non-raising variants return None for messages which
+        # cannot be decoded
+        self.assertEqual(
+            resp.try_decode(bytes.fromhex("12ab")), {
+                'param1': 0x12,
+                'param2': 0xab,
+                'param3': 0xab
+            })
+        self.assertIsNone(resp.try_decode(bytes.fromhex("12bc")))
+        self.assertIsNone(resp.try_decode(bytes.fromhex("13ab")))
+        self.assertIsNone(resp.try_decode(bytes.fromhex("12")))
+        self.assertIsNone(
+            ecu_variant.try_decode_response(bytes.fromhex("12bc"), bytes.fromhex("B0")))
+        try_decoded_list = ecu_variant.try_decode_response(
+            bytes.fromhex("1234"), bytes.fromhex("B0"))
+        assert try_decoded_list is not None
+        self.assertEqual(try_decoded_list[0].coding_object, resp)
+        try_decoded_list = ecu_variant.try_decode(bytes.fromhex("B0"))
+        assert try_decoded_list is not None
+        self.assertEqual(try_decoded_list[0].coding_object, req)
+        self.assertIsNone(ecu_variant.try_decode(bytes.fromhex("B1")))
+
     def test_decode_request_coded_const_undefined_byte_position(self) -> None:
         """Test decoding of parameter
         Test if the decoding works if the byte position of the second parameter
@@ -942,6 +968,163 @@ class TestDecoding(unittest.TestCase):
         self.assertEqual(expected_message.coding_object, decoded_message.coding_object)
         self.assertEqual(expected_message.param_dict, decoded_message.param_dict)
 
+    def test_dynamic_length_field_static_items(self) -> None:
+        odxlinks = OdxLinkDatabase()
+        uint8_type = StandardLengthType(
+            base_data_type=DataType.A_UINT32,
+            bit_length=8,
+        )
+        count_dop = DataObjectProperty(
+            odx_id=OdxLinkId("count_dop", doc_frags),
+            short_name="count_dop",
+            diag_coded_type=uint8_type,
+            physical_type=PhysicalType(base_data_type=DataType.A_UINT32),
+            compu_method=IdenticalCompuMethod(
+                category=CompuCategory.IDENTICAL,
+                internal_type=DataType.A_UINT32,
+                physical_type=DataType.A_UINT32),
+        )
+        temperature_dop = DataObjectProperty(
+            odx_id=OdxLinkId("temperature_dop", doc_frags),
+            short_name="temperature_dop",
+            diag_coded_type=StandardLengthType(
+                base_data_type=DataType.A_UINT32,
+                bit_length=16,
+            ),
+            physical_type=PhysicalType(base_data_type=DataType.A_FLOAT64),
+            compu_method=LinearCompuMethod(
+                category=CompuCategory.LINEAR,
+                compu_internal_to_phys=CompuInternalToPhys(compu_scales=[
+                    CompuScale(
+                        compu_rational_coeffs=CompuRationalCoeffs(
+                            value_type=DataType.A_FLOAT64,
+                            numerators=[-40, 0.5],
+                            denominators=[1],
+                        ),
+                        domain_type=DataType.A_UINT32,
+                        range_type=DataType.A_FLOAT64),
+                ]),
+                internal_type=DataType.A_UINT32,
+                physical_type=DataType.A_FLOAT64),
+        )
+        offset_dop = DataObjectProperty(
+            odx_id=OdxLinkId("offset_dop", doc_frags),
+            short_name="offset_dop",
+            diag_coded_type=StandardLengthType(
+                base_data_type=DataType.A_INT32,
+                bit_length=8,
+            ),
+            physical_type=PhysicalType(base_data_type=DataType.A_INT32),
+            compu_method=IdenticalCompuMethod(
+                category=CompuCategory.IDENTICAL,
+                internal_type=DataType.A_INT32,
+                physical_type=DataType.A_INT32),
+        )
+        struct = Structure(
+            odx_id=OdxLinkId("sample_struct", doc_frags),
+            short_name="sample",
+            parameters=NamedItemList([
+                CodedConstParameter(
+                    short_name="marker",
+                    diag_coded_type=uint8_type,
+                    coded_value_raw=str(0xaa),
+                ),
+                ValueParameter(
+                    short_name="temperature",
+                    dop_ref=OdxLinkRef.from_id(temperature_dop.odx_id),
+                ),
+                ValueParameter(
+                    short_name="offset",
+                    dop_ref=OdxLinkRef.from_id(offset_dop.odx_id),
+                ),
+            ]),
+        )
+        dlf = DynamicLengthField(
+            odx_id=OdxLinkId("samples_dlf", doc_frags),
+            short_name="samples",
+            structure_ref=OdxLinkRef.from_id(struct.odx_id),
+            offset=1,
+            determine_number_of_items=DetermineNumberOfItems(
+                byte_position=0, dop_ref=OdxLinkRef.from_id(count_dop.odx_id)),
+        )
+        resp = Response(
+            odx_id=OdxLinkId("samples_response", doc_frags),
+            short_name="samples_response",
+            parameters=NamedItemList([
+                CodedConstParameter(
+                    short_name="SID",
+                    diag_coded_type=uint8_type,
+                    coded_value_raw=str(0x62),
+                ),
+                ValueParameter(
+                    short_name="samples",
+                    dop_ref=OdxLinkRef.from_id(dlf.odx_id),
+                ),
+                ValueParameter(
+                    short_name="trailer",
+                    dop_ref=OdxLinkRef.from_id(count_dop.odx_id),
+                ),
+            ]),
+            response_type=ResponseType.POSITIVE,
+        )
+        for obj in (count_dop, temperature_dop, offset_dop, struct, dlf, resp):
+            odxlinks.update(obj._build_odxlinks())
+        for obj in (count_dop, temperature_dop, offset_dop, struct, dlf, resp):
+            obj._resolve_odxlinks(odxlinks)
+
+        self.assertIsNotNone(dlf._get_static_item_layout())
+
+        coded_message = bytes.fromhex("6203aa0064ffaa00c805aa012c8077")
+        expected_samples = [
+            {
+                "marker": 0xaa,
+                "temperature": 10.0,
+                "offset": -1
+            },
+            {
+                "marker": 0xaa,
+                "temperature": 60.0,
+                "offset": 5
+            },
+            {
+                "marker": 0xaa,
+                "temperature": 110.0,
+                "offset": -128
+            },
+        ]
+        decoded = resp.decode(coded_message)
+        self.assertEqual(decoded["samples"], expected_samples)
+        self.assertEqual(decoded["trailer"], 0x77)
+        self.assertEqual(
+            resp.decode(coded_message, columnar_fields=True)["samples"], {
+                "marker": [0xaa, 0xaa, 0xaa],
+                "temperature": [10.0, 60.0, 110.0],
+                "offset": [-1, 5, -128],
+            })
+        self.assertEqual(resp.encode(coded_request=None, **decoded), coded_message)
+
+        # the results of the generic decoding procedure are identical,
+        # also if the field does not contain any items
+        empty_message = bytes.fromhex("620077")
+        empty_columns: dict[str, list[int]] = {"marker": [], "temperature": [], "offset": []}
+        self.assertEqual(resp.decode(empty_message, columnar_fields=True)["samples"], empty_columns)
+        dlf._static_item_layout = None
+        self.assertEqual(resp.decode(coded_message), decoded)
+        self.assertEqual(
+            resp.decode(coded_message, columnar_fields=True)["samples"], {
+                "marker": [0xaa, 0xaa, 0xaa],
+                "temperature": [10.0, 60.0, 110.0],
+                "offset": [-1, 5, -128],
+            })
+        self.assertEqual(resp.decode(empty_message)["samples"], [])
+        self.assertEqual(resp.decode(empty_message, columnar_fields=True)["samples"], empty_columns)
+        dlf._static_item_layout_computed = False
+
+        # mismatching constants are reported by the generic decoding
+        # procedure
+        with self.assertWarns(DecodeError):
+            resp.decode(bytes.fromhex("6201ab006400ff"))
+
     def test_decode_request_end_of_pdu_field(self) -> None:
         """Test decoding of end-of-pdu fields."""
         diag_coded_type = StandardLengthType(
@@ -1236,6 +1419,29 @@ class TestDecoding(unittest.TestCase):
             self.assertEqual(expected_message.coding_object, decoded_message.coding_object)
             self.assertEqual(expected_message.param_dict, decoded_message.param_dict)
 
+            decoded_messages = ecu_variant.decode_response(coded_message, bytes([0x12, 0xAB]))
+            self.assertEqual(len(decoded_messages), 1)
+            self.assertEqual(decoded_messages[0].coding_object, message)
+            self.assertEqual(expected_message.param_dict, decoded_messages[0].param_dict)
+
+        # the response index considers the constant part of the request
+        # for the matching request parameters
+        self.assertEqual(
+            ecu_variant._response_index,
+            {
+                2: {
+                    bytes([0x12, 0xAB]): [
+                        (service, pos_response, bytes([0x34, 0xAB])),
+                        (service, neg_response, bytes([0x56, 0xAB])),
+                    ]
+                }
+            },
+        )
+
+        # responses which do not match the request cannot be decoded
+        with self.assertRaises(DecodeError):
+            ecu_variant.decode_response(bytes([0x34, 0xCD]), bytes([0x12, 0xAB, 0x00]))
+
         # check object serialization and deserialization using pickle
         pickled_ecu_var = pickle.dumps(ecu_variant)
         unpickled_ecu_var = pickle.loads(pickled_ecu_var)
@@ -1308,6 +1514,228 @@ class TestDecoding(unittest.TestCase):
         actual_coded_message = pos_response.encode(coded_request=None, **expected_param_dict)
         self.assertEqual(actual_coded_message, expected_coded_message)
 
+    def test_decode_dtc_list(self) -> None:
+        odxlinks = OdxLinkDatabase()
+        uint8_type = StandardLengthType(
+            base_data_type=DataType.A_UINT32,
+            bit_length=8,
+        )
+        compu_method = IdenticalCompuMethod(
+            category=CompuCategory.IDENTICAL,
+            internal_type=DataType.A_UINT32,
+            physical_type=DataType.A_UINT32)
+
+        dtc1 = DiagnosticTroubleCode(
+            odx_id=OdxLinkId("dtcID1", doc_frags),
+            short_name="P1234_sn",
+            trouble_code=0x1234,
+            text=Text.from_string("Error encountered"),
+            display_trouble_code="P1234",
+        )
+        dtc2 = DiagnosticTroubleCode(
+            odx_id=OdxLinkId("dtcID2", doc_frags),
+            short_name="P5678_sn",
+            trouble_code=0x5678,
+            text=Text.from_string("Crashed into wall"),
+            display_trouble_code="P5678",
+        )
+        dtc_dop = DtcDop(
+            odx_id=OdxLinkId("dtc.dop.odx_id", doc_frags),
+            short_name="dtc_dop_sn",
+            diag_coded_type=StandardLengthType(
+                base_data_type=DataType.A_UINT32,
+                bit_length=16,
+            ),
+            physical_type=PhysicalType(base_data_type=DataType.A_UINT32),
+            compu_method=compu_method,
+            dtcs_raw=[dtc1, dtc2],
+        )
+        status_dop = DataObjectProperty(
+            odx_id=OdxLinkId("status.dop.odx_id", doc_frags),
+            short_name="status_dop_sn",
+            diag_coded_type=uint8_type,
+            physical_type=PhysicalType(base_data_type=DataType.A_UINT32),
+            compu_method=compu_method,
+        )
+        struct = Structure(
+            odx_id=OdxLinkId("struct_id", doc_frags),
+            short_name="dtc_and_status",
+            parameters=NamedItemList([
+                ValueParameter(
+                    short_name="dtc",
+                    dop_ref=OdxLinkRef.from_id(dtc_dop.odx_id),
+                ),
+                ValueParameter(
+                    short_name="status",
+                    dop_ref=OdxLinkRef.from_id(status_dop.odx_id),
+                ),
+            ]),
+        )
+        eopf = EndOfPduField(
+            odx_id=OdxLinkId("eopf_id", doc_frags),
+            short_name="dtc_list",
+            structure_ref=OdxLinkRef.from_id(struct.odx_id),
+            is_visible_raw=True,
+        )
+        pos_response = Response(
+            odx_id=OdxLinkId("pos_response_id", doc_frags),
+            short_name="pos_response_sn",
+            parameters=NamedItemList([
+                CodedConstParameter(
+                    short_name="SID",
+                    diag_coded_type=uint8_type,
+                    coded_value_raw=str(0x59),
+                    byte_position=0,
+                ),
+                ValueParameter(
+                    short_name="dtcs",
+                    dop_ref=OdxLinkRef.from_id(eopf.odx_id),
+                ),
+            ]),
+            response_type=ResponseType.POSITIVE,
+        )
+        for obj in (dtc_dop, status_dop, struct, eopf, pos_response):
+            odxlinks.update(obj._build_odxlinks())
+        for obj in (dtc_dop, status_dop, struct, eopf, pos_response):
+            obj._resolve_odxlinks(odxlinks)
+
+        self.assertIs(dtc_dop.get_dtc(0x5678), dtc2)
+        self.assertIsNone(dtc_dop.get_dtc(0x9999))
+        self.assertIsNotNone(eopf._get_static_item_layout())
+
+        coded_message = bytes([0x59, 0x12, 0x34, 0x2f, 0x56, 0x78, 0x08])
+        expected_param_dict: ParameterValueDict = {
+            "SID": 0x59,
+            "dtcs": [
+                {
+                    "dtc": dtc1,
+                    "status": 0x2f
+                },
+                {
+                    "dtc": dtc2,
+                    "status": 0x08
+                },
+            ]
+        }
+        self.assertEqual(pos_response.decode(coded_message), expected_param_dict)
+        self.assertEqual(
+            pos_response.encode(coded_request=None, **expected_param_dict), coded_message)
+        self.assertEqual(
+            pos_response.decode(coded_message, columnar_fields=True)["dtcs"], {
+                "dtc": [dtc1, dtc2],
+                "status": [0x2f, 0x08]
+            })
+
+        # incomplete items are handled by the generic decoding
+        # procedure
+        with self.assertRaises(DecodeError):
+            pos_response.decode(coded_message + bytes([0x12]))
+
+    def test_decode_large_table(self) -> None:
+        uint8_type = StandardLengthType(
+            base_data_type=DataType.A_UINT32,
+            bit_length=8,
+        )
+        compu_method = IdenticalCompuMethod(
+            category=CompuCategory.IDENTICAL,
+            internal_type=DataType.A_UINT32,
+            physical_type=DataType.A_UINT32)
+        key_dop = DataObjectProperty(
+            odx_id=OdxLinkId("key_dop", doc_frags),
+            short_name="key_dop",
+            diag_coded_type=StandardLengthType(
+                base_data_type=DataType.A_UINT32,
+                bit_length=16,
+            ),
+            physical_type=PhysicalType(base_data_type=DataType.A_UINT32),
+            compu_method=compu_method,
+        )
+        value_dop = DataObjectProperty(
+            odx_id=OdxLinkId("value_dop", doc_frags),
+            short_name="value_dop",
+            diag_coded_type=uint8_type,
+            physical_type=PhysicalType(base_data_type=DataType.A_UINT32),
+            compu_method=compu_method,
+        )
+        table_id = OdxLinkId("table", doc_frags)
+        table_rows: list[TableRow | OdxLinkRef] = [
+            TableRow(
+                odx_id=OdxLinkId(f"table.row_{i}", doc_frags),
+                short_name=f"row_{i}",
+                table_ref=OdxLinkRef.from_id(table_id),
+                key_raw=str(i),
+                dop_ref=OdxLinkRef.from_id(value_dop.odx_id),
+            ) for i in range(10000)
+        ]
+        # the same key is used by two table rows
+        table_rows.append(
+            TableRow(
+                odx_id=OdxLinkId("table.duplicate_row", doc_frags),
+                short_name="duplicate_row",
+                table_ref=OdxLinkRef.from_id(table_id),
+                key_raw="1234",
+                dop_ref=OdxLinkRef.from_id(value_dop.odx_id),
+            ))
+        table = Table(
+            odx_id=table_id,
+            short_name="table",
+            key_dop_ref=OdxLinkRef.from_id(key_dop.odx_id),
+            table_rows_raw=table_rows,
+        )
+        table_key = TableKeyParameter(
+            odx_id=OdxLinkId("request.table_key", doc_frags),
+            short_name="table_key",
+            table_ref=OdxLinkRef.from_id(table_id),
+            byte_position=1,
+        )
+        req = Request(
+            odx_id=OdxLinkId("request", doc_frags),
+            short_name="request",
+            parameters=NamedItemList([
+                CodedConstParameter(
+                    short_name="SID",
+                    diag_coded_type=uint8_type,
+                    coded_value_raw=str(0x22),
+                    byte_position=0,
+                ),
+                table_key,
+                TableStructParameter(
+                    short_name="table_struct",
+                    table_key_ref=OdxLinkRef.from_id(table_key.odx_id),
+                    byte_position=3,
+                ),
+            ]),
+        )
+        ecu_variant_raw = EcuVariantRaw(
+            variant_type=DiagLayerType.ECU_VARIANT,
+            odx_id=OdxLinkId("dl_id", doc_frags),
+            short_name="dl_sn",
+            diag_data_dictionary_spec=DiagDataDictionarySpec(
+                data_object_props=NamedItemList([key_dop, value_dop]),
+                tables=NamedItemList([table])),
+            requests=NamedItemList([req]),
+        )
+        ecu_variant = EcuVariant(diag_layer_raw=ecu_variant_raw)
+        odxlinks = OdxLinkDatabase()
+        odxlinks.update(ecu_variant._build_odxlinks())
+        ecu_variant._resolve_odxlinks(odxlinks)
+        ecu_variant._finalize_init(Database(), odxlinks)
+
+        self.assertEqual(table.get_table_rows_by_key(9876), [table.table_rows.row_9876])
+        self.assertEqual(
+            table.get_table_rows_by_short_name("row_9876"), [table.table_rows.row_9876])
+        self.assertEqual(table.get_table_rows_by_key(12345), [])
+
+        coded_message = bytes([0x22, 0x26, 0x94, 0x42])
+        param_dict: ParameterValueDict = {"SID": 0x22, "table_struct": ("row_9876", 0x42)}
+        self.assertEqual(req.encode(**param_dict), coded_message)
+        self.assertEqual(req.decode(coded_message), {"table_key": "row_9876", **param_dict})
+
+        with self.assertRaises(DecodeError):
+            req.decode(bytes([0x22, 0x04, 0xd2, 0x42]))
+        with self.assertRaises(DecodeError):
+            req.decode(bytes([0x22, 0xff, 0xff, 0x42]))
+
 
 class TestDecodingAndEncoding(unittest.TestCase):
 
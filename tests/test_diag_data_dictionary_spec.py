@@ -304,6 +304,63 @@ class TestDiagDataDictionarySpec(unittest.TestCase):
         ecu._resolve_odxlinks(odxlinks)
         self.assertEqual(mux.get_static_bit_length(), 8)
 
+    def test_multiplexer_overlapping_cases(self) -> None:
+        dop = DataObjectProperty(
+            odx_id=OdxLinkId("test_ddds.dop.uint8", doc_frags),
+            short_name="uint8",
+            diag_coded_type=StandardLengthType(
+                base_data_type=DataType.A_UINT32,
+                bit_length=8,
+            ),
+            physical_type=PhysicalType(base_data_type=DataType.A_UINT32),
+            compu_method=IdenticalCompuMethod(
+                category=CompuCategory.IDENTICAL,
+                internal_type=DataType.A_UINT32,
+                physical_type=DataType.A_UINT32),
+        )
+        # if the ranges of multiple cases contain a key value, the
+        # case which is defined first applies
+        case_limits = [(20, 30), (10, 25), (25, 40), (22, 22), (50, 60), (0, 5), (3, 12)]
+        mux = Multiplexer(
+            odx_id=OdxLinkId("test_ddds.multiplexer.overlapping", doc_frags),
+            short_name="overlapping_mux",
+            byte_position=1,
+            switch_key=MultiplexerSwitchKey(
+                byte_position=0,
+                dop_ref=OdxLinkRef.from_id(dop.odx_id),
+            ),
+            default_case=MultiplexerDefaultCase(short_name="default_case"),
+            cases=NamedItemList([
+                MultiplexerCase(
+                    short_name=f"case_{i}",
+                    lower_limit=Limit(value_raw=str(lower), value_type=DataType.A_UINT32),
+                    upper_limit=Limit(value_raw=str(upper), value_type=DataType.A_UINT32),
+                ) for i, (lower, upper) in enumerate(case_limits)
+            ]),
+        )
+        odxlinks = OdxLinkDatabase()
+        odxlinks.update(dop._build_odxlinks())
+        odxlinks.update(mux._build_odxlinks())
+        mux._resolve_odxlinks(odxlinks)
+
+        for key_value in range(70):
+            expected_name = next(
+                (f"case_{i}" for i, (lower, upper) in enumerate(case_limits)
+                 if lower <= key_value <= upper),
+                "default_case",
+            )
+
+            decode_state = DecodeState(coded_message=bytes([key_value]))
+            self.assertEqual(mux.decode_from_pdu(decode_state), (expected_name, {}))
+
+            encode_state = EncodeState()
+            mux.encode_into_pdu((key_value, {}), encode_state)
+            self.assertEqual(encode_state.coded_message, bytes([key_value]))
+
+        encode_state = EncodeState()
+        mux.encode_into_pdu(("case_2", {}), encode_state)
+        self.assertEqual(encode_state.coded_message, bytes([25]))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,139 @@
+# SPDX-License-Identifier: MIT
+import asyncio
+import unittest
+
+import can
+
+from odxtools.client import DiagClient, DoIpClientTransport, IsoTpClientTransport
+from odxtools.doip import DoIpClient, DoIpServer
+from odxtools.ecusimulator import EcuSimulator
+from odxtools.isotp_transport import IsoTpChannel, IsoTpTransport
+from odxtools.loadfile import load_pdx_file
+from odxtools.message import Message
+from odxtools.odxtypes import ParameterValueDict
+
+odxdb = load_pdx_file("./examples/somersault.pdx")
+
+
+class TestEcuSimulator(unittest.TestCase):
+
+    def test_process_request(self) -> None:
+        ecu = odxdb.ecus.somersault_lazy
+        annoyed_chart = ecu.state_charts.annoyed_chart
+
+        def flip_values(message: Message) -> ParameterValueDict:
+            num_flips = message.param_dict["num_flips"]
+            assert isinstance(num_flips, int)
+            return {"sault_time": 2 * num_flips}
+
+        sim = EcuSimulator(
+            ecu, {
+                "session_start": {
+                    "can_do_backward_flips": "false"
+                },
+                "session_stop": {
+                    "can_do_backward_flips": "false"
+                },
+                "do_forward_flips": flip_values,
+            },
+            state_charts=[annoyed_chart])
+        fsm = sim.state_machines[0]
+
+        # tester present does not require any parameter values, so
+        # its response is available without decoding the request
+        self.assertEqual(sim.process_request(bytes.fromhex("3e00")), bytes.fromhex("7e00"))
+        self.assertEqual(sim.num_cache_hits, 1)
+
+        # responses which use value providers are computed for each request
+        self.assertEqual(sim.process_request(bytes.fromhex("ba1203")), bytes.fromhex("fa0306"))
+        self.assertEqual(sim.process_request(bytes.fromhex("ba1203")), bytes.fromhex("fa0306"))
+        self.assertEqual(sim.process_request(bytes.fromhex("ba1204")), bytes.fromhex("fa0408"))
+        self.assertEqual(sim.num_cache_hits, 1)
+
+        # the state chart is applied
+        self.assertEqual(fsm.active_state, annoyed_chart.states.in_bed)
+        self.assertEqual(sim.process_request(bytes.fromhex("100000")), bytes.fromhex("5000"))
+        self.assertEqual(fsm.active_state, annoyed_chart.states.on_street)
+        self.assertEqual(sim.process_request(bytes.fromhex("100000")), bytes.fromhex("7f1022"))
+        self.assertEqual(sim.process_request(bytes.fromhex("1001")), bytes.fromhex("5000"))
+        self.assertEqual(fsm.active_state, annoyed_chart.states.in_bed)
+        self.assertEqual(sim.process_request(bytes.fromhex("100000")), bytes.fromhex("5000"))
+        self.assertEqual(fsm.active_state, annoyed_chart.states.on_street)
+        sim.reset()
+        self.assertEqual(fsm.active_state, annoyed_chart.states.in_bed)
+
+        # positive responses are suppressed if the respective bit of
+        # the sub-function is set, negative ones are not
+        self.assertIsNone(sim.process_request(bytes.fromhex("3e80")))
+        self.assertIsNone(sim.process_request(bytes.fromhex("108000")))
+        self.assertEqual(fsm.active_state, annoyed_chart.states.on_street)
+        self.assertEqual(sim.process_request(bytes.fromhex("108000")), bytes.fromhex("7f1022"))
+        self.assertIsNone(sim.process_request(bytes.fromhex("1081")))
+        self.assertEqual(fsm.active_state, annoyed_chart.states.in_bed)
+
+        # unknown services, unsupported sub-functions, requests of
+        # incorrect length and unknown identifiers
+        self.assertEqual(sim.process_request(bytes.fromhex("99")), bytes.fromhex("7f9911"))
+        self.assertEqual(sim.process_request(bytes.fromhex("1005")), bytes.fromhex("7f1012"))
+        self.assertEqual(sim.process_request(bytes.fromhex("3e81")), bytes.fromhex("7f3e12"))
+        self.assertEqual(sim.process_request(bytes.fromhex("3e")), bytes.fromhex("7f3e13"))
+        self.assertEqual(sim.process_request(bytes.fromhex("ba12")), bytes.fromhex("7fba13"))
+        self.assertEqual(sim.process_request(bytes.fromhex("2201")), bytes.fromhex("7f2231"))
+
+        # the values of some parameters of the status report are not
+        # specified
+        self.assertEqual(sim.process_request(bytes.fromhex("2200")), bytes.fromhex("7f2222"))
+
+    def test_serve(self) -> None:
+        ecu = odxdb.ecus.somersault_lazy
+        num_ecus = 10
+
+        sims = [EcuSimulator(ecu, {"do_forward_flips": {"sault_time": i}}) for i in range(num_ecus)]
+
+        async def check_clients(clients: list[DiagClient]) -> None:
+            results = await asyncio.gather(*[
+                x.call("do_forward_flips", forward_soberness_check=0x12, num_flips=3)
+                for x in clients
+            ])
+            for i, result in enumerate(results):
+                self.assertEqual(result.coding_object.short_name, "grudging_forward")
+                self.assertEqual(result.param_dict["sault_time"], i)
+
+        async def run_isotp() -> None:
+            tester_channels = [
+                IsoTpChannel(tx_id=0x700 + i, rx_id=0x600 + i) for i in range(num_ecus)
+            ]
+            ecu_channels = [IsoTpChannel(tx_id=x.rx_id, rx_id=x.tx_id) for x in tester_channels]
+
+            with can.Bus(interface="virtual", channel="test_ecusimulator") as tester_bus, \
+                 can.Bus(interface="virtual", channel="test_ecusimulator") as ecu_bus:
+                async with IsoTpTransport(tester_bus, tester_channels) as tester_transport, \
+                           IsoTpTransport(ecu_bus, ecu_channels) as ecu_transport:
+                    ecu_tasks = [
+                        asyncio.create_task(sim.serve_isotp(ecu_transport, channel))
+                        for sim, channel in zip(sims, ecu_channels, strict=True)
+                    ]
+
+                    await check_clients([
+                        DiagClient(ecu, IsoTpClientTransport(tester_transport, x), p2_time=1.0)
+                        for x in tester_channels
+                    ])
+
+                    for task in ecu_tasks:
+                        task.cancel()
+
+        async def run_doip() -> None:
+            handlers = {0x100 + i: sim.handle_request for i, sim in enumerate(sims)}
+            async with DoIpServer(handlers) as server, \
+                       DoIpClient("127.0.0.1", server.port) as doip_client:
+                await check_clients([
+                    DiagClient(ecu, DoIpClientTransport(doip_client, x), p2_time=1.0)
+                    for x in handlers
+                ])
+
+        asyncio.run(run_isotp())
+        asyncio.run(run_doip())
+
+
+if __name__ == "__main__":
+    unittest.main()
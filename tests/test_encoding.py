@@ -1,8 +1,10 @@
 # SPDX-License-Identifier: MIT
 import math
 import unittest
+import warnings
 from datetime import datetime
 
+import odxtools.exceptions
 from odxtools.compumethods.compucategory import CompuCategory
 from odxtools.compumethods.compuinternaltophys import CompuInternalToPhys
 from odxtools.compumethods.compurationalcoeffs import CompuRationalCoeffs
@@ -24,7 +26,7 @@ from odxtools.encodestate import EncodeState
 from odxtools.encoding import Encoding
 from odxtools.environmentdata import EnvironmentData
 from odxtools.environmentdatadescription import EnvironmentDataDescription
-from odxtools.exceptions import EncodeError, OdxError
+from odxtools.exceptions import EncodeError, OdxError, OdxWarning
 from odxtools.nameditemlist import NamedItemList
 from odxtools.odxlink import DocType, OdxDocFragment, OdxLinkDatabase, OdxLinkId, OdxLinkRef
 from odxtools.odxtypes import DataType
@@ -39,6 +41,7 @@ from odxtools.request import Request
 from odxtools.response import Response, ResponseType
 from odxtools.snrefcontext import SnRefContext
 from odxtools.standardlengthtype import StandardLengthType
+from odxtools.structure import Structure
 from odxtools.text import Text
 
 doc_frags = (OdxDocFragment("UnitTest", DocType.CONTAINER),)
@@ -784,6 +787,19 @@ class TestEncodeRequest(unittest.TestCase):
         with self.assertRaises(EncodeError):
             raw_data = resp.encode(DTC=0x00c007, dtc_info={})
 
+        self.assertEqual(env_data_desc.get_env_data(0x445566), env_data_desc.env_datas.reason_for_2)
+        self.assertIsNone(env_data_desc.get_env_data(0xf00de5))
+
+        # decoding uses the same environment data
+        decoded = resp.decode(bytes.fromhex("445566ee0203"))
+        self.assertEqual(decoded["dtc_info"], {
+            "blabla_boiler": 0xee,
+            "blabla_3": 0x03,
+            "blabla_2": 0x02,
+        })
+        decoded = resp.decode(bytes.fromhex("f00de5ee"))
+        self.assertEqual(decoded["dtc_info"], {"blabla_boiler": 0xee})
+
     def test_encode_overlapping(self) -> None:
         uint24 = StandardLengthType(
             base_data_type=DataType.A_UINT32,
@@ -818,9 +834,72 @@ class TestEncodeRequest(unittest.TestCase):
             short_name="request_sn",
             parameters=NamedItemList([param1, param2, param3]),
         )
-        self.assertEqual(req.encode().hex(), "123456")
+        with self.assertWarns(OdxWarning):
+            self.assertEqual(req.encode().hex(), "123456")
         self.assertEqual(req.get_static_bit_length(), 24)
 
+        # overlap detection is a hot path check which can be disabled
+        odxtools.exceptions.hot_path_checks = False
+        try:
+            with warnings.catch_warnings():
+                warnings.simplefilter("error", OdxWarning)
+                self.assertEqual(req.encode().hex(), "123456")
+        finally:
+            odxtools.exceptions.hot_path_checks = True
+
+    def test_encode_state_buffers(self) -> None:
+        encode_state = EncodeState()
+        encode_state.ensure_length(4)
+        self.assertEqual(encode_state.coded_message, bytes(4))
+        self.assertEqual(encode_state.used_mask, bytes(4))
+
+        encode_state.cursor_byte_position = 1
+        encode_state.emplace_bytes(b"\x12")
+        encode_state.emplace_padding(2, 4)
+        encode_state.ensure_length(2)
+        self.assertEqual(encode_state.coded_message.hex(), "00120000")
+        self.assertEqual(encode_state.used_mask.hex(), "00ffffff")
+        self.assertEqual(encode_state.cursor_byte_position, 2)
+
+        # padding does not overwrite bytes which have already been used
+        encode_state = EncodeState()
+        encode_state.cursor_byte_position = 2
+        encode_state.emplace_bytes(b"\x34")
+        encode_state.cursor_byte_position = 0
+        encode_state.emplace_bytes(b"\x12")
+        encode_state.emplace_padding(1, 4)
+        self.assertEqual(encode_state.coded_message.hex(), "12003400")
+        self.assertEqual(encode_state.used_mask.hex(), "ffffffff")
+
+    def test_encode_structure_padding(self) -> None:
+        uint8_type = StandardLengthType(base_data_type=DataType.A_UINT32, bit_length=8)
+
+        # the byte positions of the parameters are not in ascending
+        # order, i.e., the cursor is located before the last byte used
+        # by the structure when the padding is added
+        structure = Structure(
+            odx_id=OdxLinkId("structure_id", doc_frags),
+            short_name="structure_sn",
+            byte_size=4,
+            parameters=NamedItemList([
+                CodedConstParameter(
+                    short_name="a",
+                    diag_coded_type=uint8_type,
+                    coded_value_raw=str(0x34),
+                    byte_position=2),
+                CodedConstParameter(
+                    short_name="b",
+                    diag_coded_type=uint8_type,
+                    coded_value_raw=str(0x12),
+                    byte_position=0),
+            ]),
+        )
+
+        encode_state = EncodeState()
+        structure.encode_into_pdu({}, encode_state)
+        self.assertEqual(encode_state.coded_message.hex(), "12003400")
+        self.assertEqual(encode_state.cursor_byte_position, 4)
+
     def _create_request(self, parameters: list[Parameter]) -> Request:
         return Request(
             odx_id=OdxLinkId("request_id", doc_frags),
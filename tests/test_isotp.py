@@ -0,0 +1,494 @@
+# SPDX-License-Identifier: MIT
+import argparse
+import asyncio
+import csv
+import io
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import can
+
+from odxtools.canbusreceiver import CanBusReceiver
+from odxtools.canlogreader import (parse_log_line, parse_normal_line, read_candump_frames,
+                                   read_python_can_frames)
+from odxtools.cli.decode_trace import parse_channel
+from odxtools.isotp_state_machine import IsoTpStateMachine
+from odxtools.isotp_transport import IsoTpChannel, IsoTpError, IsoTpTransmitter, IsoTpTransport
+from odxtools.isotp_transport import segment_telegram as segment_telegram_for_tx
+from odxtools.isotp_transport import separation_time_from_stmin
+from odxtools.loadfile import load_pdx_file
+from odxtools.tracedecoder import (TraceChannel, TraceDecoder, channels_from_database, decode_trace,
+                                   decode_trace_file, write_csv, write_jsonl)
+
+
+def segment_telegram(payload: bytes, frame_size: int = 8) -> list[bytes]:
+    """Split a telegram into ISO-TP first and consecutive frames"""
+    if len(payload) <= 0xfff:
+        first_frame = bytes([0x10 | (len(payload) >> 8), len(payload) & 0xff])
+    else:
+        first_frame = bytes([0x10, 0x00]) + len(payload).to_bytes(4, "big")
+
+    n = frame_size - len(first_frame)
+    frames = [first_frame + payload[:n]]
+    segment_idx = 1
+    while n < len(payload):
+        chunk = payload[n:n + frame_size - 1]
+        frame = bytes([0x20 | segment_idx]) + chunk
+        frames.append(frame + b"\xaa" * (frame_size - len(frame)))
+        segment_idx = (segment_idx + 1) % 16
+        n += frame_size - 1
+
+    return frames
+
+
+class TestIsoTpStateMachine(unittest.TestCase):
+
+    def test_single_frame(self) -> None:
+        sm = IsoTpStateMachine(can_rx_ids=[0x7e0, 0x7e8])
+
+        self.assertEqual(
+            list(sm.decode_rx_frame(0x7e8, bytes.fromhex("03620102aaaaaaaa"))),
+            [(0x7e8, bytes.fromhex("620102"))])
+        # unknown CAN IDs are ignored
+        self.assertEqual(list(sm.decode_rx_frame(0x123, bytes.fromhex("03620102"))), [])
+
+        # CAN-FD single frame with the length specified by the escape
+        # sequence
+        payload = bytes(range(40))
+        frame = bytes([0x00, len(payload)]) + payload + b"\xcc" * 6
+        self.assertEqual(list(sm.decode_rx_frame(0x7e0, frame)), [(0x7e0, payload)])
+
+    def test_multi_frame(self) -> None:
+        sm = IsoTpStateMachine(can_rx_ids=[0x7e0, 0x7e8])
+
+        payload = bytes(i % 251 for i in range(100))
+        result = []
+        for frame in segment_telegram(payload):
+            result += list(sm.decode_rx_frame(0x7e8, frame))
+        self.assertEqual(result, [(0x7e8, payload)])
+        self.assertEqual(sm.telegram_data(1), payload)
+
+        # superfluous consecutive frames do not produce telegrams
+        self.assertEqual(list(sm.decode_rx_frame(0x7e8, bytes.fromhex("2f00000000000000"))), [])
+
+        # telegrams larger than 4095 bytes use the escape sequence of
+        # ISO 15765-2:2016 for their first frame
+        payload = bytes(i % 253 for i in range(5000))
+        result = []
+        for frame in segment_telegram(payload, frame_size=64):
+            result += list(sm.decode_rx_frame(0x7e0, frame))
+        self.assertEqual(result, [(0x7e0, payload)])
+
+        # first frames which use the escape sequence for lengths below
+        # 4096 bytes or which are too short for it are ignored
+        for frame in [bytes.fromhex("10000000010011223344"), bytes.fromhex("1000000010")]:
+            self.assertEqual(list(sm.decode_rx_frame(0x7e0, frame)), [])
+            self.assertEqual(sm.telegram_data(0), payload)
+
+        # the receive buffer is not allocated up-front for huge
+        # telegrams, but grows with the received data
+        frame = bytes.fromhex("1000ffffffff") + bytes(range(58))
+        self.assertEqual(list(sm.decode_rx_frame(0x7e0, frame)), [])
+        self.assertEqual(sm.telegram_data(0), bytes(range(58)))
+        self.assertEqual(list(sm.decode_rx_frame(0x7e0, b"\x21" + bytes(range(63)))), [])
+        self.assertEqual(sm.telegram_data(0), bytes(range(58)) + bytes(range(63)))
+
+    def test_sequence_error(self) -> None:
+        errors = []
+
+        class TestStateMachine(IsoTpStateMachine):
+
+            def on_sequence_error(self, telegram_idx: int, expected_idx: int, rx_idx: int) -> None:
+                errors.append((telegram_idx, expected_idx, rx_idx))
+
+        sm = TestStateMachine(can_rx_ids=0x7e8)
+        frames = segment_telegram(bytes(20))
+        self.assertEqual(list(sm.decode_rx_frame(0x7e8, frames[0])), [])
+        self.assertEqual(list(sm.decode_rx_frame(0x7e8, frames[2])), [])
+        self.assertEqual(errors, [(0, 1, 2)])
+        self.assertEqual(sm.telegram_data(0), bytes(6))
+
+    def test_read_telegrams_from_bus(self) -> None:
+        num_frames = 2000
+
+        async def run_test() -> tuple[list[tuple[int, bytes]], CanBusReceiver]:
+            with can.Bus(interface="virtual", channel="test_read_telegrams") as rx_bus, \
+                 can.Bus(interface="virtual", channel="test_read_telegrams") as tx_bus:
+                receiver = CanBusReceiver(rx_bus, max_queue_size=64)
+                sm = IsoTpStateMachine(can_rx_ids=[0x7e8])
+                result = []
+                async with receiver:
+                    # the frames are sent faster than they can be
+                    # processed, so the queue fills up
+                    for i in range(num_frames):
+                        tx_bus.send(
+                            can.Message(
+                                arbitration_id=0x7e8,
+                                is_extended_id=False,
+                                data=bytes([0x02, i >> 8, i & 0xff])))
+
+                    async def receive() -> None:
+                        async for telegram in sm.read_telegrams(receiver):
+                            result.append(telegram)
+                            if len(result) == num_frames:
+                                return
+
+                    await asyncio.wait_for(receive(), timeout=10)
+
+                return result, receiver
+
+        telegrams, receiver = asyncio.run(run_test())
+        self.assertEqual(telegrams, [(0x7e8, bytes([i >> 8, i & 0xff])) for i in range(num_frames)])
+        self.assertEqual(receiver.num_received, num_frames)
+        self.assertEqual(receiver.num_dropped, 0)
+        self.assertLessEqual(receiver.max_queue_depth, 64)
+
+    def test_bus_receiver_overflow(self) -> None:
+
+        async def run_test() -> CanBusReceiver:
+            with can.Bus(interface="virtual", channel="test_overflow") as rx_bus, \
+                 can.Bus(interface="virtual", channel="test_overflow") as tx_bus:
+                receiver = CanBusReceiver(rx_bus, max_queue_size=16, drop_on_overflow=True)
+                async with receiver:
+                    for _ in range(100):
+                        tx_bus.send(can.Message(arbitration_id=0x7e8, data=b"\x01\x3e"))
+
+                    # nobody consumes the frames
+                    for _ in range(100):
+                        if receiver.num_received + receiver.num_dropped == 100:
+                            break
+                        await asyncio.sleep(0.01)
+
+                    self.assertEqual(receiver.queue_depth, 16)
+                    self.assertEqual(len(await receiver.receive_batch()), 16)
+                    self.assertEqual(receiver.queue_depth, 0)
+
+                return receiver
+
+        receiver = asyncio.run(run_test())
+        self.assertEqual(receiver.num_received, 16)
+        self.assertEqual(receiver.num_dropped, 84)
+
+
+class TestIsoTpTransport(unittest.TestCase):
+
+    def test_segment_telegram(self) -> None:
+        self.assertEqual(segment_telegram_for_tx(b"\x3e\x00"), (b"\x02\x3e\x00", []))
+        self.assertEqual(
+            segment_telegram_for_tx(bytes(range(10))),
+            (bytes([0x10, 10, 0, 1, 2, 3, 4, 5]), [bytes([0x21, 6, 7, 8, 9])]))
+
+        # CAN-FD single frame
+        self.assertEqual(
+            segment_telegram_for_tx(bytes(20), max_frame_size=64), (bytes([0, 20]) + bytes(20), []))
+
+        payload = bytes(i % 256 for i in range(5000))
+        first_frame, consecutive_frames = segment_telegram_for_tx(payload, max_frame_size=64)
+        self.assertEqual(first_frame[:6], bytes([0x10, 0, 0, 0, 0x13, 0x88]))
+        self.assertEqual(len(first_frame), 64)
+        self.assertEqual([x[0] for x in consecutive_frames[:17]],
+                         [0x21 + i for i in range(15)] + [0x20, 0x21])
+        self.assertEqual(first_frame[6:] + b"".join(x[1:] for x in consecutive_frames), payload)
+
+        self.assertEqual(separation_time_from_stmin(0x14), 0.020)
+        self.assertAlmostEqual(separation_time_from_stmin(0xf3), 0.0003)
+        self.assertEqual(separation_time_from_stmin(0xfa), 0.127)
+
+    def test_transport(self) -> None:
+        tester_channels = [
+            IsoTpChannel(tx_id=0x7e0, rx_id=0x7e8),
+            IsoTpChannel(tx_id=0x7e1, rx_id=0x7e9, max_frame_size=64),
+        ]
+        ecu_channels = [
+            IsoTpChannel(tx_id=0x7e8, rx_id=0x7e0),
+            IsoTpChannel(tx_id=0x7e9, rx_id=0x7e1, max_frame_size=64),
+        ]
+        payloads = [bytes(i % 256 for i in range(n)) for n in (3, 100, 5000)]
+
+        async def run_test() -> None:
+            with can.Bus(interface="virtual", channel="test_transport") as tester_bus, \
+                 can.Bus(interface="virtual", channel="test_transport") as ecu_bus:
+                async with IsoTpTransport(tester_bus, tester_channels) as tester, \
+                           IsoTpTransport(ecu_bus, ecu_channels) as ecu:
+                    for payload in payloads:
+                        # send on both channels concurrently
+                        await asyncio.gather(
+                            tester.send(0x7e0, payload), tester.send(0x7e1, payload[::-1]))
+                        self.assertEqual(await ecu.receive(0x7e0, timeout=5), payload)
+                        self.assertEqual(await ecu.receive(0x7e1, timeout=5), payload[::-1])
+
+                        await ecu.send(0x7e8, payload)
+                        self.assertEqual(await tester.receive(0x7e8, timeout=5), payload)
+
+        asyncio.run(run_test())
+
+    def test_flow_control(self) -> None:
+        channel = IsoTpChannel(tx_id=0x7e0, rx_id=0x7e8)
+
+        async def run_test() -> None:
+            with can.Bus(interface="virtual", channel="test_flow_control") as tx_bus, \
+                 can.Bus(interface="virtual", channel="test_flow_control") as rx_bus:
+                transmitter = IsoTpTransmitter(tx_bus, [channel], flow_control_timeout=0.5)
+
+                def received_frames() -> list[bytes]:
+                    result = []
+                    while (msg := rx_bus.recv(timeout=0.05)) is not None:
+                        result.append(bytes(msg.data))
+                    return result
+
+                task = asyncio.create_task(transmitter.send(0x7e0, bytes(40)))
+                await asyncio.sleep(0.01)
+                self.assertEqual([x[0] for x in received_frames()], [0x10])
+
+                # the receiver requests blocks of two frames. frames
+                # received on other CAN IDs are not flow control frames
+                self.assertFalse(transmitter.handle_rx_frame(0x7e9, b"\x30\x02\x00"))
+                self.assertTrue(transmitter.handle_rx_frame(0x7e8, b"\x30\x02\x00"))
+                await asyncio.sleep(0.01)
+                self.assertEqual([x[0] for x in received_frames()], [0x21, 0x22])
+
+                # WAIT frames delay the transmission
+                transmitter.handle_rx_frame(0x7e8, b"\x31\x00\x00")
+                await asyncio.sleep(0.01)
+                self.assertEqual(received_frames(), [])
+
+                transmitter.handle_rx_frame(0x7e8, b"\x30\x00\x00")
+                await task
+                frames = received_frames()
+                self.assertEqual([x[0] for x in frames], [0x23, 0x24, 0x25])
+                # all frames are padded
+                self.assertEqual(frames[-1], b"\x25" + bytes(6) + b"\xcc")
+
+                # overflow
+                task = asyncio.create_task(transmitter.send(0x7e0, bytes(40)))
+                await asyncio.sleep(0.01)
+                transmitter.handle_rx_frame(0x7e8, b"\x32\x00\x00")
+                with self.assertRaises(IsoTpError):
+                    await task
+
+                # missing flow control
+                with self.assertRaises(asyncio.TimeoutError):
+                    await transmitter.send(0x7e0, bytes(40))
+
+        asyncio.run(run_test())
+
+
+class TestCanLogReader(unittest.TestCase):
+
+    def test_parse_lines(self) -> None:
+        self.assertEqual(
+            parse_log_line("(1620000000.500000) can0 7E8#0362F190AAAAAAAA"),
+            (1620000000.5, 0x7e8, bytes.fromhex("0362F190AAAAAAAA")))
+        self.assertEqual(
+            parse_log_line("(1.000000) vcan0 7E8##10002" + 62 * "11"),
+            (1.0, 0x7e8, bytes.fromhex("0002" + 62 * "11")))
+        # trailing fields like the direction flag are ignored
+        self.assertEqual(
+            parse_log_line("(1.000000) can0 7E0#023E00 R"), (1.0, 0x7e0, bytes.fromhex("023E00")))
+        self.assertIsNone(parse_log_line("(1.000000) can0 7E8#0Z"))
+        self.assertIsNone(parse_log_line("  can0  7E8   [4]  03 62 F1 90"))
+
+        self.assertEqual(
+            parse_normal_line("  can0  7E8   [4]  03 62 F1 90"),
+            (None, 0x7e8, bytes.fromhex("0362F190")))
+        self.assertEqual(
+            parse_normal_line(" (000.012000)  can0  7E0   [2]  01 3E"),
+            (0.012, 0x7e0, bytes.fromhex("013E")))
+        self.assertIsNone(parse_normal_line("  can0  7E8   [4]  03 62"))
+
+    def test_read_candump_frames(self) -> None:
+        log = io.StringIO("(1.0) can0 7E0#0322F190\n"
+                          "garbage\n"
+                          "\n"
+                          "  can0  7E8   [8]  10 0A 62 F1 90 01 02 03\n"
+                          "(2.0) can0 7E8#2104050607AAAAAA")
+
+        # use a tiny chunk size so lines span multiple chunks
+        frames = list(read_candump_frames(log, chunk_size=7))
+        self.assertEqual(frames, [
+            (1.0, 0x7e0, bytes.fromhex("0322F190")),
+            (None, 0x7e8, bytes.fromhex("100A62F190010203")),
+            (2.0, 0x7e8, bytes.fromhex("2104050607AAAAAA")),
+        ])
+
+        sm = IsoTpStateMachine(can_rx_ids=[0x7e0, 0x7e8])
+        self.assertEqual(
+            list(sm.decode_frames(frames)), [
+                (1.0, 0x7e0, bytes.fromhex("22F190")),
+                (2.0, 0x7e8, bytes.fromhex("62F19001020304050607")),
+            ])
+
+        async def read_all() -> list[tuple[int, bytes]]:
+            log.seek(0)
+            return [x async for x in sm.read_telegrams(log)]
+
+        self.assertEqual(
+            asyncio.run(read_all()), [
+                (0x7e0, bytes.fromhex("22F190")),
+                (0x7e8, bytes.fromhex("62F19001020304050607")),
+            ])
+
+    def test_read_python_can_frames(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_name = os.path.join(tmp_dir, "trace.asc")
+            with can.Logger(file_name) as logger:
+                logger(can.Message(timestamp=1.0, arbitration_id=0x7e0, data=b"\x02\x3e\x00"))
+                logger(can.Message(timestamp=1.5, arbitration_id=0x7e0, is_remote_frame=True))
+                logger(can.Message(timestamp=2.0, arbitration_id=0x7e8, data=b"\x02\x7e\x00"))
+
+            frames = list(read_python_can_frames(file_name))
+
+        self.assertEqual([x[1:] for x in frames], [
+            (0x7e0, b"\x02\x3e\x00"),
+            (0x7e8, b"\x02\x7e\x00"),
+        ])
+        t0, t1 = frames[0][0], frames[1][0]
+        assert t0 is not None and t1 is not None
+        self.assertAlmostEqual(t1 - t0, 1.0)
+
+
+class TestTraceDecoder(unittest.TestCase):
+
+    trace = "\n".join([
+        "(1.000000) can0 7E0#0410011234AAAAAA",
+        "(1.010000) can0 7E8#025001AAAAAAAAAA",
+        "(1.050000) can0 7E1#0210FFAAAAAAAAAA",
+        "(1.100000) can0 7E0#03BA1201AAAAAAAA",
+        "(1.110000) can0 7E8#037FBA78AAAAAAAA",
+        "(1.120000) can0 7E9#037F1011AAAAAAAA",
+        "",
+    ])
+    channels = [
+        TraceChannel(request_id=0x7e0, response_id=0x7e8, diag_layer="somersault_lazy"),
+        TraceChannel(request_id=0x7e1, response_id=0x7e9, diag_layer="somersault_assiduous"),
+    ]
+
+    def test_decode_trace(self) -> None:
+        odxdb = load_pdx_file("./examples/somersault.pdx")
+
+        frames = read_candump_frames(io.StringIO(self.trace))
+        telegrams = list(decode_trace(frames, odxdb, self.channels))
+        self.assertEqual([x.timestamp for x in telegrams], [1.0, 1.01, 1.05, 1.1, 1.11, 1.12])
+        self.assertEqual([x.can_id for x in telegrams], [0x7e0, 0x7e8, 0x7e1, 0x7e0, 0x7e8, 0x7e9])
+
+        self.assertFalse(telegrams[0].is_response)
+        self.assertEqual(telegrams[0].service, "session_stop")
+        self.assertEqual(telegrams[0].params, {"sid": 0x10, "id": 1})
+
+        # the response is decoded using the preceding request
+        self.assertTrue(telegrams[1].is_response)
+        self.assertEqual(telegrams[1].coding_object, "session")
+
+        # "response pending" telegrams are not decoded
+        self.assertTrue(telegrams[4].is_response_pending)
+        self.assertIsNone(telegrams[4].params)
+        self.assertEqual(telegrams[5].diag_layer, "somersault_assiduous")
+
+        # the results of parallel decoding are merged in timestamp order
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_name = os.path.join(tmp_dir, "trace.log")
+            with open(file_name, "w") as f:
+                f.write(self.trace)
+
+            parallel_telegrams = list(
+                decode_trace_file(file_name, odxdb, self.channels, num_workers=2))
+            self.assertEqual(parallel_telegrams, telegrams)
+
+            # the frames are passed to the workers in chunks and the
+            # results are merged chunk by chunk
+            with patch("odxtools.tracedecoder._CHUNK_SIZE", 2), \
+                 patch("odxtools.tracedecoder._MAX_PENDING_CHUNKS", 1):
+                parallel_telegrams = list(
+                    decode_trace_file(file_name, odxdb, self.channels, num_workers=2))
+            self.assertEqual(parallel_telegrams, telegrams)
+
+        output = io.StringIO()
+        write_jsonl(telegrams, output)
+        lines = output.getvalue().splitlines()
+        self.assertEqual(len(lines), 6)
+        self.assertEqual(json.loads(lines[1])["direction"], "response")
+        self.assertEqual(json.loads(lines[1])["payload"], "5001")
+
+        output = io.StringIO()
+        write_csv(telegrams, output)
+        rows = list(csv.DictReader(io.StringIO(output.getvalue())))
+        self.assertEqual(len(rows), 6)
+        self.assertEqual(rows[0]["can_id"], "0x7e0")
+        self.assertEqual(json.loads(rows[0]["params"]), {"sid": 0x10, "id": 1})
+
+    def test_multiple_ecus(self) -> None:
+        odxdb = load_pdx_file("./examples/somersault.pdx")
+
+        # all ECU variants of the somersault database use the same CAN
+        # IDs, so only the first one is considered
+        self.assertEqual(
+            channels_from_database(odxdb),
+            [TraceChannel(request_id=0x7b, response_id=0x1c8, diag_layer="somersault_lazy")])
+
+        channels = [
+            TraceChannel(
+                request_id=0x7e0,
+                response_id=0x7e8,
+                functional_request_id=0x7df,
+                diag_layer="somersault_lazy"),
+            TraceChannel(
+                request_id=0x7e1,
+                response_id=0x7e9,
+                functional_request_id=0x7df,
+                diag_layer="somersault_assiduous"),
+        ]
+        self.assertEqual([
+            parse_channel("0x7e0:0x7e8:somersault_lazy:0x7df"),
+            parse_channel("2017:2025:somersault_assiduous:2015"),
+        ], channels)
+        self.assertIsNone(parse_channel("0x7e0:0x7e8:somersault_lazy").functional_request_id)
+        for spec in ["0x7e0:0x7e8", "0x7e0:0x7e8::0x7df", "0x7e0:0x7e8:somersault_lazy:0x7df:1"]:
+            with self.assertRaises(argparse.ArgumentTypeError):
+                parse_channel(spec)
+
+        decoder = TraceDecoder(odxdb, channels)
+        self.assertEqual(sorted(decoder.can_ids), [0x7df, 0x7e0, 0x7e1, 0x7e8, 0x7e9])
+        self.assertIsNone(decoder.decode_telegram(0, None, 0x123, b"\x3e\x00"))
+
+        # a functional request is answered by both ECUs
+        request = decoder.decode_telegram(1, None, 0x7df, bytes.fromhex("10011234"))
+        assert request is not None
+        self.assertTrue(request.is_functional)
+        self.assertEqual(request.service, "session_stop")
+
+        responses = [
+            decoder.decode_telegram(2, None, 0x7e9, bytes.fromhex("5001")),
+            decoder.decode_telegram(3, None, 0x7e8, bytes.fromhex("5001")),
+        ]
+        for response, diag_layer in zip(
+                responses, ["somersault_assiduous", "somersault_lazy"], strict=True):
+            assert response is not None
+            self.assertEqual(response.diag_layer, diag_layer)
+            self.assertEqual(response.request_frame_index, 1)
+            self.assertEqual(response.coding_object, "session")
+            self.assertIsNotNone(response.message)
+
+        # the outstanding requests are tracked per ECU
+        decoder.decode_telegram(4, None, 0x7e0, bytes.fromhex("ba1201"))
+        response = decoder.decode_telegram(5, None, 0x7e9, bytes.fromhex("5001"))
+        assert response is not None
+        self.assertEqual(response.request_frame_index, 1)
+
+        # functional requests show up only once if the trace is
+        # decoded in parallel
+        trace = "(1.0) can0 7DF#0410011234\n(1.1) can0 7E8#025001\n(1.2) can0 7E9#025001\n"
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_name = os.path.join(tmp_dir, "trace.log")
+            with open(file_name, "w") as f:
+                f.write(trace)
+
+            telegrams = list(decode_trace_file(file_name, odxdb, channels, num_workers=2))
+        self.assertEqual([x.can_id for x in telegrams], [0x7df, 0x7e8, 0x7e9])
+        self.assertEqual([x.request_frame_index for x in telegrams], [None, 0, 0])
+
+
+if __name__ == "__main__":
+    unittest.main()
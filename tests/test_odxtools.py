@@ -5,10 +5,13 @@ from dataclasses import dataclass
 
 import odxtools
 import odxtools.exceptions
+from odxtools.decodestate import DecodeState
+from odxtools.encoding import Encoding
 from odxtools.exceptions import OdxError
 from odxtools.loadfile import load_pdx_file
 from odxtools.nameditemlist import NamedItemList
 from odxtools.odxlink import OdxLinkRef
+from odxtools.odxtypes import AtomicOdxType, DataType
 
 odxdb = load_pdx_file("./examples/somersault.pdx")
 
@@ -50,6 +53,64 @@ class TestStrictMode(unittest.TestCase):
         # go back to strict mode
         odxtools.exceptions.strict_mode = True
 
+    def test_lazy_messages(self) -> None:
+        calls = []
+
+        def make_message() -> str:
+            calls.append(1)
+            return "lazy message"
+
+        # messages are only produced if the assertion fails
+        odxtools.exceptions.odxassert(True, make_message)
+        self.assertEqual(calls, [])
+        with self.assertRaisesRegex(OdxError, "lazy message"):
+            odxtools.exceptions.odxassert(False, make_message)
+        self.assertEqual(calls, [1])
+
+        with self.assertRaisesRegex(OdxError, "lazy message"):
+            odxtools.exceptions.odxraise(make_message)
+        with self.assertRaisesRegex(OdxError, "lazy message"):
+            odxtools.exceptions.odxrequire(None, make_message)
+
+    def test_hot_path_checks(self) -> None:
+        self.assertTrue(odxtools.exceptions.hot_path_checks)
+
+        def decode_float() -> AtomicOdxType:
+            decode_state = DecodeState(coded_message=bytes.fromhex("3fc00000"))
+            return decode_state.extract_atomic_value(
+                bit_length=32,
+                base_data_type=DataType.A_FLOAT32,
+                base_type_encoding=Encoding.BCD_P,
+                is_highlow_byte_order=True)
+
+        # floating point values cannot be BCD encoded
+        with self.assertRaises(OdxError):
+            decode_float()
+
+        # if the conformance checks of the hot paths are disabled,
+        # such issues are not detected
+        odxtools.exceptions.hot_path_checks = False
+        try:
+            self.assertEqual(decode_float(), 1.5)
+        finally:
+            odxtools.exceptions.hot_path_checks = True
+
+        # the results for valid databases are unaffected
+        request = odxdb.diag_layers.somersault_lazy.services.do_forward_flips.request
+        assert request is not None
+        odxtools.exceptions.hot_path_checks = False
+        try:
+            self.assertEqual(
+                request.encode(forward_soberness_check=0x12, num_flips=12), bytes.fromhex("ba120c"))
+            self.assertEqual(
+                request.decode(bytes.fromhex("ba120c")), {
+                    "sid": 0xBA,
+                    "forward_soberness_check": 0x12,
+                    "num_flips": 12
+                })
+        finally:
+            odxtools.exceptions.hot_path_checks = True
+
 
 class TestDataObjectProperty(unittest.TestCase):
 
@@ -89,6 +150,30 @@ class TestComposeUDS(unittest.TestCase):
         coded_response = response.encode(yeha_level=3, coded_request=coded_request)
         self.assertEqual(bytes(coded_response), bytes.fromhex("faba03"))
 
+    def test_codec_metadata(self) -> None:
+        request = odxdb.odxlinks.resolve(
+            OdxLinkRef("somersault.RQ.do_forward_flips", container_doc_frags))
+        response = odxdb.odxlinks.resolve(
+            OdxLinkRef("somersault.PR.happy_forward", container_doc_frags))
+
+        metadata = request.codec_metadata
+        self.assertIs(request.codec_metadata, metadata)
+        self.assertEqual(metadata.parameter_names, {"sid", "forward_soberness_check", "num_flips"})
+        self.assertIs(metadata.last_parameter, request.parameters.num_flips)
+        self.assertEqual([x.short_name for x in request.required_parameters],
+                         ["forward_soberness_check", "num_flips"])
+        self.assertEqual(metadata.key_parameters, [])
+        self.assertEqual(request.get_static_bit_length(), 24)
+        self.assertEqual(request.coded_const_prefix(), bytes.fromhex("ba"))
+        self.assertEqual(
+            response.coded_const_prefix(request_prefix=bytes.fromhex("ba")), bytes.fromhex("faba"))
+
+        # the metadata must be determined again after the database
+        # has been refreshed
+        odxdb.refresh()
+        self.assertIsNot(request.codec_metadata, metadata)
+        self.assertEqual(request.codec_metadata.parameter_names, metadata.parameter_names)
+
 
 @dataclass
 class X:
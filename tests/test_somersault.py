@@ -6,12 +6,19 @@ from unittest.mock import patch
 from packaging.version import Version
 
 from odxtools.description import Description
-from odxtools.exceptions import OdxError, odxrequire
+from odxtools.exceptions import DecodeError, OdxError, odxrequire
 from odxtools.loadfile import load_pdx_file
+from odxtools.networkindex import NetworkIndex
+from odxtools.odxtypes import ParameterValueDict
 from odxtools.parameters.nrcconstparameter import NrcConstParameter
 from odxtools.parameters.valueparameter import ValueParameter
 from odxtools.utils import retarget_snrefs
 
+try:
+    import numpy as np
+except ImportError:
+    np = None  # type: ignore[assignment]
+
 odxdb = load_pdx_file("./examples/somersault.pdx")
 
 
@@ -33,6 +40,42 @@ class TestDatabase(unittest.TestCase):
         self.assertEqual([x.short_name for x in odxdb.ecus],
                          ["somersault_lazy", "somersault_assiduous"])
 
+    def test_network_index(self) -> None:
+        index = odxdb.network_index()
+        self.assertIs(odxdb.network_index(), index)
+
+        self.assertEqual([
+            (x.diag_layer.short_name, odxrequire(x.protocol).short_name) for x in index.nodes
+        ], [
+            ("somersault_base_variant", "somersault_protocol"),
+            ("somersault_lazy", "somersault_protocol"),
+            ("somersault_assiduous", "somersault_protocol"),
+        ])
+
+        lazy_node = index.for_diag_layer("somersault_lazy")[0]
+        self.assertEqual(lazy_node.can_request_id, 0x7b)
+        self.assertEqual(lazy_node.can_response_id, 0x1c8)
+        self.assertIsNone(lazy_node.can_functional_request_id)
+        self.assertIsNone(lazy_node.doip_logical_address)
+
+        self.assertEqual(index.for_can_request_id(0x7b), index.nodes)
+        self.assertEqual(index.for_can_response_id(0x1c8), index.nodes)
+        self.assertEqual(index.for_can_id(0x1c8), index.nodes)
+        self.assertEqual(index.for_can_response_id(0x7b), [])
+        self.assertEqual(index.for_doip_address(0x7b), [])
+        self.assertEqual(index.for_doip_gateway_address(0x7b), [])
+
+        # ECUs can be looked up by the DoIP gateway they are located
+        # behind
+        lazy_ecu = odxdb.ecus.somersault_lazy
+        with patch.object(lazy_ecu, "get_doip_logical_ecu_address", return_value=0x10), \
+             patch.object(lazy_ecu, "get_doip_logical_gateway_address", return_value=0x1000):
+            doip_index = NetworkIndex([lazy_ecu])
+        self.assertEqual([x.diag_layer for x in doip_index.for_doip_gateway_address(0x1000)],
+                         [lazy_ecu])
+        self.assertEqual(doip_index.for_doip_gateway_address(0x10), [])
+        self.assertEqual(doip_index.for_doip_address(0x10), doip_index.nodes)
+
     def test_admin_data(self) -> None:
         dlc = odxdb.diag_layer_containers.somersault
 
@@ -183,6 +226,102 @@ class TestEnDecode(unittest.TestCase):
             "Value for unknown parameter 'grass_level' specified for composite codec object do_forward_flips"
         )
 
+    def test_compile_encoder(self) -> None:
+        ecu = odxdb.ecus.somersault_lazy
+        request = odxrequire(ecu.services.do_forward_flips.request)
+
+        encoder = request.compile_encoder()
+        self.assertTrue(encoder.is_static)
+        self.assertEqual([x.short_name for x in encoder.variable_parameters],
+                         ["forward_soberness_check", "num_flips"])
+        for num_flips in (0, 1, 17, 255):
+            self.assertEqual(
+                encoder(forward_soberness_check=0x12, num_flips=num_flips),
+                request.encode(forward_soberness_check=0x12, num_flips=num_flips))
+
+        encoder = request.compile_encoder(fixed_params={"forward_soberness_check": 0x12})
+        self.assertEqual(encoder(num_flips=5), bytes.fromhex("ba1205"))
+
+        # errors are reported like for regular encoding
+        with self.assertRaises(OdxError):
+            encoder(num_flips=256)
+        with self.assertRaises(OdxError):
+            encoder()
+        with self.assertRaises(OdxError):
+            encoder(forward_soberness_check=0x12, num_flips=5)
+        with self.assertRaises(OdxError):
+            request.compile_encoder(fixed_params={"sid": 0xba})
+
+        # parameters which are not simple integers are patched into
+        # the template using the generic machinery
+        request = odxrequire(
+            odxdb.diag_layers.somersault_base_variant.services.set_operation_params.request)
+        encoder = request.compile_encoder()
+        self.assertEqual(encoder(use_fire_ring="true"), bytes.fromhex("bd01"))
+        self.assertEqual(encoder(use_fire_ring="false"), bytes.fromhex("bd00"))
+
+    def test_encode_many(self) -> None:
+        ecu = odxdb.ecus.somersault_lazy
+        request = odxrequire(ecu.services.do_forward_flips.request)
+
+        rows: list[ParameterValueDict] = [
+            {
+                "forward_soberness_check": 0x12,
+                "num_flips": 1
+            },
+            {
+                "forward_soberness_check": 0x12,
+                "num_flips": 256
+            },
+            {
+                "forward_soberness_check": 0x12
+            },
+            {
+                "forward_soberness_check": 0x12,
+                "num_flips": 3
+            },
+        ]
+        results = list(request.encode_many(rows))
+        self.assertEqual([x.index for x in results], [0, 1, 2, 3])
+        self.assertEqual(results[0].coded_message, bytes.fromhex("ba1201"))
+        self.assertIsNone(results[0].error)
+        self.assertIsNone(results[1].coded_message)
+        self.assertIsInstance(results[1].error, OdxError)
+        self.assertIsInstance(results[2].error, OdxError)
+        self.assertEqual(results[3].coded_message, bytes.fromhex("ba1203"))
+
+        # columnar input
+        results = list(
+            request.encode_many({"num_flips": [0, 255, -1, 7]},
+                                fixed_params={"forward_soberness_check": 0x12}))
+        self.assertEqual([x.coded_message for x in results], [
+            bytes.fromhex("ba1200"),
+            bytes.fromhex("ba12ff"), None,
+            bytes.fromhex("ba1207")
+        ])
+        self.assertIsInstance(results[2].error, OdxError)
+
+        # floating point values are rejected for integer parameters,
+        # regardless of whether the values are specified as rows or
+        # as columns
+        float_values = [3.0, 4.5]
+        fixed_params: ParameterValueDict = {"forward_soberness_check": 0x12}
+        column_results = list(
+            request.encode_many({"num_flips": float_values}, fixed_params=fixed_params))
+        row_results = list(
+            request.encode_many([{
+                **fixed_params, "num_flips": x
+            } for x in float_values]))
+        self.assertEqual([x.coded_message for x in column_results], [None, None])
+        self.assertEqual([x.coded_message for x in row_results], [None, None])
+        self.assertTrue(all(isinstance(x.error, OdxError) for x in column_results))
+        self.assertTrue(all(isinstance(x.error, OdxError) for x in row_results))
+        if np is not None:
+            column_results = list(
+                request.encode_many({"num_flips": np.array(float_values)},
+                                    fixed_params=fixed_params))
+            self.assertEqual([x.coded_message for x in column_results], [None, None])
+
     def test_decode_request(self) -> None:
         messages = odxdb.ecus.somersault_assiduous.decode(bytes([0x03, 0x45]))
         self.assertTrue(len(messages) == 1)
@@ -193,6 +332,26 @@ class TestEnDecode(unittest.TestCase):
                          odxdb.ecus.somersault_assiduous.services.headstand.request)
         self.assertEqual(m.param_dict, {"sid": 0x03, "duration": 0x45})
 
+    def test_try_decode_truncated_request(self) -> None:
+        ecu = odxdb.ecus.somersault_lazy
+        request = odxrequire(ecu.services.do_forward_flips.request)
+
+        # the request does not apply to messages with a different
+        # service ID, but it does apply to truncated messages, which
+        # is why they produce an error instead of being skipped
+        self.assertIsNone(request.try_decode(bytes.fromhex("bb1203")))
+        with self.assertRaises(DecodeError):
+            request.try_decode(bytes.fromhex("ba12"))
+
+        # the diagnostic layer reports that it cannot decode the
+        # truncated message, consistently with decode()
+        self.assertIsNone(ecu.try_decode(bytes.fromhex("ba12")))
+        with self.assertRaises(DecodeError):
+            ecu.decode(bytes.fromhex("ba12"))
+        self.assertIsNone(ecu.try_decode_response(bytes.fromhex("fa"), bytes.fromhex("ba1203")))
+        with self.assertRaises(DecodeError):
+            ecu.decode_response(bytes.fromhex("fa"), bytes.fromhex("ba1203"))
+
     def test_decode_global_negative_response(self) -> None:
         ecu = odxdb.ecus.somersault_assiduous
         coded_request = bytes([0x03, 0x45])
@@ -217,6 +376,45 @@ class TestEnDecode(unittest.TestCase):
         resp = decoded_resp[0]
         self.assertEqual(resp.param_dict['temperature'], 35)
 
+    def test_decode_lazy(self) -> None:
+        ecu = odxdb.ecus.somersault_assiduous
+        messages = ecu.decode(bytes([0x03, 0x45]), lazy=True)
+        self.assertEqual(len(messages), 1)
+        m = messages[0]
+        self.assertEqual(m.coding_object, ecu.services.headstand.request)
+        self.assertFalse(m.is_fully_decoded)
+        self.assertEqual(m.param_dict, {})
+
+        # only the parameters up to the requested one are decoded
+        self.assertEqual(m["sid"], 0x03)
+        self.assertEqual(m.param_dict, {"sid": 0x03})
+        self.assertFalse(m.is_fully_decoded)
+
+        self.assertEqual(m.decode_all(), {"sid": 0x03, "duration": 0x45})
+        self.assertTrue(m.is_fully_decoded)
+
+        # lazily decoded responses are identical to eagerly decoded ones
+        coded_request = bytes([0x03, 0x45])
+        gnr = ecu.global_negative_responses.too_hot
+        coded_response = gnr.encode(coded_request=coded_request, temperature=35)
+        eager_resps = ecu.decode_response(coded_response, request=coded_request)
+        lazy_resps = ecu.decode_response(coded_response, request=coded_request, lazy=True)
+        self.assertEqual([x.coding_object for x in lazy_resps],
+                         [x.coding_object for x in eager_resps])
+        self.assertEqual(lazy_resps[0]["temperature"], 35)
+        self.assertEqual(lazy_resps[0].decode_all(), eager_resps[0].param_dict)
+
+        # mismatching NRC-CONST parameters are detected without
+        # decoding the remaining parameters
+        service = ecu.services.do_forward_flips
+        flips_request = service(forward_soberness_check=0x12, num_flips=5)
+        flips_response = bytes([0x7f, flips_request[0], 0x01, 0x03])
+        lazy_resps = ecu.decode_response(flips_response, request=flips_request, lazy=True)
+        eager_resps = ecu.decode_response(flips_response, request=flips_request)
+        self.assertEqual([x.coding_object for x in lazy_resps],
+                         [x.coding_object for x in eager_resps])
+        self.assertEqual(lazy_resps[0].decode_all(), eager_resps[0].param_dict)
+
     def test_code_table_params(self) -> None:
         """en- and decode table parameters"""
         ecu = odxdb.ecus.somersault_assiduous
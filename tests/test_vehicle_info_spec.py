@@ -243,6 +243,25 @@ def test_create_vehicle_info_spec_from_et() -> None:
     assert pvl.link_comparam_refs.CP_CanBaudrateRecord.simple_value == '0'
 
 
+def test_network_index_logical_links() -> None:
+    old_index = somersault_db.network_index()
+
+    # the index is rebuilt after the database has been refreshed
+    somersault_db._vehicle_info_specs = NamedItemList()
+    somersault_db.add_odx_xml_tree(vehicle_info_spec_et)
+    somersault_db.refresh()
+    index = somersault_db.network_index()
+    assert index is not old_index
+
+    # both logical links lead to the base variant and thus also to
+    # all of its ECU variants
+    assert [x.diag_layer.short_name for x in index.for_logical_link("gateway")
+           ] == ["somersault_base_variant", "somersault_lazy", "somersault_assiduous"]
+    lazy_node = index.for_diag_layer(somersault_db.ecus.somersault_lazy)[0]
+    assert [x.short_name for x in lazy_node.logical_links] == ["gateway", "member"]
+    assert index.for_logical_link("nonexistent") == []
+
+
 def test_write_vehicle_info_spec() -> None:
     somersault_db._vehicle_info_specs = NamedItemList()
     somersault_db.add_odx_xml_tree(vehicle_info_spec_et)